@@ -0,0 +1,82 @@
+"""Requests/second of the complaint API under concurrent clients.
+
+Starts the API under uvicorn (one worker) on a seeded temporary database.
+Clients page through /complaints/get-all-complaints (with and without
+filters) and /complaints/get-complaints for one user. A probe hits /status
+every 10ms alongside them: its latency shows whether DB work is blocking
+the event loop.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import use_temp_database, seed_complaints, percentile, Timer, free_port, start_api_server
+
+LIST_PATHS = [
+    "/complaints/get-all-complaints?limit=100",
+    "/complaints/get-all-complaints?limit=100&status=Pending",
+    "/complaints/get-all-complaints?limit=50&trainNumber=12345",
+    "/complaints/get-complaints",
+]
+
+
+async def _client(http, deadline, latencies, rng):
+    while time.perf_counter() < deadline:
+        with Timer() as t:
+            response = await http.get(rng.choice(LIST_PATHS))
+        response.raise_for_status()
+        latencies.append(t.elapsed)
+
+
+async def _probe(http, deadline, latencies):
+    while time.perf_counter() < deadline:
+        with Timer() as t:
+            await http.get("/status")
+        latencies.append(t.elapsed)
+        await asyncio.sleep(0.01)
+
+
+async def _run(base_url, concurrency, seconds, token):
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60,
+                                 cookies={"access_token_cookie": token}) as http:
+        await http.get(LIST_PATHS[0])
+        latencies, probe = [], []
+        rng = random.Random(concurrency)
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(_probe(http, deadline, probe),
+                             *(_client(http, deadline, latencies, rng) for _ in range(concurrency)))
+    return latencies, probe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--complaints", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    use_temp_database()
+    user_ids = seed_complaints(args.complaints, users=args.users)
+    from website.app.pages.api.user.auth import create_access_token
+
+    token = create_access_token({"sub": user_ids[0], "role": "user"})
+    port = free_port()
+    server = start_api_server(port)
+    try:
+        for concurrency in args.concurrency:
+            latencies, probe = asyncio.run(_run(f"http://127.0.0.1:{port}", concurrency, args.seconds, token))
+            print(f"concurrency={concurrency:3d}  {len(latencies) / args.seconds:7.0f} req/s  "
+                  f"p50={percentile(latencies, 50) * 1e3:7.2f}ms  p99={percentile(latencies, 99) * 1e3:7.2f}ms  "
+                  f"/status p99={percentile(probe, 99) * 1e3:7.2f}ms")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Per-request auth overhead: full JWT decode vs the verified-token cache.
+
+Times ``verify_token`` directly and GET /auth/profile in-process (httpx ASGI
+transport), once with the cache cleared before every call and once warm.
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import use_temp_database, percentile, Timer
+
+
+def _time_verify(verify_token, token_cache, token, calls, cold):
+    samples = []
+    for _ in range(calls):
+        if cold:
+            token_cache.clear()
+        with Timer() as t:
+            verify_token(token)
+        samples.append(t.elapsed)
+    return samples
+
+
+async def _time_profile(token_cache, token, calls, cold):
+    import httpx
+    from website.app.pages.api.user.server import app
+
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 cookies={"access_token_cookie": token}) as http:
+        for _ in range(calls):
+            if cold:
+                token_cache.clear()
+            with Timer() as t:
+                response = await http.get("/auth/profile")
+            response.raise_for_status()
+            samples.append(t.elapsed)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from website.app.pages.api.user.auth import create_access_token, verify_token, token_cache
+
+    token = create_access_token({"sub": "bench-user", "name": "bench", "email": "bench@example.com",
+                                 "phone_number": "9000000000", "role": "user"})
+    for cold in (True, False):
+        label = "decode" if cold else "cached"
+        verify = _time_verify(verify_token, token_cache, token, args.calls, cold)
+        profile = asyncio.run(_time_profile(token_cache, token, args.calls // 5, cold))
+        print(f"{label}: verify_token p50={percentile(verify, 50) * 1e6:7.1f}us  "
+              f"GET /auth/profile p50={percentile(profile, 50) * 1e6:7.1f}us  "
+              f"p99={percentile(profile, 99) * 1e6:7.1f}us")
+
+
+if __name__ == "__main__":
+    main()
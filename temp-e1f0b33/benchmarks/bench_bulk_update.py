@@ -0,0 +1,57 @@
+"""Resolving an incident: N PUT /complaints/update/{id} calls vs one PUT /complaints/bulk-update.
+
+Both go through httpx's ASGI transport against the same seeded table;
+each run resolves a fresh set of --ids complaints.
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import use_temp_database, seed_complaints, Timer
+
+
+async def _run(ids, rounds, token):
+    import httpx
+    from website.app.pages.api.user.server import app
+
+    body = {"status": "resolved", "resolution": "Incident closed"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 cookies={"access_token_cookie": token}, timeout=None) as http:
+        for n in rounds:
+            single, bulk = ids[:n], ids[n:2 * n]
+            del ids[:2 * n]
+            with Timer() as loop:
+                for complaint_id in single:
+                    (await http.put(f"/complaints/update/{complaint_id}", json=body)).raise_for_status()
+            with Timer() as one:
+                response = await http.put("/complaints/bulk-update", json={**body, "ids": bulk})
+            response.raise_for_status()
+            assert response.json()["updated"] == n, response.json()["message"]
+            print(f"{n:6d} complaints  single-row loop {loop.elapsed * 1e3:9.1f}ms  "
+                  f"bulk {one.elapsed * 1e3:8.1f}ms  ({loop.elapsed / one.elapsed:5.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--ids", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args()
+
+    use_temp_database()
+    user_ids = seed_complaints(args.rows, users=10)
+    from sqlalchemy import select
+    from website.app.pages.api.user.database import SessionLocal
+    from website.app.pages.api.user.models import Complaint, StatusEnum
+    from website.app.pages.api.user.auth import create_access_token
+
+    db = SessionLocal()
+    try:
+        ids = list(db.scalars(select(Complaint.id).filter(Complaint.status != StatusEnum.resolved)
+                              .limit(2 * sum(args.ids))))
+    finally:
+        db.close()
+    asyncio.run(_run(ids, args.ids, create_access_token({"sub": user_ids[0], "role": "admin"})))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Throughput of the batched classification worker (complaints/second)."""
+import argparse
+
+from benchmarks.common import use_temp_database, seed_complaints, Timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--complaints", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256, 1024])
+    args = parser.parse_args()
+
+    use_temp_database()
+    from website.app.pages.api.user.database import SessionLocal
+    from website.app.pages.api.user.models import Complaint
+    from utils.classifier import classify_pending_complaints
+
+    seed_complaints(args.complaints)
+    for batch_size in args.batch_sizes:
+        db = SessionLocal()
+        db.query(Complaint).update({Complaint.classification: None})
+        db.commit()
+        db.close()
+
+        with Timer() as t:
+            classified = classify_pending_complaints(batch_size=batch_size)
+        print(f"batch_size={batch_size:5d}  classified={classified}  "
+              f"{t.elapsed:7.2f}s  {classified / t.elapsed:8.0f} complaints/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""p50/p99 latency of POST /complaints/classify under concurrent clients.
+
+Runs the app in-process over httpx's ASGI transport and compares the
+micro-batcher against one model call per request (max batch size 1).
+"""
+import argparse
+import asyncio
+import random
+
+from benchmarks.common import use_temp_database, load_dataset_texts, percentile, Timer
+
+
+async def _client(http, texts, requests, latencies, rng):
+    for _ in range(requests):
+        with Timer() as t:
+            response = await http.post("/complaints/classify", json={"complaint": rng.choice(texts)})
+        response.raise_for_status()
+        latencies.append(t.elapsed)
+
+
+async def _run(concurrency, requests, max_batch_size, max_wait_ms, texts):
+    import httpx
+    from utils.ml_pipeline import registry
+    from website.app.pages.api.user import complaint
+    from website.app.pages.api.user.auth import create_access_token
+    from website.app.pages.api.user.batcher import MicroBatcher
+    from website.app.pages.api.user.server import app
+
+    registry.warmup(background=False)
+    batcher = MicroBatcher(complaint.classify_batcher.predict, max_batch_size, max_wait_ms)
+    complaint.classify_batcher = batcher
+    batcher.start()
+
+    latencies = []
+    rng = random.Random(0)
+    transport = httpx.ASGITransport(app=app)
+    # Any signed-in user may preview; the token is verified once and then cached
+    token = create_access_token({"sub": "bench-user", "role": "user"})
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 cookies={"access_token_cookie": token}) as http:
+        await http.post("/complaints/classify", json={"complaint": texts[0]})
+        with Timer() as total:
+            await asyncio.gather(*(_client(http, texts, requests, latencies, rng) for _ in range(concurrency)))
+    await batcher.stop()
+    return latencies, total.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=100, help="requests per client")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    use_temp_database()
+    texts = load_dataset_texts()
+    for concurrency in args.concurrency:
+        for label, max_batch, max_wait in (("unbatched", 1, 0), ("batched", args.max_batch, args.max_wait_ms)):
+            latencies, elapsed = asyncio.run(_run(concurrency, args.requests, max_batch, max_wait, texts))
+            print(f"concurrency={concurrency:3d}  {label:9s}  p50={percentile(latencies, 50) * 1e3:7.2f}ms  "
+                  f"p99={percentile(latencies, 99) * 1e3:7.2f}ms  {len(latencies) / elapsed:7.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
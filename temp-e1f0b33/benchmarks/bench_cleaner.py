@@ -0,0 +1,30 @@
+"""clean_text row by row vs the clean_texts batch API on notebook/data/dataset.csv."""
+import argparse
+
+from benchmarks.common import load_dataset_texts, Timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10, help="times the dataset is repeated")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from utils import cleaner
+
+    texts = pd.Series(load_dataset_texts() * args.repeat)
+    print(f"{len(texts)} texts, tokenizer={cleaner._get_batch_tokenizer().__name__}")
+
+    with Timer() as row_by_row:
+        expected = texts.apply(cleaner.clean_text).tolist()
+    with Timer() as batch:
+        actual = cleaner.clean_texts(texts)
+
+    assert actual == expected, "clean_texts output differs from clean_text"
+    print(f"clean_text  (Series.apply): {row_by_row.elapsed:7.3f}s  {len(texts) / row_by_row.elapsed:9.0f} texts/s")
+    print(f"clean_texts (batch):        {batch.elapsed:7.3f}s  {len(texts) / batch.elapsed:9.0f} texts/s")
+    print(f"speedup: {row_by_row.elapsed / batch.elapsed:.1f}x, outputs identical")
+
+
+if __name__ == "__main__":
+    main()
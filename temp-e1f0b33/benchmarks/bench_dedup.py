@@ -0,0 +1,89 @@
+"""Near-duplicate index insertion cost as the corpus grows.
+
+Streams --complaints synthetic complaints (dataset texts with light edits,
+spread over --trains trains and --days days, in time order) through
+``NearDuplicateIndex.assign`` in worker-sized batches. It prints the
+per-complaint cost for each tenth of the stream, which should stay flat
+however many complaints came before. The TF-IDF vectors are computed up
+front, so only the index itself is timed. For comparison it also times a
+brute-force cosine against every earlier complaint over the first
+--brute-force complaints.
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmarks.common import use_temp_database, load_dataset_texts, Timer
+
+
+def _edit(rng, text):
+    words = text.split()
+    if len(words) > 4 and rng.random() < 0.5:
+        del words[rng.randrange(len(words))]
+    if rng.random() < 0.3:
+        words.append(rng.choice(["please", "sir", "urgent", "!!", "help"]))
+    return " ".join(words)
+
+
+def _stream(n, trains, days, texts, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    times = sorted(rng.randint(0, days * 86400 - 1) for _ in range(n))
+    return [
+        SimpleNamespace(id=f"c{i}", complaint=_edit(rng, rng.choice(texts)),
+                        trainNumber=str(12000 + rng.randrange(trains)),
+                        created_at=start + timedelta(seconds=t))
+        for i, t in enumerate(times)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--complaints", type=int, default=200_000)
+    parser.add_argument("--trains", type=int, default=300)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--brute-force", type=int, default=20_000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from utils.dedup import NearDuplicateIndex, tfidf_vectors
+
+    rows = _stream(args.complaints, args.trains, args.days, load_dataset_texts())
+    with Timer() as t:
+        vectors = {row.id: vector for row, vector in zip(rows, tfidf_vectors([row.complaint for row in rows]))}
+    print(f"vectorized {len(rows)} complaints in {t.elapsed:.1f}s")
+
+    index = NearDuplicateIndex(vectorize=lambda texts: [vectors[row_id] for row_id in texts])
+    clusters = {}
+    tenth = max(1, len(rows) // 10)
+    for start in range(0, len(rows), tenth):
+        segment = rows[start:start + tenth]
+        with Timer() as t:
+            for offset in range(0, len(segment), args.batch_size):
+                # The index vectorizes row.complaint; hand it the ids instead to skip recomputing
+                batch = [SimpleNamespace(id=r.id, complaint=r.id, trainNumber=r.trainNumber, created_at=r.created_at)
+                         for r in segment[offset:offset + args.batch_size]]
+                clusters.update(index.assign(None, batch))
+        print(f"complaints {start:7d}-{start + len(segment):7d}  {t.elapsed / len(segment) * 1e6:7.1f}us/complaint")
+
+    sizes = np.bincount(np.unique(list(clusters.values()), return_inverse=True)[1])
+    print(f"{len(sizes)} clusters, {int((sizes > 1).sum())} with duplicates, "
+          f"{int(sizes[sizes > 1].sum())} complaints in them, largest {int(sizes.max())}")
+
+    from scipy import sparse
+
+    n = min(args.brute_force, len(rows))
+    entries = [(i, term, weight) for i, row in enumerate(rows[:n]) for term, weight in vectors[row.id].items()]
+    i, j, w = zip(*entries)
+    matrix = sparse.csr_matrix((w, (i, j)))
+    with Timer() as t:
+        for i in range(n - 1000, n):
+            (matrix[:i] @ matrix[i].T).max()
+    print(f"brute-force sparse cosine at {n} complaints: {t.elapsed / 1000 * 1e6:7.1f}us/complaint (grows linearly)")
+
+if __name__ == "__main__":
+    main()
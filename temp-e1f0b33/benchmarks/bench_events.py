@@ -0,0 +1,117 @@
+"""Cost of the complaint event stream: hub fan-out and idle SSE connections.
+
+First, in process: --subscribers user streams plus --admins admin streams
+on one EventHub. It reports the memory per subscriber and the time
+``publish_complaints`` takes for one complaint (one owner stream plus every
+admin stream) and for a batch of --batch complaints from distinct owners.
+
+Then, unless --connections is 0, it opens that many idle
+``GET /complaints/events`` connections to uvicorn in a subprocess and
+reports the server's RSS growth per connection. It also times one created
+complaint reaching every admin stream.
+"""
+import argparse
+import asyncio
+import tracemalloc
+
+from benchmarks.common import (use_temp_database, seed_complaints, free_port, start_api_server,
+                               proc_status_mb, percentile, Timer)
+
+
+async def _fan_out(subscribers, admins, batch):
+    from website.app.pages.api.user.events import EventHub
+
+    hub = EventHub(queue_size=1_000_000)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    users = [hub.subscribe(f"user{i}") for i in range(subscribers)]
+    admin_subs = [hub.subscribe("admin", admin=True) for _ in range(admins)]
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / (subscribers + admins)
+    tracemalloc.stop()
+    print(f"{subscribers} user + {admins} admin subscribers: {per_subscriber:.0f} bytes each")
+
+    single = []
+    for i in range(1000):
+        with Timer() as t:
+            hub.publish_complaints("complaint.created", [{"id": i, "userId": f"user{i % subscribers}"}])
+        single.append(t.elapsed)
+    complaints = [{"id": i, "userId": f"user{i % subscribers}", "status": "Resolved"} for i in range(batch)]
+    with Timer() as many:
+        hub.publish_complaints("complaint.updated", complaints)
+    print(f"publish 1 complaint    p50 {percentile(single, 50) * 1e6:7.1f}us  p99 {percentile(single, 99) * 1e6:7.1f}us")
+    print(f"publish {batch} complaints  {many.elapsed * 1e3:7.1f}ms  "
+          f"(queued on {len({c['userId'] for c in complaints}) + admins} streams)")
+    assert all(s.queue.qsize() for s in admin_subs) and hub.evictions == 0
+    del users
+
+
+async def _open_stream(port, token):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((f"GET /complaints/events HTTP/1.1\r\nHost: bench\r\n"
+                  f"Cookie: access_token_cookie={token}\r\n\r\n").encode())
+    await writer.drain()
+    # Headers and the ": connected" comment
+    await reader.readuntil(b": connected\n\n")
+    return reader, writer
+
+
+async def _connections(port, tokens, admin_token, admins):
+    import httpx
+
+    streams = []
+    for start in range(0, len(tokens), 100):
+        streams += await asyncio.gather(*(_open_stream(port, token) for token in tokens[start:start + 100]))
+    admin_streams = await asyncio.gather(*(_open_stream(port, admin_token) for _ in range(admins)))
+
+    body = {"trainNumber": "12345", "pnrNumber": "1234567890", "coachNumber": "S1", "seatNumber": "1",
+            "sourceStation": "NDLS", "destinationStation": "BCT",
+            "complaint": "The toilet in coach S1 has not been cleaned since the journey began"}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as http:
+        with Timer() as t:
+            response = await http.post("/complaints/", json=body, cookies={"access_token_cookie": tokens[0]})
+            response.raise_for_status()
+            await asyncio.gather(*(reader.readuntil(b"event: complaint.created\n") for reader, _ in admin_streams))
+    print(f"complaint created and delivered to {admins} admin streams in {t.elapsed * 1e3:.1f}ms")
+    return streams + admin_streams
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--admins", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--connections", type=int, default=1000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    asyncio.run(_fan_out(args.subscribers, args.admins, args.batch))
+    if not args.connections:
+        return
+
+    user_ids = seed_complaints(10, users=min(args.connections, 100))
+    from website.app.pages.api.user.auth import create_access_token
+
+    tokens = [create_access_token({"sub": user_ids[i % len(user_ids)], "role": "user"})
+              for i in range(args.connections)]
+    admin_token = create_access_token({"sub": user_ids[0], "role": "admin"})
+    port = free_port()
+    server = start_api_server(port)
+    try:
+        idle_mb = proc_status_mb(server.pid, "VmRSS")
+
+        async def run():
+            streams = await _connections(port, tokens, admin_token, args.admins)
+            open_mb = proc_status_mb(server.pid, "VmRSS")
+            total = len(streams)
+            print(f"{total} open SSE connections: server RSS {idle_mb:.1f} -> {open_mb:.1f}MiB "
+                  f"({(open_mb - idle_mb) * 1024 / total:.1f}KiB per connection)")
+            for _, writer in streams:
+                writer.close()
+
+        asyncio.run(run())
+    finally:
+        server.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Peak server RSS while streaming GET /complaints/export over a large table.
+
+Seeds --rows complaints (1M by default), then for each format starts a
+fresh uvicorn server, downloads the export over HTTP and samples the
+server's anonymous RSS. SQLite's mmap of the database file is reported
+separately (total high-water mark) since those pages are shared page cache.
+The anonymous peak must stay under --max-rss-mb whatever the table size;
+exits non-zero otherwise.
+"""
+import argparse
+import sys
+
+from benchmarks.common import use_temp_database, seed_complaints, Timer, free_port, start_api_server, proc_status_mb, RssSampler
+
+
+def _download(port, fmt, token):
+    import httpx
+
+    size = 0
+    with httpx.stream("GET", f"http://127.0.0.1:{port}/complaints/export?format={fmt}",
+                      cookies={"access_token_cookie": token}, timeout=None) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            size += len(chunk)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv", "columnar"])
+    parser.add_argument("--max-rss-mb", type=float, default=150)
+    args = parser.parse_args()
+
+    use_temp_database()
+    user_ids = seed_complaints(args.rows, users=100)
+    from website.app.pages.api.user.auth import create_access_token
+
+    token = create_access_token({"sub": user_ids[0], "role": "admin"})
+
+    over_budget = False
+    for fmt in args.formats:
+        port = free_port()
+        server = start_api_server(port)
+        try:
+            start_mb = proc_status_mb(server.pid, "RssAnon")
+            with RssSampler(server.pid) as sampler, Timer() as t:
+                size = _download(port, fmt, token)
+            peak_mb = sampler.peak_mb
+            total_peak_mb = proc_status_mb(server.pid, "VmHWM")
+        finally:
+            server.terminate()
+            server.wait()
+        over_budget |= peak_mb > args.max_rss_mb
+        print(f"{fmt:9s} {args.rows} rows  {size / 2**20:8.1f} MiB in {t.elapsed:6.1f}s "
+              f"({args.rows / t.elapsed:7.0f} rows/s)  server anon RSS {start_mb:6.1f} -> peak {peak_mb:6.1f} MiB, "
+              f"total RSS peak {total_peak_mb:6.1f} MiB")
+    if over_budget:
+        print(f"peak RSS above {args.max_rss_mb} MiB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Import-time budget for the API: `import server` must not load the ML stack.
+
+Exits non-zero if the import takes longer than --budget seconds or pulls in
+sklearn/nltk, so it can gate CI or a deploy script.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import ROOT_DIR, use_temp_database
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from website.app.pages.api.user.server import app
+elapsed = time.perf_counter() - started
+heavy = sorted(m for m in ("sklearn", "nltk", "utils.cleaner") if m in sys.modules)
+print(json.dumps({"seconds": elapsed, "heavy_modules": heavy}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    use_temp_database()
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT_DIR, env=os.environ,
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    best = min(run["seconds"] for run in runs)
+    heavy = runs[0]["heavy_modules"]
+    print(f"import server: best of {args.runs} = {best:.3f}s (budget {args.budget:.1f}s), "
+          f"heavy modules loaded: {heavy or 'none'}")
+    if best > args.budget or heavy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""sklearn Pipeline vs the NumPy InferenceEngine at batch sizes 1, 32 and 1024.
+
+Both sides score the same pre-cleaned texts, so the numbers isolate the model
+(vectorize + MultinomialNB) from text cleaning. Labels must be identical.
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import load_dataset_texts, percentile, Timer
+
+
+def _time_batches(predict, texts, batch_size, max_calls):
+    latencies = []
+    labels = []
+    for offset in range(0, min(len(texts), batch_size * max_calls), batch_size):
+        batch = texts[offset:offset + batch_size]
+        with Timer() as t:
+            labels.append(predict(batch))
+        latencies.append(t.elapsed)
+    return latencies, np.concatenate(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--max-calls", type=int, default=500, help="batches timed per batch size")
+    args = parser.parse_args()
+
+    from utils.cleaner import clean_texts
+    from utils.ml_pipeline import registry
+
+    loaded = registry.load()
+    vectorizer, classifier = loaded["vectorizer"], loaded["classification_model"]
+    engine = registry.engine()
+    cleaned = clean_texts(load_dataset_texts())
+
+    def sklearn_predict(batch):
+        return classifier.predict(vectorizer.transform(batch))
+
+    assert np.array_equal(engine.predict(cleaned), sklearn_predict(cleaned)), "engine labels differ from sklearn"
+    assert np.array_equal(engine.predict_proba(cleaned).argmax(axis=1),
+                          classifier.predict_proba(vectorizer.transform(cleaned)).argmax(axis=1))
+    print(f"{len(cleaned)} texts, labels identical to sklearn")
+
+    for batch_size in args.batch_sizes:
+        for name, predict in (("sklearn", sklearn_predict), ("engine", engine.predict)):
+            latencies, _ = _time_batches(predict, cleaned, batch_size, args.max_calls)
+            scored = min(len(cleaned), batch_size * args.max_calls)
+            print(f"batch_size={batch_size:5d}  {name:8s} p50={percentile(latencies, 50) * 1e3:8.3f}ms  "
+                  f"p99={percentile(latencies, 99) * 1e3:8.3f}ms  {scored / sum(latencies):9.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
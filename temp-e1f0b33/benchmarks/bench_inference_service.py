@@ -0,0 +1,173 @@
+"""API latency while the classification worker drains a large backlog.
+
+Queues --complaints complaints for classification, starts uvicorn with one
+worker thread (CLASSIFY_WORKERS=1), and then for --seconds sends sequential
+calls to /complaints/get-complaints and to the /complaints/classify preview.
+It runs this once per --processes value: 0 classifies in the API process, as
+before, and N > 0 uses N inference processes. An "idle" run with an empty
+queue is the baseline. Prints request latency and how many complaints
+were classified per second meanwhile.
+
+First it checks recovery (Linux only): an inference process is killed
+--kills times, and the next batch must be served by a fresh pool that is
+not ready until it has loaded the models. The dead pools' threads and
+file descriptors must not pile up. Exits non-zero if any of this fails.
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+
+from benchmarks.common import use_temp_database, seed_complaints, free_port, start_api_server, percentile, Timer
+
+
+def _reset(queue):
+    """Clear every classification and job, and with ``queue`` queue all complaints again; returns how many."""
+    from website.app.pages.api.user.database import SessionLocal
+    from website.app.pages.api.user.models import ClassificationJob, Complaint
+    from website.app.pages.api.user.outbox import enqueue_classification
+
+    db = SessionLocal()
+    try:
+        db.query(ClassificationJob).delete()
+        db.query(Complaint).update({Complaint.classification: None})
+        ids = [row.id for row in db.query(Complaint.id)] if queue else []
+        enqueue_classification(db, ids)
+        db.commit()
+        return len(ids)
+    finally:
+        db.close()
+
+
+def _classified():
+    from website.app.pages.api.user.database import SessionLocal
+    from website.app.pages.api.user.models import Complaint
+
+    db = SessionLocal()
+    try:
+        return db.query(Complaint).filter(Complaint.classification.isnot(None)).count()
+    finally:
+        db.close()
+
+
+def _wait_ready(http):
+    for _ in range(1200):
+        if http.get("/ready").status_code == 200:
+            return
+        time.sleep(0.1)
+    raise RuntimeError("models did not load")
+
+
+def _pid(texts):
+    return [os.getpid()]
+
+
+def _wait_service_ready(service):
+    for _ in range(1200):
+        if service.ready:
+            return
+        time.sleep(0.1)
+    raise RuntimeError("inference processes did not load the models")
+
+
+def _open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def check_recovery(kills):
+    """Kill the inference process ``kills`` times; False if the pool does not recover cleanly.
+
+    After each kill the next batch must start a fresh pool, which reports
+    not ready until its process has loaded the models, and must succeed.
+    Threads and file descriptors of the dead pools must not pile up.
+    """
+    from utils.inference_service import InferenceService, predict_labels
+
+    service = InferenceService(processes=1, nice=0)
+    service.start()
+    try:
+        _wait_service_ready(service)
+        threads, fds = threading.active_count(), _open_fds()
+        for attempt in range(kills):
+            pid = service.submit(_pid, [None]).result()[0]
+            os.kill(pid, signal.SIGKILL)
+            time.sleep(0.5)
+            future = service.submit(predict_labels, ["train is running late by 3 hours"])
+            if service.ready:
+                print(f"recovery: still ready right after kill {attempt + 1}")
+                return False
+            try:
+                labels = future.result(timeout=120)
+            except Exception as e:
+                print(f"recovery: batch after kill {attempt + 1} failed: {type(e).__name__} {e}")
+                return False
+            _wait_service_ready(service)
+            if service.submit(_pid, [None]).result()[0] == pid or len(labels) != 1:
+                print(f"recovery: kill {attempt + 1} was not followed by a fresh process")
+                return False
+        time.sleep(0.5)
+        leaked_threads, leaked_fds = threading.active_count() - threads, _open_fds() - fds
+        print(f"recovery: {kills} kills, each next batch served by a fresh pool, "
+              f"{leaked_threads:+d} threads, {leaked_fds:+d} file descriptors")
+        return leaked_threads <= 0 and leaked_fds <= 0
+    finally:
+        service.shutdown()
+
+
+def _probe(http, seconds):
+    samples = {"list": [], "preview": []}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        with Timer() as t:
+            http.get("/complaints/get-complaints").raise_for_status()
+        samples["list"].append(t.elapsed)
+        with Timer() as t:
+            http.post("/complaints/classify", json={"complaint": "train is running late by 3 hours"}).raise_for_status()
+        samples["preview"].append(t.elapsed)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--complaints", type=int, default=20_000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--kills", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.kills and not check_recovery(args.kills):
+        sys.exit(1)
+
+    import httpx
+
+    use_temp_database()
+    user_ids = seed_complaints(args.complaints, users=100)
+    from website.app.pages.api.user.auth import create_access_token
+
+    token = create_access_token({"sub": user_ids[0], "role": "user"})
+    runs = [("idle", 0)] + [(f"processes={n}", n) for n in args.processes]
+    for name, processes in runs:
+        queued = _reset(queue=name != "idle")
+        port = free_port()
+        server = start_api_server(port, CLASSIFY_WORKERS="1", CLASSIFY_POLL_INTERVAL="0.2", MODEL_WARMUP="true",
+                                  INFERENCE_PROCESSES=str(processes))
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", cookies={"access_token_cookie": token},
+                              timeout=60) as http:
+                _wait_ready(http)
+                before = _classified()
+                samples = _probe(http, args.seconds)
+                rate = (_classified() - before) / args.seconds
+        finally:
+            # SIGTERM, so the lifespan shuts the inference processes down
+            server.terminate()
+            server.wait()
+        report = "  ".join(f"{key} p50 {percentile(values, 50) * 1e3:6.1f}ms p99 {percentile(values, 99) * 1e3:7.1f}ms"
+                           for key, values in samples.items())
+        print(f"{name:12s} queued={queued:6d}  {report}  classified {rate:6.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
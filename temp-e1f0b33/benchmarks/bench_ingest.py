@@ -0,0 +1,68 @@
+"""Bulk ingestion rows/second vs inserting one complaint per transaction.
+
+The per-row baseline does what POST /complaints/ does for each record: add,
+enqueue, commit. The bulk path is utils.ingest at several chunk sizes.
+"""
+import argparse
+import io
+import json
+import random
+
+from benchmarks.common import use_temp_database, load_dataset_texts, Timer
+
+
+def _ndjson(n, texts, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        lines.append(json.dumps({
+            "trainNumber": str(rng.randint(12001, 12999)),
+            "pnrNumber": str(rng.randint(10**9, 10**10 - 1)),
+            "coachNumber": f"S{rng.randint(1, 12)}",
+            "seatNumber": str(rng.randint(1, 72)),
+            "sourceStation": "NDLS",
+            "destinationStation": "BCT",
+            "complaint": rng.choice(texts).ljust(20, "."),
+        }))
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    use_temp_database()
+    from website.app.pages.api.user.database import SessionLocal, init_db
+    from website.app.pages.api.user.models import Complaint, StatusEnum
+    from website.app.pages.api.user.outbox import enqueue_classification
+    from website.app.pages.api.user.schemas import ComplaintCreate
+    from utils.ingest import read_records, ingest_records
+
+    init_db()
+    texts = load_dataset_texts()
+
+    records = [record for _, record in read_records(io.StringIO(_ndjson(args.baseline_rows, texts, seed=1)), "ndjson")]
+    db = SessionLocal()
+    with Timer() as t:
+        for record in records:
+            complaint = Complaint(user_id="bench", status=StatusEnum.pending,
+                                  **ComplaintCreate.model_validate(record).model_dump())
+            db.add(complaint)
+            db.flush()
+            enqueue_classification(db, [complaint.id])
+            db.commit()
+    db.close()
+    print(f"per-row commits     {len(records) / t.elapsed:9.0f} rows/s")
+
+    payload = _ndjson(args.rows, texts)
+    for chunk_size in args.chunk_sizes:
+        report = ingest_records(read_records(io.StringIO(payload), "ndjson"), "bench", chunk_size)
+        assert report.inserted == args.rows, report.as_dict()
+        print(f"bulk chunk={chunk_size:5d}    {report.rows_per_second:9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
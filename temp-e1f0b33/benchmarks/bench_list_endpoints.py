@@ -0,0 +1,93 @@
+"""GET /complaints/get-complaints latency for users with 10k and 100k complaints.
+
+Compares the endpoint (column-only select, orjson) with the previous
+implementation, mounted on the same app for the run: ORM entities, one
+hand-built dict per row and FastAPI's default encoder. Both go through
+httpx's ASGI transport with the same auth cookie.
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import use_temp_database, seed_complaints, percentile, Timer
+
+
+def _mount_legacy_route(app):
+    from fastapi import Depends
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import select
+    from website.app.pages.api.user.auth import get_current_user
+    from website.app.pages.api.user.dependencies import get_async_db
+    from website.app.pages.api.user.models import Complaint
+
+    async def legacy_get_complaints(current_user=Depends(get_current_user), db=Depends(get_async_db)):
+        complaints = (await db.scalars(select(Complaint).filter(
+            Complaint.user_id == current_user.user_id
+        ).order_by(Complaint.created_at.desc()))).all()
+        return {
+            "success": True,
+            "message": "Complaints fetched successfully",
+            "totalComplaints": len(complaints),
+            "complaints": [
+                {
+                    "id": c.id,
+                    "trainNumber": c.trainNumber,
+                    "pnrNumber": c.pnrNumber,
+                    "coachNumber": c.coachNumber,
+                    "seatNumber": c.seatNumber,
+                    "sourceStation": c.sourceStation,
+                    "destinationStation": c.destinationStation,
+                    "complaint": c.complaint,
+                    "status": c.status.value,
+                    "classification": c.classification,
+                    "sentiment": c.sentiment,
+                    "sentimentScore": c.sentimentScore,
+                    "createdAt": c.created_at.isoformat()
+                } for c in complaints
+            ]
+        }
+
+    app.add_api_route("/bench/legacy-get-complaints", legacy_get_complaints, response_class=JSONResponse)
+
+
+async def _time(path, token, calls, expected):
+    import httpx
+    from website.app.pages.api.user.server import app
+
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 cookies={"access_token_cookie": token}, timeout=None) as http:
+        for _ in range(calls):
+            with Timer() as t:
+                response = await http.get(path)
+            response.raise_for_status()
+            samples.append(t.elapsed)
+    body = response.json()
+    assert body["totalComplaints"] == expected, body["totalComplaints"]
+    return samples, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--calls", type=int, default=5)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from website.app.pages.api.user.auth import create_access_token
+    from website.app.pages.api.user.server import app
+
+    _mount_legacy_route(app)
+    for size in args.sizes:
+        (user_id,) = seed_complaints(size, users=1, seed=size)
+        token = create_access_token({"sub": user_id, "name": "bench", "email": "bench@example.com",
+                                     "phone_number": "9000000000", "role": "user"})
+        for label, path in (("legacy", "/bench/legacy-get-complaints"), ("current", "/complaints/get-complaints")):
+            samples, size_bytes = asyncio.run(_time(path, token, args.calls, size))
+            print(f"{size:7d} rows  {label:8s} p50={percentile(samples, 50) * 1e3:8.1f}ms  "
+                  f"min={min(samples) * 1e3:8.1f}ms  {size / percentile(samples, 50):9.0f} rows/s  "
+                  f"{size_bytes / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Event-loop lag during concurrent logins: hashing inline vs on the executor.
+
+Signs users in concurrently over httpx's ASGI transport while a monitor
+task sleeps 5ms in a loop and records how late it wakes up. Inline hashing
+stalls the monitor (and every other request) for the whole KDF.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import use_temp_database, percentile, Timer
+
+PASSWORD = "correct horse battery staple"
+
+
+def _seed_users(n):
+    from website.app.pages.api.user.database import SessionLocal, init_db
+    from website.app.pages.api.user.models import User, RoleEnum
+    from website.app.pages.api.user.passwords import hash_password
+
+    init_db()
+    hashed = hash_password(PASSWORD)
+    db = SessionLocal()
+    try:
+        db.add_all([User(name=f"user{i}", email=f"user{i}@example.com", phoneNumber=f"9{i:09d}",
+                         password=hashed, role=RoleEnum.user) for i in range(n)])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _monitor(stop, lags, interval=0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def _login(http, users, offset, logins, latencies):
+    for i in range(offset, offset + logins):
+        with Timer() as t:
+            response = await http.post("/auth/signin", json={"email": f"user{i % users}@example.com", "password": PASSWORD})
+        response.raise_for_status()
+        latencies.append(t.elapsed)
+
+
+async def _run(users, concurrency, logins):
+    import httpx
+    from website.app.pages.api.user.server import app
+
+    lags, latencies = [], []
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        monitor = asyncio.create_task(_monitor(stop, lags))
+        with Timer() as total:
+            await asyncio.gather(*(_login(http, users, c * logins, logins, latencies) for c in range(concurrency)))
+        stop.set()
+        await monitor
+    return lags, latencies, total.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=5, help="logins per client")
+    args = parser.parse_args()
+
+    use_temp_database()
+    _seed_users(args.users)
+    from website.app.pages.api.user import passwords
+
+    executor = passwords._executor
+    for label, pool in (("inline", None), ("executor", executor)):
+        passwords._executor = pool
+        lags, latencies, elapsed = asyncio.run(_run(args.users, args.concurrency, args.logins))
+        print(f"{label:8s}  {len(latencies) / elapsed:6.1f} logins/s  login p50={percentile(latencies, 50) * 1e3:7.1f}ms  "
+              f"loop lag p99={percentile(lags, 99) * 1e3:7.1f}ms  max={max(lags) * 1e3:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
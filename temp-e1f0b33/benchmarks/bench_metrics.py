@@ -0,0 +1,85 @@
+"""Overhead of the metrics middleware and query events.
+
+Starts uvicorn twice, with METRICS_ENABLED=false and then true, against the
+same seeded table. Each run sends --requests sequential calls to /status
+(no SQL) and to /complaints/get-complaints (one query returning the
+user's --rows/10 complaints), and
+prints mean and p99 latency. It also prints what one scrape of /metrics
+costs, and the per-statement cost of the query events on a trivial
+in-memory SELECT, which is the worst case.
+"""
+import argparse
+
+from benchmarks.common import (use_temp_database, seed_complaints, free_port, start_api_server,
+                               percentile, Timer)
+
+
+def _latencies(http, path, n):
+    samples = []
+    for _ in range(n):
+        with Timer() as t:
+            http.get(path).raise_for_status()
+        samples.append(t.elapsed)
+    return samples
+
+
+def _statement_us(instrument):
+    from sqlalchemy import create_engine, text
+    from website.app.pages.api.user.metrics import instrument_engine
+
+    engine = create_engine("sqlite://")
+    if instrument:
+        instrument_engine(engine, "bench")
+    statement = text("SELECT 1")
+    with engine.connect() as conn:
+        for _ in range(1000):
+            conn.execute(statement)
+        with Timer() as t:
+            for _ in range(20_000):
+                conn.execute(statement)
+    return t.elapsed / 20_000 * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    import httpx
+
+    use_temp_database()
+    user_ids = seed_complaints(args.rows, users=10)
+    from website.app.pages.api.user.auth import create_access_token
+
+    token = create_access_token({"sub": user_ids[0], "role": "user"})
+    paths = ["/status", "/complaints/get-complaints"]
+    results = {}
+    for enabled in ("false", "true"):
+        port = free_port()
+        server = start_api_server(port, METRICS_ENABLED=enabled)
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", cookies={"access_token_cookie": token}) as http:
+                for path in paths:
+                    _latencies(http, path, 200)
+                    results[enabled, path] = _latencies(http, path, args.requests)
+                if enabled == "true":
+                    scrape = _latencies(http, "/metrics", 50)
+                    size = len(http.get("/metrics").content)
+        finally:
+            server.kill()
+
+    for path in paths:
+        off, on = results["false", path], results["true", path]
+        mean_off, mean_on = sum(off) / len(off), sum(on) / len(on)
+        print(f"{path:28s} off {mean_off * 1e3:6.3f}ms (p99 {percentile(off, 99) * 1e3:6.3f})  "
+              f"on {mean_on * 1e3:6.3f}ms (p99 {percentile(on, 99) * 1e3:6.3f})  "
+              f"overhead {(mean_on - mean_off) * 1e6:+6.0f}us")
+    print(f"GET /metrics ({size / 1024:.0f}KiB): p50 {percentile(scrape, 50) * 1e3:.2f}ms")
+    bare, instrumented = _statement_us(False), _statement_us(True)
+    print(f"SELECT 1 on :memory:  {bare:.1f}us, with query events {instrumented:.1f}us "
+          f"({instrumented - bare:+.1f}us per statement)")
+
+
+if __name__ == "__main__":
+    main()
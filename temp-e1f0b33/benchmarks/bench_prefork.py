@@ -0,0 +1,100 @@
+"""Memory per worker and throughput scaling of the prefork launcher.
+
+For each --workers count it starts ``python -m website.app.pages.api.user.prefork``
+on a seeded database and reads every worker's /health on its private port.
+It reports each worker's RSS, PSS (shared pages split between the processes
+that map them) and USS (pages only that worker has). Then it runs the load
+test mix (benchmarks.loadtest) with --concurrency-per-worker clients per
+worker and reports req/s and p99.
+
+For comparison it also measures one plain uvicorn process with the models
+loaded: that USS is what each worker would cost without the shared preload.
+
+Scaling stops at os.cpu_count(), and the load generator takes CPU too.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.common import use_temp_database, load_dataset_texts, free_port, start_api_server, ROOT_DIR
+
+MIX = "signin=1,create=10,list_own=50,admin_list=30,admin_update=9"
+
+
+def _start_prefork(port, workers, port_base):
+    import httpx
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "website.app.pages.api.user.prefork", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--worker-port-base", str(port_base)],
+        cwd=ROOT_DIR, env=dict(os.environ, CLASSIFY_WORKERS="1"), stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        try:
+            return server, [httpx.get(f"http://127.0.0.1:{port_base + i}/health").json() for i in range(workers)]
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("prefork launcher did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--complaints", type=int, default=50_000)
+    parser.add_argument("--concurrency-per-worker", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=15)
+    args = parser.parse_args()
+
+    import httpx
+    from benchmarks.loadtest import seed, run_load, parse_mix, summarize
+    from website.app.pages.api.user.prefork import process_memory_mb
+
+    use_temp_database()
+    users, admins, complaint_ids = seed(args.users, 5, args.complaints, random.Random(0))
+    data = {"users": users, "admins": admins, "complaints": complaint_ids, "texts": load_dataset_texts()}
+    print(f"{os.cpu_count()} CPUs")
+
+    port = free_port()
+    single = start_api_server(port, MODEL_WARMUP="true")
+    try:
+        while httpx.get(f"http://127.0.0.1:{port}/ready").status_code != 200:
+            time.sleep(0.2)
+        memory = process_memory_mb(single.pid)
+        print(f"single uvicorn process, models loaded: RSS {memory['rssMb']:.0f}MiB  USS {memory['ussMb']:.0f}MiB")
+    finally:
+        single.terminate()
+        single.wait()
+
+    for workers in args.workers:
+        port, port_base = free_port(), free_port() + 100
+        server, health = _start_prefork(port, workers, port_base)
+        try:
+            master = process_memory_mb(server.pid)
+            print(f"\n{workers} workers (master RSS {master['rssMb']:.0f}MiB)")
+            for worker in health:
+                memory = process_memory_mb(worker["pid"])
+                print(f"  worker {worker['worker']}: RSS {memory['rssMb']:6.1f}MiB  PSS {memory['pssMb']:6.1f}MiB  "
+                      f"USS {memory['ussMb']:6.1f}MiB")
+            samples, errors = asyncio.run(run_load(f"http://127.0.0.1:{port}", data, parse_mix(MIX),
+                                                   workers * args.concurrency_per_worker, 2, args.seconds, 0))
+            total = summarize([s for latencies in samples.values() for s in latencies],
+                              sum(errors.values()), args.seconds)
+            # Memory again after serving: pages the workers wrote to are no longer shared
+            after = [process_memory_mb(worker["pid"]) for worker in health]
+            print(f"  {total['requestsPerSecond']:8.1f} req/s  p50 {total['p50Ms']:7.1f}ms  p99 {total['p99Ms']:7.1f}ms  "
+                  f"errors {total['errors']}  worker USS after load "
+                  f"{sum(m.get('ussMb', 0) for m in after) / len(after):.1f}MiB avg")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Complaint search latency: FTS5 + bm25 vs a LIKE scan over the same rows.
+
+Seeds --rows complaints from the dataset texts (the FTS triggers index them
+as they are inserted), times a full index rebuild, then runs each query
+through ``search_query`` and through an unindexed ``LIKE '%term%'`` filter,
+which is what a server-side search without the index would do (unranked,
+so it can stop after one page when the term is common).
+"""
+import argparse
+
+from benchmarks.common import use_temp_database, seed_complaints, percentile, Timer
+
+# The seeded texts repeat the dataset's ~1.4k tweets, so "rare" still matches
+# about one row in 1.4k; "train" matches about a quarter of the table
+QUERIES = [
+    ("rare word", "mirzapur", {}),
+    ("mid word", "toilet", {}),
+    ("common word", "train", {}),
+    ("two words", "dirty toilet", {}),
+    ("prefix", "refu", {}),
+    ("with status", "water", {"status": "pending"}),
+]
+
+
+def _time(db, statement, calls):
+    samples = []
+    for _ in range(calls):
+        with Timer() as t:
+            rows = db.execute(statement).all()
+        samples.append(t.elapsed)
+    return samples, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    use_temp_database()
+    with Timer() as seed:
+        seed_complaints(args.rows, users=100)
+    print(f"seeded {args.rows} complaints in {seed.elapsed:.1f}s (FTS triggers on)")
+
+    from sqlalchemy import select, text
+    from website.app.pages.api.user.database import SessionLocal, engine
+    from website.app.pages.api.user.filters import ComplaintFilters, apply_complaint_filters
+    from website.app.pages.api.user.models import Complaint
+    from website.app.pages.api.user.schemas import ADMIN_COMPLAINT_COLUMNS
+    from website.app.pages.api.user.search import search_query, rebuild_search_index, build_match_query, _TERM
+
+    with Timer() as rebuild:
+        rebuild_search_index(engine)
+    print(f"rebuild + optimize: {rebuild.elapsed:.1f}s")
+
+    columns = ADMIN_COMPLAINT_COLUMNS.values()
+    db = SessionLocal()
+    try:
+        for label, q, filters in QUERIES:
+            filters = ComplaintFilters(**filters)
+            matches = db.execute(text("SELECT count(*) FROM complaint_fts WHERE complaint_fts MATCH :q"),
+                                 {"q": build_match_query(q)}).scalar()
+            fts, fts_rows = _time(db, search_query(q, columns, filters, args.limit), args.calls)
+
+            like = select(*columns)
+            for term in _TERM.findall(q):
+                like = like.filter(Complaint.complaint.ilike(f"%{term}%"))
+            like = apply_complaint_filters(like, filters).order_by(Complaint.created_at.desc()).limit(args.limit + 1)
+            scan, scan_rows = _time(db, like, max(1, args.calls // 4))
+
+            print(f"{label:12s} {q!r:15s} {matches:6d} matches  fts p50={percentile(fts, 50) * 1e3:7.2f}ms p95={percentile(fts, 95) * 1e3:7.2f}ms "
+                  f"({fts_rows:3d} rows)   LIKE p50={percentile(scan, 50) * 1e3:8.2f}ms ({scan_rows:3d} rows)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
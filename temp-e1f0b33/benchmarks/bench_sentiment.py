@@ -0,0 +1,48 @@
+"""Sentiment scoring throughput in complaints/second.
+
+Scores the dataset texts with the lexicon scorer, with the engine's cache
+warm, and, when SENTIMENT_MODEL_DIR holds a model, with the transformer.
+The transformer is run one text per call, the way the notebook's
+``classifier(text)`` loop ran it, and then in padded batches.
+"""
+import argparse
+
+from benchmarks.common import load_dataset_texts, Timer
+
+
+def _rate(score, texts, batch_size):
+    with Timer() as t:
+        for start in range(0, len(texts), batch_size):
+            score(texts[start:start + batch_size])
+    return len(texts) / t.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    args = parser.parse_args()
+
+    from utils.sentiment import LexiconSentiment, load_sentiment_engine
+
+    texts = (load_dataset_texts() * (args.texts // 1000 + 1))[:args.texts]
+    print(f"lexicon               {_rate(LexiconSentiment().score, texts, 256):10.0f} complaints/s")
+
+    engine = load_sentiment_engine()
+    if engine.model is None:
+        print("no model in SENTIMENT_MODEL_DIR; transformer runs skipped")
+        return
+
+    model = engine.model
+    sample = texts[:min(len(texts), 200)]
+    print(f"transformer per text  {_rate(model.score, sample, 1):10.1f} complaints/s")
+    for batch_size in args.batch_sizes:
+        model.batch_size = batch_size
+        print(f"transformer batch={batch_size:<3d} {_rate(model.score, sample, 256):10.1f} complaints/s")
+
+    engine.score(texts)
+    print(f"engine, cache warm    {_rate(engine.score, texts, 256):10.0f} complaints/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Mixed read/write load on SQLite: default settings vs the tuned profile.
+
+Writer threads insert complaints one commit at a time (like POST /complaints)
+and periodically classify a 256-row batch (like the worker); reader threads
+fetch keyset pages. Lock waits show up as read/write tail latency and as
+"database is locked" errors.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from benchmarks.common import use_temp_database, load_dataset_texts, percentile, Timer
+
+
+def _seed(engine, n, texts):
+    from sqlalchemy.orm import Session
+    from website.app.pages.api.user.database import Base
+    from website.app.pages.api.user.models import Complaint, StatusEnum
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    with Session(engine) as db:
+        for offset in range(0, n, 5000):
+            db.bulk_insert_mappings(Complaint, [_row(rng, texts, StatusEnum) for _ in range(min(5000, n - offset))])
+            db.commit()
+
+
+def _row(rng, texts, status_enum):
+    return {
+        "id": str(uuid4()), "user_id": "bench", "trainNumber": str(rng.randint(12001, 12999)),
+        "pnrNumber": str(rng.randint(10**9, 10**10 - 1)), "coachNumber": "S1", "seatNumber": "1",
+        "sourceStation": "NDLS", "destinationStation": "BCT", "complaint": rng.choice(texts),
+        "status": rng.choice(list(status_enum)), "created_at": datetime.utcnow(),
+    }
+
+
+def _run_profile(name, pragmas, args, texts):
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import Session
+    from website.app.pages.api.user.database import create_sqlite_engine
+    from website.app.pages.api.user.models import Complaint, StatusEnum
+
+    path = os.path.join(tempfile.mkdtemp(prefix="rail-sqlite-"), "bench.db")
+    engine = create_sqlite_engine(f"sqlite:///{path}", pragmas=pragmas)
+    _seed(engine, args.complaints, texts)
+
+    stop = time.perf_counter() + args.seconds
+    results = {"read": [], "write": [], "errors": 0}
+    lock = threading.Lock()
+
+    def record(kind, elapsed):
+        with lock:
+            results[kind].append(elapsed)
+
+    def writer(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            try:
+                with Session(engine) as db, Timer() as t:
+                    if rng.random() < 0.05:
+                        ids = db.scalars(select(Complaint.id).limit(256)).all()
+                        db.bulk_update_mappings(Complaint, [{"id": i, "classification": "Others"} for i in ids])
+                    else:
+                        db.add(Complaint(**_row(rng, texts, StatusEnum)))
+                    db.commit()
+                record("write", t.elapsed)
+            except OperationalError:
+                with lock:
+                    results["errors"] += 1
+
+    def reader(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            try:
+                with Session(engine) as db, Timer() as t:
+                    db.scalars(select(Complaint).filter(Complaint.status == rng.choice(list(StatusEnum)))
+                               .order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(100)).all()
+                record("read", t.elapsed)
+            except OperationalError:
+                with lock:
+                    results["errors"] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(100 + i,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    for kind in ("read", "write"):
+        samples = results[kind]
+        print(f"{name:8s} {kind:5s}  {len(samples) / args.seconds:7.0f} ops/s  "
+              f"p50={percentile(samples, 50) * 1e3:7.2f}ms  p99={percentile(samples, 99) * 1e3:8.2f}ms  "
+              f"max={max(samples, default=0) * 1e3:8.2f}ms")
+    print(f"{name:8s} locked errors: {results['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--complaints", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from website.app.pages.api.user.database import sqlite_pragmas
+
+    texts = load_dataset_texts()
+    # SQLite's own defaults: rollback journal, fsync on every commit
+    _run_profile("default", {"journal_mode": "DELETE", "synchronous": "FULL"}, args, texts)
+    _run_profile("tuned", sqlite_pragmas(), args, texts)
+
+
+if __name__ == "__main__":
+    main()
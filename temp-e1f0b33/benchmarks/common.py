@@ -0,0 +1,206 @@
+"""Shared helpers for the benchmark scripts.
+
+Run benchmarks from the project root, e.g. ``python -m benchmarks.bench_classification_worker``.
+``use_temp_database()`` must be called before anything under ``website`` is
+imported, because the database path is read at import time.
+"""
+import csv
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_PATH = os.path.join(ROOT_DIR, "notebook", "data", "dataset.csv")
+
+
+def use_temp_database():
+    """Point the app at a throwaway SQLite file and return its path."""
+    path = os.path.join(tempfile.mkdtemp(prefix="rail-bench-"), "bench.db")
+    os.environ["DATABASE_PATH"] = path
+    os.environ.setdefault("FLASK_JWT_SECRET_KEY", "benchmark-secret")
+    return path
+
+
+def load_dataset_texts():
+    # Same encoding the training notebook reads the dataset with
+    with open(DATASET_PATH, encoding="latin-1", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        return [row[2] for row in reader if len(row) > 2 and row[2]]
+
+
+STATIONS = ["NDLS", "BCT", "HWH", "MAS", "SBC", "LKO", "PNBE", "ADI"]
+_PNR = re.compile(r"\b\d{10}\b")
+_TRAIN = re.compile(r"\b\d{5}\b")
+_COACH = re.compile(r"\b[SBAHD]\d{1,2}\b")
+_HANDLE = re.compile(r"@\w+\s*")
+
+
+def synthetic_complaint(rng, texts):
+    """A complaint body in the shape of POST /complaints/, modeled on a dataset tweet.
+
+    The tweet's PNR, train and coach numbers are replaced by the generated
+    ones, @handles are mostly dropped and a word is sometimes removed, so
+    texts repeat loosely, like real complaints about the same problem.
+    """
+    train = str(rng.randint(12001, 22999))
+    pnr = str(rng.randint(10**9, 10**10 - 1))
+    coach = f"{rng.choice('SSSSBA')}{rng.randint(1, 12)}"
+    text = rng.choice(texts)
+    text = _PNR.sub(pnr, text)
+    text = _TRAIN.sub(train, text)
+    text = _COACH.sub(coach, text)
+    if rng.random() < 0.8:
+        text = _HANDLE.sub("", text)
+    words = text.split()
+    if len(words) > 6 and rng.random() < 0.3:
+        del words[rng.randrange(len(words))]
+    text = " ".join(words)
+    if len(text) < 20:
+        text += " please look into this"
+    source, destination = rng.sample(STATIONS, 2)
+    return {
+        "trainNumber": train,
+        "pnrNumber": pnr,
+        "coachNumber": coach,
+        "seatNumber": str(rng.randint(1, 72)),
+        "sourceStation": source,
+        "destinationStation": destination,
+        "complaint": text,
+    }
+
+
+def seed_complaints(n, texts=None, users=1, seed=0):
+    """Insert ``n`` synthetic complaints spread over ``users`` users; returns the user ids."""
+    from website.app.pages.api.user.database import SessionLocal, init_db
+    from website.app.pages.api.user.models import Complaint, User, RoleEnum, StatusEnum
+
+    init_db()
+    rng = random.Random(seed)
+    texts = texts or load_dataset_texts()
+    stations = ["NDLS", "BCT", "HWH", "MAS", "SBC", "LKO", "PNBE", "ADI"]
+    statuses = list(StatusEnum)
+
+    db = SessionLocal()
+    try:
+        user_ids = []
+        for i in range(users):
+            user_id = str(uuid4())
+            user_ids.append(user_id)
+            db.add(User(id=user_id, name=f"bench{i}", email=f"bench{i}-{user_id[:8]}@example.com",
+                        phoneNumber=f"9{i:09d}-{user_id[:8]}", password="x", role=RoleEnum.user))
+        db.commit()
+
+        start = datetime.utcnow() - timedelta(days=180)
+        for offset in range(0, n, 5000):
+            db.bulk_insert_mappings(Complaint, [
+                {
+                    "id": str(uuid4()),
+                    "user_id": user_ids[rng.randrange(users)],
+                    "trainNumber": str(rng.randint(12001, 12999)),
+                    "pnrNumber": str(rng.randint(10**9, 10**10 - 1)),
+                    "coachNumber": f"S{rng.randint(1, 12)}",
+                    "seatNumber": str(rng.randint(1, 72)),
+                    "sourceStation": source,
+                    "destinationStation": rng.choice([s for s in stations if s != source]),
+                    "complaint": rng.choice(texts),
+                    "status": rng.choice(statuses),
+                    "created_at": start + timedelta(seconds=rng.randint(0, 180 * 86400)),
+                }
+                for source in (rng.choice(stations) for _ in range(min(5000, n - offset)))
+            ])
+            db.commit()
+        return user_ids
+    finally:
+        db.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api_server(port, **env):
+    """Run the API under uvicorn in a subprocess and wait until it answers."""
+    import httpx
+
+    env = dict(os.environ, **{"CLASSIFY_WORKERS": "0", "MODEL_WARMUP": "false", **env})
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "website.app.pages.api.user.server:app",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    for _ in range(200):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/status")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def proc_status_mb(pid, field):
+    """A memory field of /proc/<pid>/status (e.g. VmHWM, RssAnon) in MiB; Linux only."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class RssSampler:
+    """Samples a process's anonymous RSS in a thread and keeps the maximum.
+
+    Anonymous memory is what the process allocates itself; file-backed pages
+    (SQLite's mmap of the database) are page cache shared with the OS.
+    """
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.peak_mb = max(self.peak_mb, proc_status_mb(self.pid, "RssAnon"))
+            except FileNotFoundError:
+                return
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,316 @@
+"""Mixed-traffic load test of the API with a JSON report.
+
+Seeds a throwaway SQLite database with --users users and --admins admins
+(password PASSWORD), plus --complaints synthetic complaints modeled on
+notebook/data/dataset.csv. Starts the API under uvicorn and runs
+--concurrency clients for --warmup and then --seconds. Each client picks
+operations at random by the --mix weights:
+
+    signin        POST /auth/signin as a random user (password hash check)
+    create        POST /complaints/ as the client's user
+    list_own      GET /complaints/get-complaints as the client's user
+    admin_list    GET /complaints/get-all-complaints, a page, sometimes filtered
+    admin_update  PUT /complaints/update/{id} on a random complaint
+
+The report goes to stdout or --output. It covers the commit and settings of
+the run, req/s, errors and p50/p95/p99 latency per operation and overall,
+and the server's peak RSS. The same --seed gives the same data and the same
+operation sequence per client. --baseline REPORT prints the change against
+an earlier report on stderr.
+
+    python -m benchmarks.loadtest --output before.json
+    python -m benchmarks.loadtest --baseline before.json --output after.json
+
+Client and server share the machine, so compare runs on the same host.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from benchmarks.common import (use_temp_database, load_dataset_texts, synthetic_complaint, percentile,
+                               free_port, start_api_server, proc_status_mb, RssSampler, ROOT_DIR)
+
+PASSWORD = "load-test-password"
+OPERATIONS = ("signin", "create", "list_own", "admin_list", "admin_update")
+DEFAULT_MIX = "signin=2,create=15,list_own=45,admin_list=25,admin_update=13"
+STATUS_KEYS = ["pending", "inProgress", "resolved"]
+
+
+def seed(users, admins, complaints, rng):
+    """Create the accounts and complaints; returns (user emails, admin emails, complaint ids)."""
+    from website.app.pages.api.user.database import SessionLocal, init_db
+    from website.app.pages.api.user.models import Complaint, User, RoleEnum, StatusEnum
+    from website.app.pages.api.user.passwords import hash_password
+
+    init_db()
+    # One hash for every account: the KDF is deliberately slow
+    hashed = hash_password(PASSWORD)
+    texts = load_dataset_texts()
+    user_ids, user_emails, admin_emails = [], [], []
+    db = SessionLocal()
+    try:
+        for i in range(users + admins):
+            admin = i >= users
+            email = f"admin{i - users}@example.com" if admin else f"user{i}@example.com"
+            user_id = str(uuid4())
+            db.add(User(id=user_id, name=email.split("@")[0], email=email, phoneNumber=f"9{i:09d}",
+                        password=hashed, role=RoleEnum.admin if admin else RoleEnum.user))
+            if admin:
+                admin_emails.append(email)
+            else:
+                user_ids.append(user_id)
+                user_emails.append(email)
+        db.commit()
+
+        complaint_ids = []
+        statuses = list(StatusEnum)
+        start = datetime.utcnow() - timedelta(days=90)
+        for offset in range(0, complaints, 5000):
+            rows = []
+            for _ in range(min(5000, complaints - offset)):
+                row = synthetic_complaint(rng, texts)
+                row.update(id=str(uuid4()), user_id=rng.choice(user_ids), status=rng.choice(statuses),
+                           created_at=start + timedelta(seconds=rng.randint(0, 90 * 86400)))
+                complaint_ids.append(row["id"])
+                rows.append(row)
+            db.bulk_insert_mappings(Complaint, rows)
+            db.commit()
+    finally:
+        db.close()
+    return user_emails, admin_emails, complaint_ids
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def _cookie(token):
+    return {"Cookie": f"access_token_cookie={token}"}
+
+
+async def signin(http, email):
+    response = await http.post("/auth/signin", json={"email": email, "password": PASSWORD})
+    token = response.json().get("access_token") if response.status_code == 200 else None
+    return response, token
+
+
+class Client:
+    """One simulated browser session: a regular user plus, for admin operations, an admin."""
+
+    def __init__(self, http, rng, data, email, admin_email):
+        self.http = http
+        self.rng = rng
+        self.data = data
+        self.email = email
+        self.admin_email = admin_email
+        self.token = None
+        self.admin_token = None
+
+    async def login(self):
+        _, self.token = await signin(self.http, self.email)
+        _, self.admin_token = await signin(self.http, self.admin_email)
+        if not self.token or not self.admin_token:
+            raise RuntimeError("sign-in of a seeded account failed")
+
+    async def signin(self):
+        response, _ = await signin(self.http, self.rng.choice(self.data["users"]))
+        return response
+
+    async def create(self):
+        body = synthetic_complaint(self.rng, self.data["texts"])
+        return await self.http.post("/complaints/", json=body, headers=_cookie(self.token))
+
+    async def list_own(self):
+        return await self.http.get("/complaints/get-complaints", headers=_cookie(self.token))
+
+    async def admin_list(self):
+        params = {"limit": 50}
+        if self.rng.random() < 0.3:
+            params["status"] = self.rng.choice(["Pending", "In Progress", "Resolved"])
+        return await self.http.get("/complaints/get-all-complaints", params=params,
+                                   headers=_cookie(self.admin_token))
+
+    async def admin_update(self):
+        complaint_id = self.rng.choice(self.data["complaints"])
+        body = {"status": self.rng.choice(STATUS_KEYS)}
+        return await self.http.put(f"/complaints/update/{complaint_id}", json=body,
+                                   headers=_cookie(self.admin_token))
+
+
+async def _drive(client, names, weights, measure_from, deadline, samples, errors):
+    import httpx
+
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            return
+        name = client.rng.choices(names, weights)[0]
+        try:
+            response = await getattr(client, name)()
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if now >= measure_from:
+            samples[name].append(time.perf_counter() - now)
+            if not ok:
+                errors[name] += 1
+
+
+async def run_load(base_url, data, mix, concurrency, warmup, seconds, seed_value):
+    import httpx
+
+    names = [name for name in OPERATIONS if mix.get(name)]
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+        clients = [
+            Client(http, random.Random(seed_value * 1000 + i), data,
+                   data["users"][i % len(data["users"])], data["admins"][i % len(data["admins"])])
+            for i in range(concurrency)
+        ]
+        await asyncio.gather(*(client.login() for client in clients))
+        measure_from = time.perf_counter() + warmup
+        deadline = measure_from + seconds
+        await asyncio.gather(*(_drive(client, names, weights, measure_from, deadline, samples, errors)
+                               for client in clients))
+    return samples, errors
+
+
+def summarize(latencies, errors, seconds):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requestsPerSecond": round(len(latencies) / seconds, 1),
+        "meanMs": round(sum(latencies) / len(latencies) * 1e3, 2) if latencies else None,
+        "p50Ms": round(percentile(latencies, 50) * 1e3, 2),
+        "p95Ms": round(percentile(latencies, 95) * 1e3, 2),
+        "p99Ms": round(percentile(latencies, 99) * 1e3, 2),
+        "maxMs": round(max(latencies) * 1e3, 2) if latencies else None,
+    }
+
+
+def _commit():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "."))}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def _wait_ready(base_url, timeout=300):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if httpx.get(f"{base_url}/ready").status_code == 200:
+            return
+        time.sleep(0.5)
+    raise RuntimeError("models did not load")
+
+
+def compare(report, baseline):
+    """Lines describing how req/s and p99 moved against a baseline report."""
+    lines = [f"vs {baseline['run'].get('commit') or 'baseline'}:"]
+    rows = [("total", report["total"], baseline.get("total"))]
+    rows += [(name, stats, baseline.get("endpoints", {}).get(name)) for name, stats in report["endpoints"].items()]
+    for name, now, before in rows:
+        if not before or not before["requestsPerSecond"]:
+            continue
+        rps = (now["requestsPerSecond"] / before["requestsPerSecond"] - 1) * 100
+        p99 = (now["p99Ms"] / before["p99Ms"] - 1) * 100 if before["p99Ms"] else 0.0
+        lines.append(f"  {name:13s} req/s {before['requestsPerSecond']:8.1f} -> {now['requestsPerSecond']:8.1f} "
+                     f"({rps:+6.1f}%)  p99 {before['p99Ms']:8.2f} -> {now['p99Ms']:8.2f}ms ({p99:+6.1f}%)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--complaints", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation=weight list (default {DEFAULT_MIX})")
+    parser.add_argument("--classify-workers", type=int, default=1,
+                        help="classification threads in the server (0: complaints stay queued)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    use_temp_database()
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    users, admins, complaint_ids = seed(args.users, max(1, args.admins), args.complaints, rng)
+    print(f"seeded {len(users)} users, {len(admins)} admins, {len(complaint_ids)} complaints "
+          f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    data = {"users": users, "admins": admins, "complaints": complaint_ids, "texts": load_dataset_texts()}
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    classifying = args.classify_workers > 0
+    server = start_api_server(port, CLASSIFY_WORKERS=str(args.classify_workers),
+                              MODEL_WARMUP=str(classifying).lower())
+    try:
+        if classifying:
+            _wait_ready(base_url)
+        with RssSampler(server.pid) as rss:
+            samples, errors = asyncio.run(run_load(base_url, data, mix, args.concurrency,
+                                                   args.warmup, args.seconds, args.seed))
+        peak_rss_mb = proc_status_mb(server.pid, "VmHWM")
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = {
+        "run": {
+            **_commit(),
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "settings": {**vars(args), "mix": mix},
+        },
+        "total": summarize([s for latencies in samples.values() for s in latencies],
+                           sum(errors.values()), args.seconds),
+        "endpoints": {name: summarize(samples[name], errors[name], args.seconds) for name in samples},
+        "server": {"peakRssMb": round(peak_rss_mb, 1), "peakRssAnonMb": round(rss.peak_mb, 1)},
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    for name, stats in [("total", report["total"]), *report["endpoints"].items()]:
+        print(f"{name:13s} {stats['requestsPerSecond']:8.1f} req/s  p50 {stats['p50Ms']:8.2f}ms  "
+              f"p95 {stats['p95Ms']:8.2f}ms  p99 {stats['p99Ms']:8.2f}ms  errors {stats['errors']}", file=sys.stderr)
+    print(f"server peak RSS {peak_rss_mb:.1f}MiB", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print("\n".join(compare(report, json.load(f))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+# Before any app import: database.py and config.py read these at import time
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="rail-tests-"), "test.db")
+os.environ.setdefault("FLASK_JWT_SECRET_KEY", "test-secret")
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+
+@pytest.fixture
+def db():
+    """A session on the temporary database; every table is emptied afterwards."""
+    from website.app.pages.api.user.database import Base, SessionLocal, init_db
+
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    from website.app.pages.api.user.models import RoleEnum, User
+
+    user = User(id=str(uuid4()), name="test", email="test@example.com", phoneNumber="9000000000",
+                password="x", role=RoleEnum.user)
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def add_complaints(db, user):
+    """Insert complaints with the given created_at values; returns them in that order."""
+    from website.app.pages.api.user.models import Complaint
+
+    def add(created_ats, **values):
+        complaints = [
+            Complaint(id=str(uuid4()), user_id=user.id, trainNumber="12345", pnrNumber="1234567890",
+                      coachNumber="S1", seatNumber="1", sourceStation="NDLS", destinationStation="BCT",
+                      complaint="train is running late by 3 hours", created_at=created_at, **values)
+            for created_at in created_ats
+        ]
+        db.add_all(complaints)
+        db.commit()
+        return complaints
+
+    return add
+
+
+@pytest.fixture
+def now():
+    return datetime.utcnow().replace(microsecond=0)
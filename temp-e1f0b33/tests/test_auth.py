@@ -0,0 +1,57 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from website.app.pages.api.user import auth
+from website.app.pages.api.user.auth import TokenCache, create_access_token, token_cache, verify_token
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+def test_entry_expires_with_the_token(monkeypatch):
+    cache = TokenCache(10)
+    cache.set("t", 1000.0, "data")
+    monkeypatch.setattr(auth.time, "time", lambda: 999.0)
+    assert cache.get("t") == "data"
+    monkeypatch.setattr(auth.time, "time", lambda: 1000.0)
+    assert cache.get("t") is None
+    assert not cache._entries
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(2)
+    expires_at = time.time() + 60
+    cache.set("a", expires_at, 1)
+    cache.set("b", expires_at, 2)
+    assert cache.get("a") == 1
+    cache.set("c", expires_at, 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_size_zero_disables_the_cache():
+    cache = TokenCache(0)
+    cache.set("a", time.time() + 60, 1)
+    assert cache.get("a") is None
+
+
+def test_verify_token_caches_valid_tokens_only():
+    token = create_access_token({"sub": "u1", "role": "user"})
+    data, payload = verify_token(token)
+    assert data.user_id == "u1" and payload["role"] == "user"
+    assert token_cache.get(token) is data
+    assert verify_token(token)[0] is data
+
+    assert verify_token(token + "x") == (None, None)
+    assert token_cache.get(token + "x") is None
+
+
+def test_expired_token_is_rejected_and_not_cached():
+    token = create_access_token({"sub": "u1"}, expires_delta=timedelta(seconds=-1))
+    assert verify_token(token) == (None, None)
+    assert token_cache.get(token) is None
@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from website.app.pages.api.user import complaint as complaint_module
+from website.app.pages.api.user.auth import create_access_token
+from website.app.pages.api.user.models import Complaint, StatusEnum
+from website.app.pages.api.user.server import app
+
+
+def _client(role):
+    # No context manager: the lifespan (models, workers) is not needed here
+    client = TestClient(app)
+    client.cookies.set("access_token_cookie", create_access_token({"sub": "test-admin", "role": role}))
+    return client
+
+
+@pytest.fixture
+def admin():
+    return _client("admin")
+
+
+def _statuses(db):
+    db.expire_all()
+    return {c.id: c.status for c in db.query(Complaint)}
+
+
+def test_outcome_per_explicit_id(db, admin, add_complaints, now):
+    a, b = (c.id for c in add_complaints([now, now]))
+
+    response = admin.put("/complaints/bulk-update", json={"ids": [a, "missing", a, b], "status": "resolved"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["results"] == [
+        {"id": a, "status": "updated"},
+        {"id": "missing", "status": "notFound"},
+        {"id": b, "status": "updated"},
+    ]
+    assert (body["success"], body["updated"], body["notFound"]) == (False, 2, 1)
+    assert set(_statuses(db).values()) == {StatusEnum.resolved}
+
+
+def test_ids_spanning_several_chunks(db, admin, add_complaints, now, monkeypatch):
+    monkeypatch.setattr(complaint_module, "BULK_UPDATE_CHUNK_SIZE", 2)
+    ids = [c.id for c in add_complaints([now] * 5)]
+
+    body = admin.put("/complaints/bulk-update", json={"ids": ids, "resolution": "done"}).json()
+    assert body["success"] and [r["id"] for r in body["results"]] == ids
+    assert {r["status"] for r in body["results"]} == {"updated"}
+
+
+def test_filter_updates_only_matches_and_reports_counts(db, admin, add_complaints, now):
+    pending = add_complaints([now] * 2)
+    resolved = add_complaints([now], status=StatusEnum.resolved)
+
+    body = admin.put("/complaints/bulk-update",
+                     json={"filter": {"status": "pending"}, "status": "inProgress"}).json()
+    assert (body["updated"], body["notFound"]) == (2, 0) and "results" not in body
+    statuses = _statuses(db)
+    assert {statuses[c.id] for c in pending} == {StatusEnum.inProgress}
+    assert statuses[resolved[0].id] == StatusEnum.resolved
+
+
+@pytest.mark.parametrize("body", [
+    {"ids": ["x"], "filter": {"status": "pending"}, "status": "resolved"},
+    {"status": "resolved"},
+    {"filter": {}, "status": "resolved"},
+    {"ids": ["x"], "status": "closed"},
+    {"ids": ["x"]},
+])
+def test_bad_requests_are_rejected(db, admin, body):
+    assert admin.put("/complaints/bulk-update", json=body).status_code == 400
+
+
+def test_users_cannot_bulk_update(db, add_complaints, now):
+    ids = [c.id for c in add_complaints([now])]
+    assert _client("user").put("/complaints/bulk-update", json={"ids": ids, "status": "resolved"}).status_code == 403
+    assert set(_statuses(db).values()) == {StatusEnum.pending}
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from website.app.pages.api.user.filters import apply_keyset_page, decode_cursor, encode_cursor, split_page
+from website.app.pages.api.user.models import Complaint
+
+
+def _pages(db, limit):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = split_page(apply_keyset_page(db.query(Complaint), cursor, limit).all(), limit)
+        pages.append([row.id for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 10, 30, 0, 123456)
+    cursor = encode_cursor(created_at, "abc")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, "abc")
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "", encode_cursor(datetime(2024, 1, 1), "x")[:-3]])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_pages_cover_every_row_once_newest_first(db, add_complaints, now):
+    # Pairs share a created_at, so pages must also seek on the id
+    complaints = add_complaints([now - timedelta(minutes=i // 2) for i in range(7)])
+    expected = [c.id for c in sorted(complaints, key=lambda c: (c.created_at, c.id), reverse=True)]
+
+    pages = _pages(db, 3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == expected
+
+
+def test_last_full_page_has_no_cursor(db, add_complaints, now):
+    add_complaints([now - timedelta(minutes=i) for i in range(6)])
+
+    assert [len(page) for page in _pages(db, 3)] == [3, 3]
+    rows, cursor = split_page(apply_keyset_page(db.query(Complaint), None, 6).all(), 6)
+    assert len(rows) == 6 and cursor is None
+
+
+def test_empty_table_has_one_empty_page(db):
+    assert _pages(db, 3) == [[]]
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from website.app.pages.api.user import outbox
+from website.app.pages.api.user.models import ClassificationJob, JobStatusEnum
+from website.app.pages.api.user.outbox import (
+    backoff_seconds, claim_jobs, complete_jobs, enqueue_classification, fail_jobs, queue_depth,
+)
+
+
+@pytest.fixture
+def queued(db, add_complaints, now):
+    ids = [c.id for c in add_complaints([now] * 3)]
+    assert enqueue_classification(db, ids) == 3
+    db.commit()
+    return ids
+
+
+def _job(db, complaint_id):
+    db.expire_all()
+    return db.get(ClassificationJob, complaint_id)
+
+
+def test_enqueue_skips_complaints_already_queued(db, queued):
+    assert enqueue_classification(db, queued) == 0
+    assert enqueue_classification(db, []) == 0
+    assert queue_depth(db)["queued"] == 3
+
+
+def test_claim_leases_each_job_once(db, queued):
+    token, claimed = claim_jobs(db, "a", limit=2)
+    assert len(claimed) == 2
+    _, rest = claim_jobs(db, "b", limit=10)
+    assert set(claimed) | set(rest) == set(queued) and not set(claimed) & set(rest)
+    assert claim_jobs(db, "c", limit=10) == (None, [])
+
+    job = _job(db, claimed[0])
+    assert job.status == JobStatusEnum.running and job.locked_by == token and job.attempts == 1
+
+
+def test_expired_lease_is_claimed_again(db, queued):
+    first, claimed = claim_jobs(db, "a", limit=3)
+    db.query(ClassificationJob).update({ClassificationJob.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    second, reclaimed = claim_jobs(db, "b", limit=3)
+    assert sorted(reclaimed) == sorted(claimed)
+    assert _job(db, claimed[0]).attempts == 2
+
+    # The worker that lost its lease can no longer finish the jobs
+    complete_jobs(db, first, claimed)
+    db.commit()
+    assert queue_depth(db)["running"] == 3
+    complete_jobs(db, second, reclaimed)
+    db.commit()
+    assert sum(queue_depth(db).values()) == 0
+
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(outbox, "JOB_BACKOFF_BASE_SECONDS", 5)
+    monkeypatch.setattr(outbox, "JOB_BACKOFF_MAX_SECONDS", 600)
+    assert [backoff_seconds(n) for n in (0, 1, 2, 3, 8, 20)] == [5, 5, 10, 20, 600, 600]
+
+
+def test_failed_job_waits_for_its_backoff(db, queued, monkeypatch):
+    monkeypatch.setattr(outbox, "JOB_MAX_ATTEMPTS", 5)
+    token, claimed = claim_jobs(db, "a", limit=1)
+    before = datetime.utcnow()
+    fail_jobs(db, token, claimed, "boom")
+
+    job = _job(db, claimed[0])
+    assert job.status == JobStatusEnum.queued and job.locked_by is None and job.last_error == "boom"
+    assert job.available_at >= before + timedelta(seconds=backoff_seconds(1))
+    assert claimed[0] not in claim_jobs(db, "b", limit=10)[1]
+
+
+def test_job_out_of_attempts_is_parked_and_can_be_requeued(db, queued, monkeypatch):
+    monkeypatch.setattr(outbox, "JOB_MAX_ATTEMPTS", 1)
+    token, claimed = claim_jobs(db, "a", limit=3)
+    fail_jobs(db, token, claimed, "boom")
+    assert queue_depth(db)["failed"] == 3
+    assert claim_jobs(db, "b", limit=3) == (None, [])
+
+    assert enqueue_classification(db, queued[:1]) == 1
+    db.commit()
+    job = _job(db, queued[0])
+    assert job.status == JobStatusEnum.queued and job.attempts == 0
+    assert claim_jobs(db, "b", limit=3)[1] == queued[:1]
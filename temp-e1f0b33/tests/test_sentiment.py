@@ -0,0 +1,52 @@
+import time
+
+from utils.sentiment import SentimentEngine
+
+
+class FakeModel:
+    name = "transformer"
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.calls = []
+
+    def score(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(self.delays.pop(0) if self.delays else 0)
+        return [("POSITIVE", 0.9) for _ in texts]
+
+
+def test_model_is_used_again_after_one_slow_batch():
+    model = FakeModel([0.2])
+    engine = SentimentEngine(model, budget_ms=50, probe_interval=0, probe_size=2)
+
+    engine.score(["slow one"])
+    # 200ms per text is over the 50ms budget: the lexicon answers, but the
+    # probe still sends a couple of texts to the now fast model
+    results = engine.score(["a", "b", "c"])
+    assert model.calls[1] == ["a", "b"]
+    assert results[:2] == [("POSITIVE", 0.9)] * 2
+
+    engine.score(["d", "e", "f"])
+    assert model.calls[2] == ["d", "e", "f"]
+    assert engine.status()["scored"] == {"cache": 0, "transformer": 6, "lexicon": 1}
+
+
+def test_no_probe_before_the_interval():
+    model = FakeModel([0.2])
+    engine = SentimentEngine(model, budget_ms=50, probe_interval=3600)
+
+    engine.score(["slow one"])
+    engine.score(["a", "b"])
+    assert len(model.calls) == 1
+    assert engine.status()["scored"]["lexicon"] == 2
+
+
+def test_cached_texts_skip_the_model():
+    model = FakeModel([])
+    engine = SentimentEngine(model)
+
+    engine.score(["delayed by 3 hours"])
+    engine.score(["delayed by 3 hours ", "new"])
+    assert model.calls == [["delayed by 3 hours"], ["new"]]
+    assert engine.status()["scored"]["cache"] == 1
@@ -1,38 +1,214 @@
-import pandas as pd
+import argparse
+import os
+import threading
+import time
+
 from website.app.pages.api.user.models import Complaint
-from utils.ml_pipeline import pipeline as ml_pipeline, complain_map
-# from transformers import pipeline as hf_pipeline
+from utils.ml_pipeline import complain_map
+from utils.inference_service import inference_service, predict_labels_and_vectors, score_sentiment
+from utils.dedup import dedup_index
 from website.app.pages.api.user.database import SessionLocal
+from website.app.pages.api.user.stats import stats_cache
+from website.app.pages.api.user.outbox import claim_jobs, complete_jobs, fail_jobs
+from website.app.pages.api.user.events import event_hub
+from website.app.pages.api.user.metrics import observe_batch, observe_inference
+
+# Sentiment classifier: see utils.sentiment (local DistilBERT SST-2 in batches, lexicon fallback)
+
+# Number of complaints predicted and written back per round trip
+CLASSIFY_BATCH_SIZE = int(os.getenv("CLASSIFY_BATCH_SIZE", "256"))
+# Seconds the worker sleeps when there is nothing to classify
+CLASSIFY_POLL_INTERVAL = float(os.getenv("CLASSIFY_POLL_INTERVAL", "2"))
+# Worker threads draining the job queue inside the API process (0 disables)
+CLASSIFY_WORKERS = int(os.getenv("CLASSIFY_WORKERS", "1"))
+
+
+# What the classifier and the near-duplicate index read for each complaint
+CLASSIFY_COLUMNS = (Complaint.id, Complaint.user_id, Complaint.complaint, Complaint.trainNumber, Complaint.created_at)
+
+
+def fetch_unclassified(db, batch_size, user_id=None, after_id=None):
+    """Return up to ``batch_size`` rows to classify (see CLASSIFY_COLUMNS) that have no classification yet."""
+    query = db.query(*CLASSIFY_COLUMNS).filter(Complaint.classification.is_(None))
+    if user_id:
+        query = query.filter(Complaint.user_id == user_id)
+    if after_id:
+        query = query.filter(Complaint.id > after_id)
+    return query.order_by(Complaint.id).limit(batch_size).all()
+
+
+def classified_events(rows, mappings):
+    """complaint.classified payloads for rows and their classify_rows mappings."""
+    return [
+        {"id": row.id, "userId": row.user_id, "classification": m["classification"], "sentiment": m["sentiment"],
+         "sentimentScore": m["sentimentScore"], "clusterId": m["cluster_id"]}
+        for row, m in zip(rows, mappings)
+    ]
+
+
+def classify_rows(db, rows):
+    """Label, sentiment and near-duplicate cluster for each row, as bulk UPDATE mappings."""
+    texts = [row.complaint for row in rows]
+    observe_batch("worker", len(rows))
+    with observe_inference("worker", "classify"):
+        # The TF-IDF vectors for the near-duplicate index come from the same pass
+        predictions = inference_service.submit(predict_labels_and_vectors, texts, background=True).result()
+        labels = [complain_map[label] for label, _ in predictions]
+    with observe_inference("worker", "sentiment"):
+        sentiments = inference_service.submit(score_sentiment, texts, background=True).result()
+    with observe_inference("worker", "dedup"):
+        clusters = dedup_index.assign(db, rows, [vector for _, vector in predictions])
+    return [
+        {"id": row.id, "classification": label, "sentiment": sentiment, "sentimentScore": score,
+         "cluster_id": clusters[row.id]}
+        for row, label, (sentiment, score) in zip(rows, labels, sentiments)
+    ]
+
+
+def classify_pending_complaints(user_id=None, batch_size=CLASSIFY_BATCH_SIZE):
+    """Classify every unclassified complaint (optionally only one user's).
+
+    Rows are read in id order, predicted and clustered a batch at a time and
+    written back with one executemany UPDATE per batch. Returns the number
+    classified.
+    """
+    db = SessionLocal()
+    classified = 0
+    try:
+        last_id = None
+        while True:
+            rows = fetch_unclassified(db, batch_size, user_id=user_id, after_id=last_id)
+            if not rows:
+                break
+
+            mappings = classify_rows(db, rows)
+            db.bulk_update_mappings(Complaint, mappings)
+            db.commit()
+            event_hub.publish_complaints_threadsafe("complaint.classified", classified_events(rows, mappings))
+
+            classified += len(rows)
+            last_id = rows[-1].id
+    except Exception:
+        db.rollback()
+        dedup_index.clear()
+        raise
+    finally:
+        db.close()
+
+    if classified:
+        stats_cache.invalidate()
+    return classified
 
-# Sentiment classifier
-# sentiment_classifier = hf_pipeline("sentiment-analysis", framework="tf", model="distilbert-base-uncased-finetuned-sst-2-english")
 
 def classify_user_complaints(user_id):
     """Classify only the current logged-in user's unclassified complaints."""
     print(f"Classifying complaints for user {user_id}")
+    return classify_pending_complaints(user_id=user_id)
+
+
+def process_classification_jobs(worker_id, batch_size=CLASSIFY_BATCH_SIZE):
+    """Claim one batch of queued jobs, classify it and record the outcome.
+
+    Results and job completion are committed together; on error the jobs
+    are released for a retry with backoff. Returns the number of jobs claimed.
+    """
+    db = SessionLocal()
+    try:
+        token, complaint_ids = claim_jobs(db, worker_id, batch_size)
+        if not complaint_ids:
+            return 0
+
+        try:
+            rows = db.query(*CLASSIFY_COLUMNS).filter(
+                Complaint.id.in_(complaint_ids)
+            ).all()
+            mappings = classify_rows(db, rows) if rows else []
+            if mappings:
+                db.bulk_update_mappings(Complaint, mappings)
+            # Jobs for complaints deleted in the meantime are simply dropped
+            complete_jobs(db, token, complaint_ids)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # Cluster assignments of the batch were not saved either
+            dedup_index.clear()
+            print(f"Error classifying batch in {worker_id}: {e}")
+            fail_jobs(db, token, complaint_ids, str(e))
+            return len(complaint_ids)
+
+        stats_cache.invalidate()
+        event_hub.publish_complaints_threadsafe("complaint.classified", classified_events(rows, mappings))
+        return len(complaint_ids)
+    finally:
+        db.close()
+
+
+class ClassificationWorkerPool:
+    """Fixed number of threads draining the classification job queue.
+
+    Each thread claims at most ``batch_size`` jobs at a time and sleeps for
+    ``poll_interval`` when the queue is empty, which bounds how much CPU the
+    pool can take from the process it runs in.
+    """
+
+    def __init__(self, size=CLASSIFY_WORKERS, batch_size=CLASSIFY_BATCH_SIZE,
+                 poll_interval=CLASSIFY_POLL_INTERVAL):
+        self.size = size
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._stop.clear()
+        prefix = f"classifier-{os.getpid()}"
+        for i in range(self.size):
+            thread = threading.Thread(target=self._run, args=(f"{prefix}-{i}",), name=f"{prefix}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
 
-    from website.app.pages.api.user.server import app as flask_app
-    with flask_app.app_context():
-        # unclassified = Complaint.query.filter_by(user_id=user_id, classification=None).all()
-        
-        # for complaint in unclassified:
-        #     db = SessionLocal()
-        #     try:
-        #         complain_series = pd.Series([complaint.complaint])
-        #         predicted_result = int(ml_pipeline.predict(complain_series)[0])
-        #         category = complain_map[predicted_result]
-        #         complaint.classification = category
+    def _run(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                claimed = process_classification_jobs(worker_id, self.batch_size)
+            except Exception as e:
+                print(f"Error in classification worker {worker_id}: {e}")
+                claimed = 0
+            if not claimed:
+                self._stop.wait(self.poll_interval)
 
-        #         sentiment_result = sentiment_classifier(complaint.complaint)[0]
-        #         complaint.sentiment = sentiment_result["label"]
-        #         complaint.sentimentScore = sentiment_result["score"]
 
-        #         db.session.commit()
+def run_backfill(batch_size=CLASSIFY_BATCH_SIZE):
+    """Classify rows that were never queued (e.g. created before the job queue existed)."""
+    started = time.perf_counter()
+    classified = classify_pending_complaints(batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Classified {classified} complaints in {elapsed:.2f}s "
+          f"({classified / elapsed if elapsed else 0:.0f} complaints/s)")
 
-        #     except Exception as e:
-        #         print(f"Error classifying complaint ID {complaint.id}: {e}")
-        #     finally:
-        #         db.close()
 
-        pass
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify complaints in batches.")
+    parser.add_argument("--workers", type=int, default=max(CLASSIFY_WORKERS, 1))
+    parser.add_argument("--batch-size", type=int, default=CLASSIFY_BATCH_SIZE)
+    parser.add_argument("--poll-interval", type=float, default=CLASSIFY_POLL_INTERVAL)
+    parser.add_argument("--backfill", action="store_true",
+                        help="scan the complaint table for unclassified rows once and exit")
+    args = parser.parse_args()
 
+    if args.backfill:
+        run_backfill(args.batch_size)
+    else:
+        pool = ClassificationWorkerPool(args.workers, args.batch_size, args.poll_interval)
+        pool.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pool.stop()
@@ -42,20 +42,28 @@
 
 import pandas as pd
 import numpy as np
+import os
 import re
-import nltk
 import ssl
+import threading
+from functools import lru_cache
+
+# Whether load_nltk() may download missing NLTK data (it can hit the network)
+NLTK_DOWNLOAD = os.getenv("NLTK_DOWNLOAD", "True").lower() == "true"
 
 # Handle SSL certificate issues that can occur in some environments
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
+def _allow_unverified_https():
+    try:
+        _create_unverified_https_context = ssl._create_unverified_context
+    except AttributeError:
+        pass
+    else:
+        ssl._create_default_https_context = _create_unverified_https_context
 
 # Function to safely download NLTK resources
 def download_nltk_resources():
+    import nltk
+
     resources = ['stopwords', 'punkt', 'wordnet', 'omw-1.4']
     for resource in resources:
         try:
@@ -63,40 +71,69 @@ def download_nltk_resources():
                           f'corpora/{resource}' if resource in ['stopwords', 'wordnet', 'omw-1.4'] else resource)
         except LookupError:
             print(f"Downloading {resource}...")
+            _allow_unverified_https()
             nltk.download(resource, quiet=True)
 
-# Download necessary NLTK resources
-download_nltk_resources()
-
-# Import NLTK components after ensuring resources are available
-try:
-    from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize
-    from nltk.stem import WordNetLemmatizer
-    
-    stop_words = set(stopwords.words('english'))
-    lemmatizer = WordNetLemmatizer()
-except Exception as e:
-    print(f"Error loading NLTK resources: {e}")
-    # Fallback: create basic implementations
-    stop_words = {'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours', 
-                  'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers', 
-                  'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 
-                  'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are', 
-                  'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 
-                  'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 
-                  'while', 'of', 'at', 'by', 'for', 'with', 'through', 'during', 'before', 'after', 
-                  'above', 'below', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 
-                  'further', 'then', 'once'}
-    
-    def word_tokenize(text):
-        return re.findall(r'\b\w+\b', text.lower())
-    
-    class SimpleWordNetLemmatizer:
-        def lemmatize(self, word):
-            return word
-    
-    lemmatizer = SimpleWordNetLemmatizer()
+# Fallback: basic implementations used when the NLTK data cannot be loaded
+FALLBACK_STOP_WORDS = {'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours', 
+                       'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers', 
+                       'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 
+                       'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are', 
+                       'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 
+                       'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 
+                       'while', 'of', 'at', 'by', 'for', 'with', 'through', 'during', 'before', 'after', 
+                       'above', 'below', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 
+                       'further', 'then', 'once'}
+
+def fallback_word_tokenize(text):
+    return re.findall(r'\b\w+\b', text.lower())
+
+class SimpleWordNetLemmatizer:
+    def lemmatize(self, word):
+        return word
+
+# NLTK components, set by load_nltk() on first use rather than at import
+stop_words = None
+word_tokenize = None
+lemmatizer = None
+_nltk_lock = threading.Lock()
+
+def load_nltk(download=NLTK_DOWNLOAD):
+    """
+    Load the NLTK stopwords, tokenizer and lemmatizer once.
+
+    Missing data is downloaded first when ``download`` is true; if it still
+    cannot be loaded, the fallback implementations above are used.
+    """
+    global stop_words, word_tokenize, lemmatizer
+    if stop_words is not None:
+        return
+    with _nltk_lock:
+        if stop_words is not None:
+            return
+
+        # Download necessary NLTK resources
+        if download:
+            try:
+                download_nltk_resources()
+            except Exception as e:
+                print(f"Error downloading NLTK resources: {e}")
+
+        # Import NLTK components after ensuring resources are available
+        try:
+            from nltk.corpus import stopwords
+            from nltk.tokenize import word_tokenize as nltk_word_tokenize
+            from nltk.stem import WordNetLemmatizer
+
+            loaded = (set(stopwords.words('english')), nltk_word_tokenize, WordNetLemmatizer())
+        except Exception as e:
+            print(f"Error loading NLTK resources: {e}")
+            loaded = (FALLBACK_STOP_WORDS, fallback_word_tokenize, SimpleWordNetLemmatizer())
+
+        # stop_words doubles as the "loaded" flag, so it is assigned last
+        word_tokenize, lemmatizer = loaded[1], loaded[2]
+        _lemmatize.cache_clear()
+        stop_words = loaded[0]
 
 def clean_text(text):
     """
@@ -108,6 +145,8 @@ def clean_text(text):
     Returns:
         str: Cleaned and preprocessed text
     """
+    load_nltk()
+
     # Handle null values
     if pd.isna(text) or text is None:
         return ""
@@ -147,6 +186,101 @@ def clean_text(text):
     
     return ' '.join(cleaned_tokens)
 
+# Precompiled patterns for the batch cleaner. Mentions go first, as in
+# clean_text; digits and punctuation are plain character removals, so one
+# pass removes exactly what the two sequential passes do.
+_MENTION_RE = re.compile(r'@\w+')
+_NOISE_RE = re.compile(r'[^\w\s]+|\d+')
+_FALLBACK_TOKEN_RE = re.compile(r'\b\w+\b')
+
+# On text that contains only word characters and single spaces, NLTK's word
+# tokenizer reduces to a whitespace split plus these contraction splits
+_TREEBANK_SPLIT_RE = re.compile(
+    r'(?i)\b(?:(can)(not)|(gim)(me)|(gon)(na)|(got)(ta)|(lem)(me))\b|\b(wan)(na)(?=\s)'
+)
+
+LEMMA_CACHE_SIZE = 100_000
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _lemmatize(word):
+    try:
+        return lemmatizer.lemmatize(word)
+    except Exception:
+        return word
+
+
+def _split_contractions(match):
+    return ' ' + ' '.join(group for group in match.groups() if group) + ' '
+
+
+def _treebank_tokens(words):
+    return _TREEBANK_SPLIT_RE.sub(_split_contractions, ' ' + ' '.join(words) + ' ').split()
+
+
+def _fallback_tokens(words):
+    text = ' '.join(words).lower()
+    # Lower-cased ASCII words stay word characters, so the regex is a plain split
+    return text.split() if text.isascii() else _FALLBACK_TOKEN_RE.findall(text)
+
+
+_batch_tokenizer = None
+
+
+def _get_batch_tokenizer():
+    """Pick the tokenizer that reproduces what clean_text would use.
+
+    ``word_tokenize`` is either NLTK's (which fails at call time if the punkt
+    data is missing, and clean_text then falls back to a regex) or
+    ``fallback_word_tokenize``, so probe it once.
+    """
+    global _batch_tokenizer
+    if _batch_tokenizer is None:
+        try:
+            word_tokenize("probe")
+            uses_nltk = getattr(word_tokenize, "__module__", "").startswith("nltk")
+        except Exception:
+            uses_nltk = False
+        _batch_tokenizer = _treebank_tokens if uses_nltk else _fallback_tokens
+    return _batch_tokenizer
+
+
+def _clean_one(text, tokenize):
+    if text is None:
+        return ""
+    if not isinstance(text, str):
+        if pd.isna(text):
+            return ""
+        text = str(text)
+
+    # split() also collapses and strips whitespace like clean_text's \s+ pass
+    words = _NOISE_RE.sub('', _MENTION_RE.sub('', text)).split()
+
+    cleaned_tokens = []
+    for word in tokenize(words):
+        word_lower = word.lower()
+        if word_lower not in stop_words and len(word_lower) > 1:
+            cleaned_tokens.append(_lemmatize(word_lower))
+    return ' '.join(cleaned_tokens)
+
+
+def clean_texts(texts):
+    """
+    Clean a batch of texts; the result for each item is identical to clean_text.
+
+    Uses precompiled regexes, a regex tokenizer instead of NLTK's sentence and
+    word tokenizers, and memoized lemmatization.
+
+    Args:
+        texts (list or pd.Series): Input texts
+
+    Returns:
+        list: Cleaned text for each input, in order
+    """
+    load_nltk()
+    tokenize = _get_batch_tokenizer()
+    return [_clean_one(text, tokenize) for text in texts]
+
 # Alternative function that doesn't rely on NLTK (backup option)
 def clean_text_simple(text):
     """
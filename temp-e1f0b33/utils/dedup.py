@@ -0,0 +1,158 @@
+"""Near-duplicate complaint clustering over the classifier's TF-IDF vectors.
+
+Passengers on one train tend to report the same problem many times on the
+same day, so candidates are only searched within a bucket of
+(trainNumber, day). Inside a bucket an inverted index maps each term to
+the members containing it, and a new complaint joins the cluster of the
+most similar member if their cosine similarity reaches DEDUP_SIMILARITY.
+Otherwise it starts a cluster whose id is its own complaint id. The cost
+of one insertion depends on the size of its bucket, not of the table.
+
+Buckets are kept in memory (LRU, DEDUP_MAX_BUCKETS). A bucket missing from
+memory, e.g. after a restart, is reloaded from the complaints of that train
+and day that already have a cluster id.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from website.app.pages.api.user.models import Complaint
+
+# Cosine similarity from which two complaints are treated as the same report
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.8"))
+# (train, day) buckets held in memory
+DEDUP_MAX_BUCKETS = int(os.getenv("DEDUP_MAX_BUCKETS", "4096"))
+# Members compared per bucket; the oldest fall out first
+DEDUP_MAX_BUCKET_SIZE = int(os.getenv("DEDUP_MAX_BUCKET_SIZE", "5000"))
+
+
+def bucket_key(train_number, created_at):
+    return (train_number, created_at.date())
+
+
+class _Bucket:
+    __slots__ = ("cluster_ids", "postings", "size")
+
+    def __init__(self):
+        self.cluster_ids = {}  # member index -> cluster id
+        self.postings = {}     # term id -> [(member index, weight)]
+        self.size = 0
+
+    def best_match(self, vector):
+        """(cluster id, similarity) of the most similar live member, or (None, 0.0)."""
+        cluster_ids = self.cluster_ids
+        scores = {}
+        for term, weight in vector.items():
+            for member, member_weight in self.postings.get(term, ()):
+                if member in cluster_ids:
+                    scores[member] = scores.get(member, 0.0) + weight * member_weight
+        if not scores:
+            return None, 0.0
+        member = max(scores, key=scores.get)
+        return cluster_ids[member], scores[member]
+
+    def add(self, vector, cluster_id):
+        member = self.size
+        self.size += 1
+        self.cluster_ids[member] = cluster_id
+        for term, weight in vector.items():
+            self.postings.setdefault(term, []).append((member, weight))
+        oldest = member - DEDUP_MAX_BUCKET_SIZE
+        if oldest >= 0:
+            del self.cluster_ids[oldest]
+            # Evicted members are skipped by best_match; their postings are
+            # dropped in one pass every DEDUP_MAX_BUCKET_SIZE evictions
+            if (oldest + 1) % DEDUP_MAX_BUCKET_SIZE == 0:
+                self.postings = {
+                    term: live for term, postings in self.postings.items()
+                    if (live := [(m, w) for m, w in postings if m > oldest])
+                }
+
+
+class NearDuplicateIndex:
+    """In-memory, per-process index of recent complaints bucketed by train and day.
+
+    ``vectorize(texts)`` returns one ``{term id: weight}`` dict per text,
+    l2-normalised, so a dot product is the cosine similarity.
+    """
+
+    def __init__(self, vectorize=None, threshold=DEDUP_SIMILARITY, max_buckets=DEDUP_MAX_BUCKETS):
+        self._vectorize = vectorize or tfidf_vectors
+        self.threshold = threshold
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, db, key):
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+            return bucket
+        bucket = _Bucket()
+        if db is not None:
+            train_number, day = key
+            start = datetime.combine(day, datetime.min.time())
+            rows = db.query(Complaint.cluster_id, Complaint.complaint).filter(
+                Complaint.trainNumber == train_number,
+                Complaint.created_at >= start,
+                Complaint.created_at < start + timedelta(days=1),
+                Complaint.cluster_id.isnot(None),
+            ).order_by(Complaint.created_at.desc()).limit(DEDUP_MAX_BUCKET_SIZE).all()
+            if rows:
+                rows.reverse()
+                for row, vector in zip(rows, self._vectorize([row.complaint for row in rows])):
+                    bucket.add(vector, row.cluster_id)
+        self._buckets[key] = bucket
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def assign(self, db, rows, vectors=None):
+        """Cluster ids for rows with ``id``, ``complaint``, ``trainNumber`` and ``created_at``.
+
+        ``vectors``, one per row in the given order, saves vectorizing the
+        texts again. Rows are taken oldest first, so the earliest report of
+        a problem names its cluster. Returns {complaint id: cluster id}; the
+        caller writes them back.
+        """
+        if vectors is None:
+            vectors = self._vectorize([row.complaint for row in rows])
+        pairs = sorted(zip(rows, vectors), key=lambda pair: pair[0].created_at)
+        clusters = {}
+        with self._lock:
+            for row, vector in pairs:
+                bucket = self._bucket(db, bucket_key(row.trainNumber, row.created_at))
+                cluster_id, similarity = bucket.best_match(vector)
+                if cluster_id is None or similarity < self.threshold:
+                    cluster_id = row.id
+                bucket.add(vector, cluster_id)
+                clusters[row.id] = cluster_id
+        return clusters
+
+    def clear(self):
+        """Forget every bucket, e.g. after assignments were rolled back."""
+        with self._lock:
+            self._buckets.clear()
+
+
+def tfidf_vectors(texts):
+    """The classifier's TF-IDF vector of each raw text as a {term id: weight} dict."""
+    from utils.cleaner import clean_texts
+    from utils.ml_pipeline import get_engine
+
+    engine = get_engine()
+    tokens = engine.tokenize(clean_texts(texts))
+    return engine.vector_dicts(engine.vectorize_tokens(tokens), len(tokens))
+
+
+def service_vectors(texts):
+    """``tfidf_vectors`` run by utils.inference_service, i.e. in an inference process when there are any."""
+    from utils.inference_service import inference_service
+
+    return inference_service.submit(tfidf_vectors, texts, background=True).result()
+
+
+# Bucket reloads vectorize through the inference service; new complaints
+# arrive with vectors computed along with their labels (see utils.classifier)
+dedup_index = NearDuplicateIndex(vectorize=service_vectors)
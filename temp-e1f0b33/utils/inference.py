@@ -0,0 +1,128 @@
+"""TF-IDF + MultinomialNB inference in plain NumPy.
+
+The deployed model is a TfidfVectorizer (unigrams, raw counts, smooth idf,
+l2 norm) followed by MultinomialNB, i.e. a sparse dot product and an argmax.
+Scoring it directly avoids sklearn's Pipeline and validation overhead,
+which dominates when classifying one complaint at a time.
+"""
+import re
+
+import numpy as np
+
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+class InferenceEngine:
+    """Scores cleaned complaint text against precomputed model arrays.
+
+    ``feature_log_prob`` is term-major, shape (n_features, n_classes), so the
+    rows for a document's terms are gathered with one fancy-indexing call.
+    """
+
+    def __init__(self, vocabulary, idf, feature_log_prob, class_log_prior, classes,
+                 lowercase=True, token_pattern=DEFAULT_TOKEN_PATTERN):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.feature_log_prob = feature_log_prob
+        self.class_log_prior = class_log_prior
+        self.classes = classes
+        self.lowercase = lowercase
+        self.token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        """Engine over a ModelBundle's (memory-mapped) arrays."""
+        return cls(
+            bundle.vocabulary, bundle.idf, bundle.feature_log_prob,
+            bundle.class_log_prior, bundle.classes,
+            lowercase=bundle.lowercase, token_pattern=bundle.token_re.pattern,
+        )
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, classifier):
+        """Engine built from the fitted sklearn objects (used when no bundle is exported)."""
+        return cls(
+            dict(vectorizer.vocabulary_),
+            np.asarray(vectorizer.idf_, dtype=np.float64),
+            np.ascontiguousarray(classifier.feature_log_prob_.T, dtype=np.float64),
+            np.asarray(classifier.class_log_prior_, dtype=np.float64),
+            np.asarray(classifier.classes_),
+            lowercase=vectorizer.lowercase, token_pattern=vectorizer.token_pattern,
+        )
+
+    def tokenize(self, cleaned_texts):
+        """Split cleaned texts the way the fitted vectorizer's analyzer does."""
+        if self.lowercase:
+            return [self.token_re.findall(text.lower()) for text in cleaned_texts]
+        return [self.token_re.findall(text) for text in cleaned_texts]
+
+    def vectorize_tokens(self, token_lists):
+        """Build l2-normalised TF-IDF rows in coordinate form.
+
+        Returns (rows, columns, weights) for the non-zero entries; tokens
+        outside the vocabulary are ignored, as in TfidfVectorizer.
+        """
+        vocabulary = self.vocabulary
+        n_features = len(self.idf)
+        rows, columns = [], []
+        for row, tokens in enumerate(token_lists):
+            ids = [vocabulary[token] for token in tokens if token in vocabulary]
+            columns.extend(ids)
+            rows.extend([row] * len(ids))
+        if not columns:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty, np.empty(0, dtype=np.float64)
+
+        # Term counts per (row, column) pair
+        keys, counts = np.unique(np.asarray(rows, dtype=np.int64) * n_features + np.asarray(columns, dtype=np.int64),
+                                 return_counts=True)
+        rows = keys // n_features
+        columns = keys % n_features
+        weights = counts * self.idf[columns]
+
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(token_lists)))
+        weights /= norms[rows]
+        return rows, columns, weights
+
+    @staticmethod
+    def vector_dicts(coordinates, n_rows):
+        """Rows from ``vectorize_tokens`` as one {column: weight} dict per text."""
+        rows, columns, weights = coordinates
+        vectors = [{} for _ in range(n_rows)]
+        for row, column, weight in zip(rows.tolist(), columns.tolist(), weights.tolist()):
+            vectors[row][column] = weight
+        return vectors
+
+    def _joint_log_likelihood(self, coordinates, n_rows):
+        rows, columns, weights = coordinates
+        scores = np.tile(self.class_log_prior, (n_rows, 1))
+        if len(columns):
+            np.add.at(scores, rows, weights[:, None] * self.feature_log_prob[columns])
+        return scores
+
+    def joint_log_likelihood_tokens(self, token_lists):
+        return self._joint_log_likelihood(self.vectorize_tokens(token_lists), len(token_lists))
+
+    def predict_tokens(self, token_lists):
+        return self.classes[np.argmax(self.joint_log_likelihood_tokens(token_lists), axis=1)]
+
+    def predict_with_vectors_tokens(self, token_lists):
+        """Class ids and the TF-IDF vectors (as dicts) they were scored from, vectorizing once."""
+        coordinates = self.vectorize_tokens(token_lists)
+        scores = self._joint_log_likelihood(coordinates, len(token_lists))
+        return self.classes[np.argmax(scores, axis=1)], self.vector_dicts(coordinates, len(token_lists))
+
+    def predict_proba_tokens(self, token_lists):
+        scores = self.joint_log_likelihood_tokens(token_lists)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, cleaned_texts):
+        """Class ids for texts already passed through utils.cleaner."""
+        return self.predict_tokens(self.tokenize(cleaned_texts))
+
+    def predict_proba(self, cleaned_texts):
+        """Class probabilities, columns ordered as ``self.classes``."""
+        return self.predict_proba_tokens(self.tokenize(cleaned_texts))
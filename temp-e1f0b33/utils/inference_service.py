@@ -0,0 +1,241 @@
+"""Complaint classification in worker processes, outside the API's GIL.
+
+Cleaning and scoring a batch is pure-Python CPU work. In a thread of the
+API process it holds the GIL that request handling needs, so a large
+reclassification run slows every request. With INFERENCE_PROCESSES > 0 the
+work runs in a ProcessPoolExecutor instead. Each process loads the
+vectorizer, model and sentiment scorer once (in its initializer) and runs
+at INFERENCE_NICE, so the API process wins the CPU when both want it.
+
+``submit()`` returns a concurrent.futures.Future. The async helpers wrap
+it for the event loop, and worker threads call ``.result()``. Batches are
+split into chunks of INFERENCE_CHUNK_SIZE texts, and background batches
+(the classification worker) may occupy at most ``processes - 1``
+processes. So a preview request from ``POST /complaints/classify`` waits
+for at most one chunk, however large the backlog.
+
+With INFERENCE_PROCESSES=0 (the default) nothing changes: background
+batches run in the calling thread and interactive ones in one helper
+thread, as before.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Worker processes for inference (0: run in the API process)
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", "0"))
+# Texts per task sent to a process
+INFERENCE_CHUNK_SIZE = int(os.getenv("INFERENCE_CHUNK_SIZE", "64"))
+# Niceness added to the inference processes
+INFERENCE_NICE = int(os.getenv("INFERENCE_NICE", "10"))
+# forkserver/spawn start the processes from a clean interpreter rather than forking the threaded API
+INFERENCE_START_METHOD = os.getenv("INFERENCE_START_METHOD", "forkserver")
+
+
+def _watch_parent(pid):
+    # The pool's pipes are shared with the process itself, so it would never
+    # notice the API process being killed; exit when it is gone
+    while True:
+        time.sleep(1)
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            os._exit(0)
+
+
+def _init_process(nice, parent_pid):
+    if nice:
+        os.nice(nice)
+    threading.Thread(target=_watch_parent, args=(parent_pid,), daemon=True).start()
+    from utils.ml_pipeline import registry, get_sentiment_engine
+
+    registry.warmup(background=False)
+    get_sentiment_engine()
+
+
+def _ready():
+    return os.getpid()
+
+
+def predict_labels(texts):
+    """Class id per raw text."""
+    from utils.ml_pipeline import predict_texts
+
+    return [int(p) for p in predict_texts(texts)]
+
+
+def predict_labels_and_vectors(texts):
+    """(class id, TF-IDF vector for utils.dedup) per raw text, from one cleaning and vectorizing pass."""
+    from utils.cleaner import clean_texts
+    from utils.ml_pipeline import get_engine
+
+    engine = get_engine()
+    labels, vectors = engine.predict_with_vectors_tokens(engine.tokenize(clean_texts(texts)))
+    return [(int(label), vector) for label, vector in zip(labels, vectors)]
+
+
+def predict_with_probabilities(texts):
+    from utils.ml_pipeline import classify_with_probabilities
+
+    return classify_with_probabilities(texts)
+
+
+def score_sentiment(texts):
+    from utils.ml_pipeline import get_sentiment_engine
+
+    return get_sentiment_engine().score(texts)
+
+
+def _combine(futures):
+    """One future for the concatenated results of chunk futures, in order."""
+    combined = Future()
+    results = [None] * len(futures)
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(index, future):
+        if combined.done():
+            return
+        if future.cancelled() or future.exception() is not None:
+            error = future.exception() if not future.cancelled() else RuntimeError("inference cancelled")
+            with lock:
+                if not combined.done():
+                    combined.set_exception(error)
+            return
+        results[index] = future.result()
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0 and not combined.done():
+                combined.set_result([item for chunk in results for item in chunk])
+
+    for index, future in enumerate(futures):
+        future.add_done_callback(lambda f, i=index: done(i, f))
+    return combined
+
+
+class InferenceService:
+    def __init__(self, processes=INFERENCE_PROCESSES, chunk_size=INFERENCE_CHUNK_SIZE,
+                 nice=INFERENCE_NICE, start_method=INFERENCE_START_METHOD):
+        self.processes = processes
+        self.chunk_size = max(1, chunk_size)
+        self.nice = nice
+        self.start_method = start_method
+        self._pool = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._background_slots = threading.BoundedSemaphore(max(1, processes - 1))
+        self._pending = 0
+        self._warmup = []
+
+    @property
+    def running(self):
+        return self._pool is not None
+
+    @property
+    def ready(self):
+        """Every process has loaded the models."""
+        return self.running and all(f.done() and not f.exception() for f in self._warmup)
+
+    @property
+    def pending(self):
+        """Chunks submitted to the processes and not finished yet."""
+        return self._pending
+
+    def start(self):
+        """Start the processes; they load the models right away, in parallel."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+            if self.processes <= 0 or self._pool is not None:
+                return
+            self._pool = self._new_pool()
+
+    def _new_pool(self):
+        """A process pool whose processes start loading the models right away; ``ready`` follows them."""
+        context = multiprocessing.get_context(self.start_method)
+        pool = ProcessPoolExecutor(self.processes, mp_context=context,
+                                   initializer=_init_process, initargs=(self.nice, os.getpid()))
+        self._warmup = [pool.submit(_ready) for _ in range(self.processes)]
+        return pool
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            thread, self._thread = self._thread, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if thread is not None:
+            thread.shutdown(wait=False)
+
+    def _submit_chunk(self, fn, chunk, background):
+        if background:
+            # Blocks the calling worker thread while the background share of processes is busy
+            self._background_slots.acquire()
+        try:
+            with self._lock:
+                pool = self._pool
+                if pool is None:
+                    raise RuntimeError("inference service stopped")
+                try:
+                    future = pool.submit(fn, chunk)
+                except BrokenProcessPool:
+                    # A process died (e.g. OOM-killed); release the broken pool's
+                    # threads and pipes and start a fresh one for this and later chunks
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = pool = self._new_pool()
+                    future = pool.submit(fn, chunk)
+                self._pending += 1
+        except BaseException:
+            if background:
+                self._background_slots.release()
+            raise
+
+        def finished(_):
+            with self._lock:
+                self._pending -= 1
+            if background:
+                self._background_slots.release()
+
+        future.add_done_callback(finished)
+        return future
+
+    def submit(self, fn, texts, background=False):
+        """Future of ``fn(texts)`` for a module-level ``fn`` taking and returning a list.
+
+        ``background=True`` is for bulk work: without processes it runs in
+        the calling thread, and with them it can block the caller until a
+        process is free for it.
+        """
+        texts = list(texts)
+        if self._pool is None:
+            if background or self._thread is None:
+                future = Future()
+                try:
+                    future.set_result(fn(texts))
+                except Exception as e:
+                    future.set_exception(e)
+                return future
+            return self._thread.submit(fn, texts)
+        if not texts:
+            future = Future()
+            future.set_result([])
+            return future
+        chunks = [texts[start:start + self.chunk_size] for start in range(0, len(texts), self.chunk_size)]
+        return _combine([self._submit_chunk(fn, chunk, background) for chunk in chunks])
+
+    async def classify_with_probabilities(self, texts):
+        """Awaitable ``classify_with_probabilities`` (the /complaints/classify preview)."""
+        return await asyncio.wrap_future(self.submit(predict_with_probabilities, texts))
+
+    async def predict(self, texts):
+        return await asyncio.wrap_future(self.submit(predict_labels, texts))
+
+    def status(self):
+        return {"processes": self.processes if self.running else 0, "ready": self.ready, "pending": self._pending}
+
+
+inference_service = InferenceService()
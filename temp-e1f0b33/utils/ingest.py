@@ -0,0 +1,228 @@
+"""Bulk complaint ingestion from NDJSON or CSV.
+
+Records are validated with ComplaintCreate, inserted with one executemany
+INSERT per chunk and queued for classification in the same transaction, so
+a chunk is either fully imported and queued or not at all.
+
+    python -m utils.ingest complaints.ndjson --user-id <id>
+    python -m utils.ingest notebook/data/dataset.csv --user-id <id> \\
+        --map complaint=SentimentText --set trainNumber=12345 ...
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+
+from website.app.pages.api.user.database import SessionLocal, init_db
+from website.app.pages.api.user.models import Complaint, StatusEnum
+from website.app.pages.api.user.outbox import enqueue_classification
+from website.app.pages.api.user.schemas import ComplaintCreate
+from website.app.pages.api.user.stats import stats_cache
+
+# Rows per transaction
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "1000"))
+# Errors kept in the returned report; the CLI error file gets all of them
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("ndjson", "csv")
+
+
+class IngestReport:
+    """Counters for one import; ``on_error`` sees every rejected row, ``errors`` only the first few."""
+
+    def __init__(self, on_error=None):
+        self.on_error = on_error
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.received / self.seconds if self.seconds else 0.0
+
+    def add_error(self, line, error, record):
+        entry = {"line": line, "error": error, "record": record}
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(entry)
+        if self.on_error:
+            self.on_error(entry)
+
+    def as_dict(self):
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "seconds": round(self.seconds, 3),
+            "rowsPerSecond": round(self.rows_per_second, 1),
+            "errors": self.errors,
+        }
+
+
+def detect_format(filename=None, content_type=None):
+    if content_type and "csv" in content_type:
+        return "csv"
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def read_records(stream, fmt):
+    """Yield (line number, record dict) from a text stream without reading it all."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            record = {"_raw": line, "_error": f"Invalid JSON: {e}"}
+        yield line_number, record
+
+
+def _format_validation_error(e: ValidationError):
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'record'}: {err['msg']}" for err in e.errors()
+    )
+
+
+def validate_chunk(chunk, user_id, report):
+    """ComplaintCreate-validate a chunk of (line, record); returns (line, insert mapping) for the valid rows."""
+    now = datetime.utcnow()
+    mappings = []
+    for line, record in chunk:
+        if not isinstance(record, dict):
+            report.add_error(line, "Record must be an object", record)
+            continue
+        if "_error" in record:
+            report.add_error(line, record["_error"], record["_raw"])
+            continue
+        try:
+            complaint = ComplaintCreate.model_validate(record)
+        except ValidationError as e:
+            report.add_error(line, _format_validation_error(e), record)
+            continue
+        mappings.append((line, {
+            "id": str(uuid4()),
+            "user_id": user_id,
+            **complaint.model_dump(),
+            "status": StatusEnum.pending,
+            "created_at": now,
+        }))
+    return mappings
+
+
+def insert_chunk(db, mappings):
+    """executemany INSERT plus one enqueue for the chunk; caller commits."""
+    db.execute(insert(Complaint), mappings)
+    enqueue_classification(db, [m["id"] for m in mappings])
+
+
+def ingest_records(records, user_id, chunk_size=INGEST_CHUNK_SIZE, on_error=None):
+    """Import an iterable of (line, record) in chunked transactions.
+
+    ``on_error(entry)`` is called for every rejected row, e.g. to write an
+    error file. A chunk whose insert fails is rolled back and each of its
+    valid rows is reported with the database error.
+    """
+    report = IngestReport(on_error)
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        chunk = []
+        for item in records:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                _ingest_chunk(db, chunk, user_id, report)
+                chunk = []
+        if chunk:
+            _ingest_chunk(db, chunk, user_id, report)
+    finally:
+        db.close()
+        report.seconds = time.perf_counter() - started
+
+    if report.inserted:
+        stats_cache.invalidate()
+    return report
+
+
+def _ingest_chunk(db, chunk, user_id, report):
+    report.received += len(chunk)
+    valid = validate_chunk(chunk, user_id, report)
+    if not valid:
+        return
+    try:
+        insert_chunk(db, [mapping for _, mapping in valid])
+        db.commit()
+        report.inserted += len(valid)
+    except Exception as e:
+        db.rollback()
+        for line, mapping in valid:
+            report.add_error(line, f"Database error: {e}", {field: mapping[field] for field in ComplaintCreate.model_fields})
+
+
+def _parse_pairs(pairs, option):
+    parsed = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"{option} expects key=value, got {pair!r}")
+        parsed[key] = value
+    return parsed
+
+
+def _remap(records, mapping, constants):
+    """Rename source columns (field=column) and fill constant fields."""
+    for line, record in records:
+        if isinstance(record, dict) and "_error" not in record:
+            record = {**record, **{field: record.get(column) for field, column in mapping.items()}, **constants}
+        yield line, record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import complaints from NDJSON or CSV.")
+    parser.add_argument("path", help="input file, '-' for stdin")
+    parser.add_argument("--user-id", required=True, help="owner of the imported complaints")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    parser.add_argument("--errors", help="per-row error file (NDJSON), default <path>.errors.ndjson")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--map", action="append", metavar="FIELD=COLUMN", help="read FIELD from another column")
+    parser.add_argument("--set", action="append", metavar="FIELD=VALUE", help="use VALUE for FIELD on every row")
+    args = parser.parse_args()
+
+    init_db()
+    fmt = args.format or detect_format(args.path)
+    errors_path = args.errors or (f"{args.path}.errors.ndjson" if args.path != "-" else "ingest.errors.ndjson")
+    mapping, constants = _parse_pairs(args.map, "--map"), _parse_pairs(args.set, "--set")
+
+    source = (io.TextIOWrapper(sys.stdin.buffer, encoding=args.encoding, newline="") if args.path == "-"
+              else open(args.path, encoding=args.encoding, newline=""))
+    with source, open(errors_path, "w") as errors_file:
+        def write_error(entry):
+            errors_file.write(json.dumps(entry, default=str) + "\n")
+
+        records = _remap(read_records(source, fmt), mapping, constants)
+        report = ingest_records(records, args.user_id, args.chunk_size, on_error=write_error)
+
+    print(f"{report.received} rows in {report.seconds:.2f}s ({report.rows_per_second:.0f} rows/s): "
+          f"{report.inserted} inserted, {report.failed} rejected")
+    if report.failed:
+        print(f"Per-row errors written to {errors_path}")
+    else:
+        os.remove(errors_path)
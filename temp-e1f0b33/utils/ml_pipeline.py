@@ -1,26 +1,16 @@
 import warnings
 warnings.filterwarnings("ignore")
+import os
 import pickle
-import pandas as pd
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import FunctionTransformer
-from utils.cleaner import clean_text
+import threading
+import time
 
-with open('./models/classiffication_model.pkl', 'rb') as file:
-    classification_model = pickle.load(file)
-
-with open('./models/tfidf_vecterizor.pkl', 'rb') as file:
-    vectorizer = pickle.load(file)
-
-# Preprocessing step
-text_cleaner = FunctionTransformer(lambda x: x.apply(clean_text), validate=False)
-
-# Create the ML pipeline
-pipeline = Pipeline([
-    ('cleaner', text_cleaner),
-    ('vectorizer', vectorizer),
-    ('classifier', classification_model)
-])
+# Model artifacts live next to this package, whatever the working directory is
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+CLASSIFICATION_MODEL_PATH = os.path.join(MODELS_DIR, 'classiffication_model.pkl')
+VECTORIZER_PATH = os.path.join(MODELS_DIR, 'tfidf_vecterizor.pkl')
+# Exported bundle served by the inference engine; defaults to utils.model_bundle.DEFAULT_BUNDLE_DIR
+MODEL_BUNDLE_DIR = os.getenv('MODEL_BUNDLE_DIR')
 
 # Class labels
 complain_map = {
@@ -32,4 +22,173 @@ complain_map = {
     5: 'Ticket issues',
     6: 'No use',
     7: 'No use'
-}
\ No newline at end of file
+}
+
+
+class ModelRegistry:
+    """Loads the models once, on first use.
+
+    Importing this module is cheap: sklearn, NLTK and the pickles are only
+    touched by ``load()`` (the sklearn pipeline) or ``engine()`` (the NumPy
+    inference engine used for serving), which callers reach through
+    ``get_pipeline()``/``get_engine()`` or a background ``warmup()`` started
+    by the API at boot. ``sentiment()`` loads the sentiment engine the same
+    way, on first use by the classification worker.
+    """
+
+    def __init__(self):
+        # Re-entrant: building the engine falls back to load() when no bundle exists
+        self._lock = threading.RLock()
+        self._loaded = {}
+        self._errors = {}
+        self._loading = set()
+        self._load_seconds = {}
+
+    def _get(self, name, build):
+        loaded = self._loaded.get(name)
+        if loaded is not None:
+            return loaded
+        with self._lock:
+            if name not in self._loaded:
+                self._loading.add(name)
+                started = time.perf_counter()
+                try:
+                    self._loaded[name] = build()
+                    self._errors.pop(name, None)
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                finally:
+                    self._loading.discard(name)
+                self._load_seconds[name] = time.perf_counter() - started
+        return self._loaded[name]
+
+    def load(self):
+        return self._get('sklearn', self._build)
+
+    def engine(self):
+        return self._get('engine', self._build_engine)
+
+    def sentiment(self):
+        from utils.sentiment import load_sentiment_engine
+        return self._get('sentiment', load_sentiment_engine)
+
+    def _build(self):
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import FunctionTransformer
+        from utils.cleaner import clean_texts, load_nltk
+
+        with open(CLASSIFICATION_MODEL_PATH, 'rb') as file:
+            classification_model = pickle.load(file)
+
+        with open(VECTORIZER_PATH, 'rb') as file:
+            vectorizer = pickle.load(file)
+
+        load_nltk()
+
+        # Preprocessing step
+        text_cleaner = FunctionTransformer(clean_texts, validate=False)
+
+        # Create the ML pipeline
+        pipeline = Pipeline([
+            ('cleaner', text_cleaner),
+            ('vectorizer', vectorizer),
+            ('classifier', classification_model)
+        ])
+        return {
+            'pipeline': pipeline,
+            'vectorizer': vectorizer,
+            'classification_model': classification_model,
+        }
+
+    def _build_engine(self):
+        from utils.cleaner import load_nltk
+        from utils.inference import InferenceEngine
+        from utils.model_bundle import DEFAULT_BUNDLE_DIR, load_bundle
+
+        load_nltk()
+        # Prefer the exported bundle (no sklearn import, shared pages);
+        # fall back to the pickles so a fresh checkout still serves
+        if os.path.exists(os.path.join(MODEL_BUNDLE_DIR or DEFAULT_BUNDLE_DIR, 'manifest.json')):
+            return InferenceEngine.from_bundle(load_bundle(MODEL_BUNDLE_DIR or DEFAULT_BUNDLE_DIR))
+        loaded = self.load()
+        return InferenceEngine.from_sklearn(loaded['vectorizer'], loaded['classification_model'])
+
+    def warmup(self, background=True):
+        """Load the serving engine now, in a daemon thread unless ``background`` is False."""
+        if not background:
+            self.engine()
+            return None
+
+        def _run():
+            try:
+                self.engine()
+            except Exception as e:
+                print(f"Error warming up ML models: {e}")
+
+        thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def ready(self):
+        return 'engine' in self._loaded
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "loading": sorted(self._loading),
+            "loaded": sorted(self._loaded),
+            "errors": dict(self._errors),
+            "loadSeconds": {name: round(seconds, 3) for name, seconds in self._load_seconds.items()},
+        }
+
+
+registry = ModelRegistry()
+
+
+def get_pipeline():
+    return registry.load()['pipeline']
+
+
+def get_engine():
+    return registry.engine()
+
+
+def get_sentiment_engine():
+    return registry.sentiment()
+
+
+def predict_texts(texts):
+    """Class ids for raw complaint texts, cleaned in one batch and scored by the engine."""
+    from utils.cleaner import clean_texts
+
+    return get_engine().predict(clean_texts(texts))
+
+
+def classify_with_probabilities(texts):
+    """Predicted class and per-class probabilities for each raw complaint text."""
+    from utils.cleaner import clean_texts
+
+    engine = get_engine()
+    probabilities = engine.predict_proba(clean_texts(texts))
+    classes = [int(c) for c in engine.classes]
+    results = []
+    for row in probabilities:
+        best = int(row.argmax())
+        results.append({
+            'classId': classes[best],
+            'label': complain_map[classes[best]],
+            'probabilities': [
+                {'classId': class_id, 'label': complain_map[class_id], 'probability': round(float(p), 6)}
+                for class_id, p in zip(classes, row)
+            ],
+        })
+    return results
+
+
+def __getattr__(name):
+    # Keep `from utils.ml_pipeline import pipeline` working, loading on first access
+    if name in ('pipeline', 'vectorizer', 'classification_model'):
+        return registry.load()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
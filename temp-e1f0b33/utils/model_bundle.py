@@ -0,0 +1,184 @@
+"""Compact, memory-mappable export of the TF-IDF + MultinomialNB model.
+
+The pickles hold the whole sklearn objects and every process that unpickles
+them gets a private copy. A bundle is a directory of plain ``.npy`` arrays,
+a sorted vocabulary file and a JSON manifest:
+
+    manifest.json          format, version, vectorizer settings, checksums
+    vocab.txt              sorted vocabulary, one term per line; line n is column n
+    idf.npy                (n_features,) float64
+    feature_log_prob.npy   (n_features, n_classes) float64, one row per term
+    class_log_prior.npy    (n_classes,) float64
+    classes.npy            (n_classes,) int64 class ids (keys of complain_map)
+
+Loading with ``mmap_mode='r'`` maps the files read-only, so every uvicorn
+worker on a host shares the same physical pages.
+
+    python -m utils.model_bundle export     # pickles -> models/bundle/v1
+    python -m utils.model_bundle verify     # compare predictions with the pickles
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+
+from utils.ml_pipeline import MODELS_DIR
+
+BUNDLE_FORMAT = "tfidf-multinomialnb"
+BUNDLE_VERSION = 1
+DEFAULT_BUNDLE_DIR = os.path.join(MODELS_DIR, "bundle", f"v{BUNDLE_VERSION}")
+
+ARRAY_FILES = ("idf", "feature_log_prob", "class_log_prior", "classes")
+BUNDLE_FILES = ("vocab.txt",) + tuple(f"{name}.npy" for name in ARRAY_FILES)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _check_supported(vectorizer):
+    params = vectorizer.get_params()
+    unsupported = {
+        "analyzer": params["analyzer"] != "word",
+        "ngram_range": tuple(params["ngram_range"]) != (1, 1),
+        "binary": params["binary"],
+        "sublinear_tf": params["sublinear_tf"],
+        "use_idf": not params["use_idf"],
+        "norm": params["norm"] != "l2",
+        "preprocessor": params["preprocessor"] is not None,
+        "tokenizer": params["tokenizer"] is not None,
+        "strip_accents": params["strip_accents"] is not None,
+    }
+    bad = [name for name, flag in unsupported.items() if flag]
+    if bad:
+        raise ValueError(f"Vectorizer settings not supported by the bundle format: {', '.join(bad)}")
+
+
+def export_bundle(vectorizer, classifier, out_dir=DEFAULT_BUNDLE_DIR):
+    """Write the fitted vectorizer and classifier as a versioned bundle."""
+    _check_supported(vectorizer)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Store features in sorted term order so a term's position is its column
+    terms = sorted(vectorizer.vocabulary_)
+    columns = np.array([vectorizer.vocabulary_[term] for term in terms])
+
+    with open(os.path.join(out_dir, "vocab.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(terms) + "\n")
+
+    arrays = {
+        "idf": np.ascontiguousarray(vectorizer.idf_[columns], dtype=np.float64),
+        "feature_log_prob": np.ascontiguousarray(classifier.feature_log_prob_[:, columns].T, dtype=np.float64),
+        "class_log_prior": np.ascontiguousarray(classifier.class_log_prior_, dtype=np.float64),
+        "classes": np.asarray(classifier.classes_, dtype=np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), array, allow_pickle=False)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created": datetime.utcnow().isoformat(),
+        "n_features": len(terms),
+        "n_classes": len(arrays["classes"]),
+        "vectorizer": {
+            "lowercase": vectorizer.lowercase,
+            "token_pattern": vectorizer.token_pattern,
+            "norm": vectorizer.norm,
+        },
+        "sha256": {name: _sha256(os.path.join(out_dir, name)) for name in BUNDLE_FILES},
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return out_dir
+
+
+class ModelBundle:
+    """Arrays of an exported bundle, memory-mapped by default."""
+
+    def __init__(self, path, manifest, terms, arrays):
+        self.path = path
+        self.manifest = manifest
+        self.idf = arrays["idf"]
+        self.feature_log_prob = arrays["feature_log_prob"]
+        self.class_log_prior = arrays["class_log_prior"]
+        self.classes = arrays["classes"]
+        self.lowercase = manifest["vectorizer"]["lowercase"]
+        self.token_re = re.compile(manifest["vectorizer"]["token_pattern"])
+        # Term -> column lookup; small compared to the arrays, built per process
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+
+    def predict(self, cleaned_texts):
+        """Class ids for texts that already went through utils.cleaner."""
+        from utils.inference import InferenceEngine
+
+        return InferenceEngine.from_bundle(self).predict(cleaned_texts)
+
+
+def load_bundle(path=DEFAULT_BUNDLE_DIR, mmap=True, check_integrity=False):
+    """Load a bundle; arrays are read-only memory maps unless ``mmap`` is False."""
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported model bundle {manifest.get('format')} v{manifest.get('version')} at {path}")
+
+    if check_integrity:
+        for name in BUNDLE_FILES:
+            if _sha256(os.path.join(path, name)) != manifest["sha256"][name]:
+                raise ValueError(f"Checksum mismatch for {name} in {path}")
+
+    with open(os.path.join(path, "vocab.txt"), encoding="utf-8") as f:
+        terms = f.read().split("\n")[:-1]
+
+    mmap_mode = "r" if mmap else None
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+        for name in ARRAY_FILES
+    }
+    return ModelBundle(path, manifest, terms, arrays)
+
+
+def verify_bundle(bundle, texts):
+    """Compare bundle predictions with the pickle pipeline; returns the mismatch count."""
+    from utils.cleaner import clean_texts
+    from utils.ml_pipeline import get_pipeline
+
+    expected = get_pipeline().predict(list(texts))
+    actual = bundle.predict(clean_texts(texts))
+    return int(np.sum(np.asarray(expected) != actual))
+
+
+def _dataset_texts():
+    import pandas as pd
+
+    dataset = pd.read_csv(os.path.join(os.path.dirname(MODELS_DIR), "notebook", "data", "dataset.csv"), encoding="latin-1")
+    return dataset["SentimentText"].fillna("").tolist()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or verify the memory-mappable model bundle.")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--bundle", default=DEFAULT_BUNDLE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from utils.ml_pipeline import registry
+
+        loaded = registry.load()
+        export_bundle(loaded["vectorizer"], loaded["classification_model"], args.bundle)
+        print(f"Exported model bundle to {args.bundle}")
+
+    bundle = load_bundle(args.bundle, check_integrity=True)
+    texts = _dataset_texts()
+    mismatches = verify_bundle(bundle, texts)
+    print(f"Verified {len(texts)} texts against the pickle pipeline: {mismatches} mismatches")
+    if mismatches:
+        raise SystemExit(1)
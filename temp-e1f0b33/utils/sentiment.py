@@ -0,0 +1,294 @@
+"""Batch sentiment scoring for complaint texts.
+
+The intended model is distilbert-base-uncased-finetuned-sst-2-english (see
+bert.txt and the training notebook), stored locally under
+SENTIMENT_MODEL_DIR with ``save_pretrained``; it is never downloaded. One
+forward pass gives both the label and its probability. Texts are sorted by
+length and run in padded batches of SENTIMENT_BATCH_SIZE on
+SENTIMENT_THREADS torch threads.
+
+When transformers/torch or the model directory are missing, or a call's
+estimated model time exceeds its latency budget, a small lexicon scorer
+answers instead. While over budget, a few texts are sent to the model every
+SENTIMENT_PROBE_INTERVAL_S to re-measure it. Model results are cached by
+text hash.
+
+    python -m utils.sentiment "The toilet is filthy and nobody cleaned it"
+    python -m utils.sentiment --backfill
+"""
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from utils.ml_pipeline import MODELS_DIR
+
+SENTIMENT_MODEL_DIR = os.getenv("SENTIMENT_MODEL_DIR", os.path.join(MODELS_DIR, "sentiment"))
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+SENTIMENT_MAX_LENGTH = int(os.getenv("SENTIMENT_MAX_LENGTH", "128"))
+SENTIMENT_THREADS = int(os.getenv("SENTIMENT_THREADS", str(min(4, os.cpu_count() or 1))))
+# Milliseconds one score() call may spend in the model (0: no budget)
+SENTIMENT_LATENCY_BUDGET_MS = float(os.getenv("SENTIMENT_LATENCY_BUDGET_MS", "0"))
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "50000"))
+# While over budget, every this many seconds a few texts still go to the model
+SENTIMENT_PROBE_INTERVAL_S = float(os.getenv("SENTIMENT_PROBE_INTERVAL_S", "30"))
+SENTIMENT_PROBE_SIZE = int(os.getenv("SENTIMENT_PROBE_SIZE", "8"))
+
+POSITIVE = "POSITIVE"
+NEGATIVE = "NEGATIVE"
+
+
+class TransformerSentiment:
+    """A locally stored sequence-classification model (SST-2 style labels)."""
+
+    name = "transformer"
+
+    def __init__(self, model_dir=SENTIMENT_MODEL_DIR, batch_size=SENTIMENT_BATCH_SIZE,
+                 max_length=SENTIMENT_MAX_LENGTH, threads=SENTIMENT_THREADS):
+        # Never reach the Hugging Face hub, even for a config lookup
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        torch.set_num_threads(threads)
+        self.torch = torch
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_dir, local_files_only=True).eval()
+        config = self.model.config
+        self.labels = [config.id2label[i].upper() for i in range(config.num_labels)]
+
+    def score(self, texts):
+        results = [None] * len(texts)
+        # Similar lengths in a batch keep the padding small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        with self.torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                encoded = self.tokenizer([texts[i] for i in batch], padding=True, truncation=True,
+                                         max_length=self.max_length, return_tensors="pt")
+                scores, labels = self.model(**encoded).logits.softmax(dim=-1).max(dim=-1)
+                for i, label, score in zip(batch, labels.tolist(), scores.tolist()):
+                    results[i] = (self.labels[label], score)
+        return results
+
+
+class LexiconSentiment:
+    """Word-list scorer: counts positive and negative words, with negation flipping the next two."""
+
+    name = "lexicon"
+
+    POSITIVE_WORDS = frozenset("""
+        thanks thank thankyou appreciate appreciated good great excellent clean cleaned nice helpful
+        quick quickly prompt promptly resolved happy awesome best kind wonderful love comfortable
+        timely polite courteous smooth satisfied fixed improved safe
+    """.split())
+    NEGATIVE_WORDS = frozenset("""
+        dirty filthy unclean unhygienic smell smelly stinking stink cockroach cockroaches rats rat
+        late delay delayed delays stale worst bad poor broken rude pathetic horrible terrible awful
+        disgusting harass harassed harassment theft stolen stole thief crowded overcrowded cancelled
+        problem problems issue issues fail failed failure waiting hungry sick ill emergency urgent
+        pain injured injury fight unsafe overcharged overcharging cheated fraud leaking leak
+        shortage missing lost useless worse hell suffer suffering suffered angry disappointed
+        shame shameful negligence careless misbehave misbehaved misbehaving
+    """.split())
+    NEGATIONS = frozenset("not no never none nothing nobody without cannot".split())
+
+    _word = re.compile(r"[a-z']+")
+
+    def score_text(self, text):
+        total = 0
+        flip = 0
+        for word in self._word.findall(text.lower()):
+            if word in self.NEGATIONS or word.endswith("n't"):
+                flip = 2
+                continue
+            polarity = (word in self.POSITIVE_WORDS) - (word in self.NEGATIVE_WORDS)
+            if flip:
+                polarity = -polarity
+                flip -= 1
+            total += polarity
+        # Complaints with no opinion words lean negative, at the least confidence
+        label = POSITIVE if total > 0 else NEGATIVE
+        return label, 0.5 + 0.49 * (1 - 1 / (1 + abs(total)))
+
+    def score(self, texts):
+        return [self.score_text(text) for text in texts]
+
+
+class SentimentEngine:
+    """Scores texts with the model when it is available and fits the budget, else the lexicon.
+
+    Model results are cached by a hash of the text; lexicon results are not,
+    so a text first seen under budget pressure is scored by the model later.
+    """
+
+    def __init__(self, model=None, lexicon=None, budget_ms=SENTIMENT_LATENCY_BUDGET_MS,
+                 cache_size=SENTIMENT_CACHE_SIZE, probe_interval=SENTIMENT_PROBE_INTERVAL_S,
+                 probe_size=SENTIMENT_PROBE_SIZE):
+        self.model = model
+        self.lexicon = lexicon or LexiconSentiment()
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self.probe_interval = probe_interval
+        self.probe_size = probe_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._seconds_per_text = None
+        self._next_probe = 0.0
+        self.counts = {"cache": 0, "transformer": 0, "lexicon": 0}
+        self.seconds = 0.0
+
+    @staticmethod
+    def _key(text):
+        return hashlib.blake2b(text.strip().encode("utf-8"), digest_size=16).digest()
+
+    def _model_share(self, n, budget_ms):
+        """How many of ``n`` texts the model scores, and whether that is a probe."""
+        if self.model is None:
+            return 0, False
+        with self._lock:
+            estimate = self._seconds_per_text
+            if not budget_ms or estimate is None or estimate * n * 1000 <= budget_ms:
+                return n, False
+            # The estimate only changes when the model runs, so without a probe
+            # now and then the fallback would stay on for good
+            now = time.monotonic()
+            if now < self._next_probe:
+                return 0, False
+            self._next_probe = now + self.probe_interval
+            return min(n, self.probe_size), True
+
+    def score(self, texts, budget_ms=None):
+        """(label, score) per text; ``budget_ms`` overrides SENTIMENT_LATENCY_BUDGET_MS for this call."""
+        started = time.perf_counter()
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+        keys = [self._key(text) for text in texts]
+        results = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                hit = self._cache.get(key)
+                if hit is not None:
+                    self._cache.move_to_end(key)
+                    results[i] = hit
+            misses = [i for i, result in enumerate(results) if result is None]
+            self.counts["cache"] += len(texts) - len(misses)
+
+        if misses:
+            share, probe = self._model_share(len(misses), budget_ms)
+            model_misses, lexicon_misses = misses[:share], misses[share:]
+            if model_misses:
+                with self._model_lock:
+                    model_started = time.perf_counter()
+                    scored = self.model.score([texts[i] for i in model_misses])
+                    per_text = (time.perf_counter() - model_started) / len(model_misses)
+                with self._lock:
+                    # A probe replaces the estimate, other batches move an average
+                    if probe or self._seconds_per_text is None:
+                        self._seconds_per_text = per_text
+                    else:
+                        self._seconds_per_text = 0.8 * self._seconds_per_text + 0.2 * per_text
+                    self._next_probe = time.monotonic() + self.probe_interval
+                    for i, result in zip(model_misses, scored):
+                        self._cache[keys[i]] = result
+                        results[i] = result
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                    self.counts[self.model.name] += len(model_misses)
+            if lexicon_misses:
+                scored = self.lexicon.score([texts[i] for i in lexicon_misses])
+                for i, result in zip(lexicon_misses, scored):
+                    results[i] = result
+                with self._lock:
+                    self.counts[self.lexicon.name] += len(lexicon_misses)
+
+        with self._lock:
+            self.seconds += time.perf_counter() - started
+        return results
+
+    @property
+    def backend(self):
+        return self.model.name if self.model is not None else self.lexicon.name
+
+    def status(self):
+        with self._lock:
+            counts, seconds, cached = dict(self.counts), self.seconds, len(self._cache)
+        scored = sum(counts.values())
+        return {
+            "backend": self.backend,
+            "scored": counts,
+            "cached": cached,
+            "textsPerSecond": round(scored / seconds, 1) if seconds else None,
+        }
+
+
+def load_sentiment_engine(model_dir=SENTIMENT_MODEL_DIR):
+    """Engine over the local model if it can be loaded, else lexicon-only."""
+    model = None
+    if os.path.isdir(model_dir):
+        try:
+            model = TransformerSentiment(model_dir)
+        except Exception as e:
+            print(f"Sentiment model unavailable, using the lexicon scorer: {e}")
+    return SentimentEngine(model)
+
+
+def backfill_sentiment(batch_size=256):
+    """Score every complaint that has no sentiment yet; returns the number scored."""
+    from utils.ml_pipeline import get_sentiment_engine
+    from website.app.pages.api.user.database import SessionLocal
+    from website.app.pages.api.user.models import Complaint
+    from website.app.pages.api.user.stats import stats_cache
+
+    engine = get_sentiment_engine()
+    db = SessionLocal()
+    scored = 0
+    try:
+        last_id = None
+        while True:
+            query = db.query(Complaint.id, Complaint.complaint).filter(Complaint.sentiment.is_(None))
+            if last_id:
+                query = query.filter(Complaint.id > last_id)
+            rows = query.order_by(Complaint.id).limit(batch_size).all()
+            if not rows:
+                break
+            results = engine.score([row.complaint for row in rows])
+            db.bulk_update_mappings(Complaint, [
+                {"id": row.id, "sentiment": label, "sentimentScore": score}
+                for row, (label, score) in zip(rows, results)
+            ])
+            db.commit()
+            scored += len(rows)
+            last_id = rows[-1].id
+    finally:
+        db.close()
+    if scored:
+        stats_cache.invalidate()
+    return scored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score complaint sentiment.")
+    parser.add_argument("texts", nargs="*", help="texts to score")
+    parser.add_argument("--backfill", action="store_true", help="score stored complaints that have no sentiment")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    from utils.ml_pipeline import get_sentiment_engine
+
+    started = time.perf_counter()
+    if args.backfill:
+        count = backfill_sentiment(args.batch_size)
+    else:
+        count = len(args.texts)
+        for text, (label, score) in zip(args.texts, get_sentiment_engine().score(args.texts)):
+            print(f"{label:8s} {score:.3f}  {text}")
+    elapsed = time.perf_counter() - started
+    print(f"Scored {count} complaints in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} complaints/s, "
+          f"backend: {get_sentiment_engine().backend})")
@@ -23,6 +23,18 @@ interface Complaint {
   resolution?: string;
 }
 
+interface ComplaintStats {
+  total: number;
+  pending: number;
+  resolved: number;
+  avgSentimentScore: number | null;
+  emergencies: number;
+  byStatus: Record<string, number>;
+  byClassification: Record<string, number>;
+  bySentiment: Record<string, number>;
+  byDay: { date: string; complaints: number; resolved: number }[];
+}
+
 const AdminDashboard = () => {
   const [complaints, setComplaints] = useState<Complaint[]>([]);
   const [loading, setLoading] = useState(true);
@@ -33,31 +45,43 @@ const AdminDashboard = () => {
     satisfactionRate: '0%',
     avgSentiment: 0
   });
+  const [serverStats, setServerStats] = useState<ComplaintStats | null>(null);
 
   // Emergency classifications
   const emergencyClassifications = ['Medical'];
 
-  // Fetch complaints from API
+  // Fetch aggregate stats and the latest complaints from API
   useEffect(() => {
-    const fetchComplaints = async () => {
+    const fetchDashboard = async () => {
       try {
-        const response = await fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL}/complaints/get-all-complaints`, {
-          method: 'GET',
-          credentials: 'include',
-        });
+        const [statsResponse, complaintsResponse] = await Promise.all([
+          fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL}/complaints/stats?days=183`, {
+            method: 'GET',
+            credentials: 'include',
+          }),
+          fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL}/complaints/get-all-complaints?limit=50`, {
+            method: 'GET',
+            credentials: 'include',
+          }),
+        ]);
         
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`);
+        if (!statsResponse.ok) {
+          throw new Error(`HTTP error! status: ${statsResponse.status}`);
+        }
+        if (!complaintsResponse.ok) {
+          throw new Error(`HTTP error! status: ${complaintsResponse.status}`);
         }
         
-        const data = await response.json();
+        const statsData = await statsResponse.json();
+        const data = await complaintsResponse.json();
         const fetchedComplaints = data.complaints || [];
         setComplaints(fetchedComplaints);
+        setServerStats(statsData.stats);
         
-        // Generate emergency alerts
+        // Generate emergency alerts from the latest complaints
         const emergencies = fetchedComplaints
           .filter((c: Complaint) => 
-            emergencyClassifications.some(ec => c.classification.includes(ec)) ||
+            emergencyClassifications.some(ec => (c.classification || '').includes(ec)) ||
             c.sentimentScore > 0.95
           )
           .slice(0, 3)
@@ -72,27 +96,24 @@ const AdminDashboard = () => {
           }));
         setEmergencyData(emergencies);
         
-        // Calculate statistics
-        const total = fetchedComplaints.length;
-        const pending = fetchedComplaints.filter((c: Complaint) => c.status !== 'Resolved').length;
-        const resolved = fetchedComplaints.filter((c: Complaint) => c.status === 'Resolved').length;
-        const totalSentiment = fetchedComplaints.reduce((sum: number, c: Complaint) => sum + c.sentimentScore, 0);
+        // Statistics are aggregated on the server
+        const { total, pending, resolved, avgSentimentScore } = statsData.stats;
         
         setStats({
           total,
           pending,
           satisfactionRate: `${total > 0 ? Math.round((resolved / total) * 100) : 0}%`,
-          avgSentiment: total > 0 ? parseFloat((totalSentiment / total).toFixed(2)) : 0
+          avgSentiment: avgSentimentScore ? parseFloat(avgSentimentScore.toFixed(2)) : 0
         });
         
       } catch (error) {
-        console.error('Error fetching complaints:', error);
+        console.error('Error fetching dashboard data:', error);
       } finally {
         setLoading(false);
       }
     };
     
-    fetchComplaints();
+    fetchDashboard();
   }, []);
 
   const formatTimeAgo = (dateString: string) => {
@@ -106,33 +127,25 @@ const AdminDashboard = () => {
   };
 
   // Generate problem classification data
-  const problemClassificationData = complaints.reduce((acc: {name: string, value: number}[], complaint) => {
-    const existingType = acc.find(item => item.name === complaint.classification);
-    if (existingType) {
-      existingType.value++;
-    } else {
-      acc.push({ name: complaint.classification, value: 1 });
-    }
-    return acc;
-  }, []).sort((a, b) => b.value - a.value).slice(0, 6);
+  const problemClassificationData = Object.entries(serverStats?.byClassification || {})
+    .map(([name, value]) => ({ name, value }))
+    .sort((a, b) => b.value - a.value).slice(0, 6);
 
   // Generate monthly trend data
   const generateMonthlyTrendData = () => {
     const monthNames = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
     const monthlyData: Record<string, { complaints: number; resolved: number }> = {};
     
-    complaints.forEach(c => {
-      const date = new Date(c.createdAt);
+    (serverStats?.byDay || []).forEach(day => {
+      const date = new Date(day.date);
       const monthYear = `${monthNames[date.getMonth()]} ${date.getFullYear()}`;
       
       if (!monthlyData[monthYear]) {
         monthlyData[monthYear] = { complaints: 0, resolved: 0 };
       }
       
-      monthlyData[monthYear].complaints++;
-      if (c.status === 'Resolved') {
-        monthlyData[monthYear].resolved++;
-      }
+      monthlyData[monthYear].complaints += day.complaints;
+      monthlyData[monthYear].resolved += day.resolved;
     });
     
     return Object.entries(monthlyData)
@@ -9,6 +9,8 @@ import { motion, AnimatePresence } from "framer-motion";
 type ComplaintStatus = "Pending" | "In Progress" | "Resolved";
 type DateRangeFilter = "all" | "7days" | "30days";
 
+const PAGE_SIZE = 100;
+
 interface Complaint {
   id: string;
   pnrNumber: string;
@@ -43,70 +45,112 @@ const ManageComplaints: React.FC = () => {
   });
   const [resolutionNotes, setResolutionNotes] = useState<Record<string, string>>({});
   const [uniqueClassifications, setUniqueClassifications] = useState<string[]>([]);
+  const [search, setSearch] = useState<string>("");
+  // Where the next page starts: a keyset cursor for listings, an offset for search results
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+
+  // Filtering, search and paging happen on the server; the list holds only the pages loaded so far
+  const buildUrl = (page: string | null): string => {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (filters.status !== "all") params.set("status", filters.status);
+    if (filters.classification !== "all") params.set("classification", filters.classification);
+    if (filters.dateRange !== "all") {
+      const days = filters.dateRange === "7days" ? 7 : 30;
+      // Stored timestamps are naive UTC
+      params.set("createdFrom", new Date(Date.now() - days * 24 * 60 * 60 * 1000).toISOString().slice(0, 19));
+    }
+    if (search) {
+      params.set("q", search);
+      if (page) params.set("offset", page);
+      return `${process.env.NEXT_PUBLIC_BACKEND_URL}/complaints/search?${params}`;
+    }
+    if (page) params.set("cursor", page);
+    return `${process.env.NEXT_PUBLIC_BACKEND_URL}/complaints/get-all-complaints?${params}`;
+  };
+
+  const fetchPage = async (page: string | null, signal?: AbortSignal) => {
+    const response = await fetch(buildUrl(page), {
+      method: "GET",
+      credentials: "include",
+      signal,
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data = await response.json();
+    const next = search ? data.nextOffset : data.nextCursor;
+    return {
+      complaints: (data.complaints || []) as Complaint[],
+      next: next === null || next === undefined ? null : String(next),
+    };
+  };
 
-  // Fetch complaints from API
+  // Classification options cover the whole table, not just the loaded page
   useEffect(() => {
-    const fetchComplaints = async () => {
+    const fetchClassifications = async () => {
       try {
-        const response = await fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL}/complaints/get-all-complaints`, {
+        const response = await fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL}/complaints/stats?days=366`, {
           method: "GET",
           credentials: "include",
         });
-        
+
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
-        
+
         const data = await response.json();
-        setComplaints(data.complaints || []);
+        setUniqueClassifications(Object.keys(data.stats?.byClassification || {}).filter(Boolean));
+      } catch (error) {
+        console.error("Error fetching classifications:", error);
+      }
+    };
+
+    fetchClassifications();
+  }, []);
+
+  // Wait for a pause in typing before searching
+  useEffect(() => {
+    const timer = setTimeout(() => setSearch(filters.search.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [filters.search]);
 
-        // Extract unique classifications
-        const classifications = Array.from(
-          new Set(data.complaints.map((c: Complaint) => c.classification))
-        ) as string[];
-        setUniqueClassifications(classifications);
+  // Fetch the first page again whenever a filter or the search changes
+  useEffect(() => {
+    const controller = new AbortController();
+    const fetchComplaints = async () => {
+      setLoading(true);
+      try {
+        const page = await fetchPage(null, controller.signal);
+        setComplaints(page.complaints);
+        setNextPage(page.next);
       } catch (error) {
+        if (controller.signal.aborted) return;
         console.error("Error fetching complaints:", error);
       } finally {
-        setLoading(false);
+        if (!controller.signal.aborted) setLoading(false);
       }
     };
-    
+
     fetchComplaints();
-  }, []);
+    return () => controller.abort();
+  }, [filters.status, filters.classification, filters.dateRange, search]);
 
-  const filteredComplaints = complaints.filter(complaint => {
-    // Status filter
-    if (filters.status !== "all" && complaint.status !== filters.status) return false;
-    
-    // Date range filter
-    if (filters.dateRange !== "all") {
-      const diffDays = Math.floor(
-        (new Date().getTime() - new Date(complaint.createdAt).getTime()) / (1000 * 60 * 60 * 24)
-      );
-      if (filters.dateRange === "7days" && diffDays > 7) return false;
-      if (filters.dateRange === "30days" && diffDays > 30) return false;
-    }
-    
-    // Search filter
-    if (filters.search) {
-      const searchTerm = filters.search.toLowerCase();
-      return (
-        complaint.pnrNumber.toLowerCase().includes(searchTerm) ||
-        complaint.trainNumber.toLowerCase().includes(searchTerm) ||
-        complaint.sourceStation.toLowerCase().includes(searchTerm) ||
-        complaint.destinationStation.toLowerCase().includes(searchTerm) ||
-        complaint.complaint.toLowerCase().includes(searchTerm)
-      );
-    }
-    
-    // Classification filter
-    if (filters.classification !== "all" && complaint.classification !== filters.classification) {
-      return false;
+  const loadMore = async () => {
+    if (!nextPage || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextPage);
+      setComplaints(prev => [...prev, ...page.complaints]);
+      setNextPage(page.next);
+    } catch (error) {
+      console.error("Error fetching complaints:", error);
+    } finally {
+      setLoadingMore(false);
     }
-    
-    return true;
-  });
+  };
 
   const updateComplaint = async (id: string, newStatus?: ComplaintStatus) => {
     try {
@@ -264,13 +308,13 @@ const ManageComplaints: React.FC = () => {
             <div className="flex justify-center items-center h-64">
               <div className="animate-spin rounded-full h-12 w-12 border-t-2 border-b-2 border-blue-500"></div>
             </div>
-          ) : filteredComplaints.length === 0 ? (
+          ) : complaints.length === 0 ? (
             <div className="bg-white rounded-xl shadow-sm p-8 text-center">
               <p className="text-gray-500 text-lg">No complaints found matching your criteria</p>
             </div>
           ) : (
             <div className="space-y-4">
-              {filteredComplaints.map((complaint) => (
+              {complaints.map((complaint) => (
                 <motion.div 
                   key={complaint.id}
                   initial={{ opacity: 0, y: 20 }}
@@ -414,6 +458,17 @@ const ManageComplaints: React.FC = () => {
                   </AnimatePresence>
                 </motion.div>
               ))}
+              {nextPage && (
+                <div className="flex justify-center pt-2">
+                  <button
+                    className="px-4 py-2 bg-blue-100 text-blue-800 rounded-lg text-sm font-medium hover:bg-blue-200 disabled:opacity-50"
+                    onClick={loadMore}
+                    disabled={loadingMore}
+                  >
+                    {loadingMore ? "Loading..." : "Load more"}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </main>
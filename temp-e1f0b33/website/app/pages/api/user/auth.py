@@ -1,23 +1,30 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from collections import OrderedDict
+import hashlib
 import os
-from werkzeug.security import generate_password_hash, check_password_hash
+import threading
+import time
 from uuid import uuid4
 
 from .models import User, RoleEnum
-from .dependencies import get_db
+from .dependencies import get_async_db
+from .passwords import hash_password_async, verify_and_update_async
 
 # JWT Configuration
 SECRET_KEY = os.getenv("FLASK_JWT_SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# Verified tokens remembered per process (0 disables the cache)
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
 
 # Security
 security = HTTPBearer()
@@ -38,6 +45,54 @@ class UserSignin(BaseModel):
 
 class TokenData(BaseModel):
     user_id: Optional[str] = None
+    payload: Dict[str, Any] = {}
+
+
+class TokenCache:
+    """Bounded LRU of verified tokens, keyed by the token's SHA-256.
+
+    An entry is dropped once the token's ``exp`` has passed, so a cache hit
+    never outlives what ``jwt.decode`` would have accepted. Only valid
+    tokens are stored.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, token: str, expires_at: float, value):
+        if self.maxsize <= 0:
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(JWT_CACHE_SIZE)
 
 # Token generation functions
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -69,17 +124,44 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(token: str) -> Tuple[Optional[TokenData], Optional[dict]]:
+    if not token:
+        return None, None
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        return token_data, token_data.payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             return None, None
-        token_data = TokenData(user_id=user_id)
+        token_data = TokenData(user_id=user_id, payload=payload)
+        if "exp" in payload:
+            token_cache.set(token, float(payload["exp"]), token_data)
         return token_data, payload
     except JWTError:
         return None, None
 
-def generate_access_token_and_refresh_token(user: User, db: Session) -> Tuple[Optional[Dict[str, str]], Optional[Dict[str, Any]], int]:
+async def get_current_user(request: Request) -> TokenData:
+    """Dependency: the verified access-token cookie, or 401.
+
+    Async although it never awaits: a plain def would be sent to the thread
+    pool on every request, which costs more than a cached token lookup.
+    """
+    token = request.cookies.get("access_token_cookie")
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing access token")
+    token_data, payload = verify_token(token)
+    if not token_data:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return token_data
+
+async def get_current_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+    """Dependency: like get_current_user, but 403 unless the token carries the admin role."""
+    if current_user.payload.get("role") != RoleEnum.admin.value:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+async def generate_access_token_and_refresh_token(user: User, db: AsyncSession) -> Tuple[Optional[Dict[str, str]], Optional[Dict[str, Any]], int]:
     try:
         if not user:
             return None, {
@@ -101,8 +183,7 @@ def generate_access_token_and_refresh_token(user: User, db: Session) -> Tuple[Op
 
         # Save refresh token in DB
         user.refresh_token = refresh_token
-        db.commit()
-        db.refresh(user)
+        await db.commit()
 
         return {
             "access_token": access_token,
@@ -110,7 +191,7 @@ def generate_access_token_and_refresh_token(user: User, db: Session) -> Tuple[Op
         }, None, 200
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         import traceback
         traceback.print_exc()
         return None, {
@@ -121,7 +202,7 @@ def generate_access_token_and_refresh_token(user: User, db: Session) -> Tuple[Op
 
 
 @auth_router.post("/signup", status_code=201)
-async def signup_user(user_data: UserSignup, db: Session = Depends(get_db)):
+async def signup_user(user_data: UserSignup, db: AsyncSession = Depends(get_async_db)):
     try:
         name = user_data.name.strip()
         email = user_data.email.strip().lower()
@@ -132,12 +213,12 @@ async def signup_user(user_data: UserSignup, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="All fields are required")
 
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == email).first()
+        existing_user = await db.scalar(select(User).filter(User.email == email))
         if existing_user:
             raise HTTPException(status_code=409, detail="User already exists")
 
-        # Hash password
-        hashed_password = generate_password_hash(password)
+        # Hash password (off the event loop)
+        hashed_password = await hash_password_async(password)
 
         # Create new user
         new_user = User(
@@ -149,8 +230,7 @@ async def signup_user(user_data: UserSignup, db: Session = Depends(get_db)):
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
 
         return {
             "success": True,
@@ -164,16 +244,16 @@ async def signup_user(user_data: UserSignup, db: Session = Depends(get_db)):
         }
 
     except HTTPException as e:
-        db.rollback()
+        await db.rollback()
         raise e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @auth_router.post("/signin")
-async def signin_user(user_data: UserSignin, db: Session = Depends(get_db)):
+async def signin_user(user_data: UserSignin, db: AsyncSession = Depends(get_async_db)):
     try:
         email = user_data.email.strip().lower()
         password = user_data.password
@@ -182,16 +262,21 @@ async def signin_user(user_data: UserSignin, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Missing email or password")
 
         # Find user in database
-        user_db = db.query(User).filter(User.email == email).first()
+        user_db = await db.scalar(select(User).filter(User.email == email))
 
         if not user_db:
             raise HTTPException(status_code=401, detail="User not found")
 
-        if not check_password_hash(user_db.password, password):
+        password_ok, new_hash = await verify_and_update_async(user_db.password, password)
+        if not password_ok:
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
+        # Stored hash uses an outdated method/cost: upgrade it, committed with the refresh token below
+        if new_hash:
+            user_db.password = new_hash
+
         # Generate tokens
-        tokens, error_response, status_code = generate_access_token_and_refresh_token(user_db, db)
+        tokens, error_response, status_code = await generate_access_token_and_refresh_token(user_db, db)
 
         if error_response:
             raise HTTPException(status_code=status_code, detail=error_response["message"])
@@ -244,29 +329,27 @@ async def signin_user(user_data: UserSignin, db: Session = Depends(get_db)):
     except HTTPException as e:
         raise e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
 @auth_router.post("/logout")
-async def logout_user(request: Request, db: Session = Depends(get_db)):
+async def logout_user(
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     try:
-        token = request.cookies.get("access_token_cookie")
-        token_data, payload = verify_token(token)
-        if not token_data:
-            raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-        user_id = token_data.user_id
+        user_id = current_user.user_id
 
         # Fetch user from DB
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.scalar(select(User).filter(User.id == user_id))
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         # Clear refresh token from database
         user.refresh_token = None
-        db.commit()
+        await db.commit()
         
         # Create response and clear cookies
         response = JSONResponse(content={"message": "Logged out successfully"})
@@ -275,15 +358,13 @@ async def logout_user(request: Request, db: Session = Depends(get_db)):
         
         return response
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @auth_router.get("/profile")
-async def get_logged_in_user(request: Request):
+async def get_logged_in_user(token_data: TokenData = Depends(get_current_user)):
     try:
-        token = request.cookies.get("access_token_cookie")
-        token_data, payload  = verify_token(token)
-        current_user = payload 
+        current_user = token_data.payload
         return {
             "success": True,
             "user": {
@@ -298,7 +379,7 @@ async def get_logged_in_user(request: Request):
         raise HTTPException(status_code=401, detail=str(e))
 
 @auth_router.post("/refresh")
-async def refresh_token(request: Request, db: Session = Depends(get_db)):
+async def refresh_token(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         # Get refresh token from cookie
         refresh_token = request.cookies.get("refresh_token_cookie")
@@ -312,7 +393,7 @@ async def refresh_token(request: Request, db: Session = Depends(get_db)):
             raise HTTPException(status_code=401, detail="Invalid refresh token")
         
         # Get user from database
-        user = db.query(User).filter(User.id == token_data.user_id).first()
+        user = await db.scalar(select(User).filter(User.id == token_data.user_id))
         if not user or user.refresh_token != refresh_token:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
         
@@ -352,18 +433,9 @@ async def debug_cookies(request: Request):
     }
 
 @auth_router.get("/verify-token")
-async def verify_token_endpoint(request: Request):
+async def verify_token_endpoint(token_data: TokenData = Depends(get_current_user)):
     try:
-        # Get token from cookie
-        token = request.cookies.get("access_token_cookie")
-        if not token:
-            raise HTTPException(status_code=401, detail="No token in cookies")
-            
-        # Verify and decode token
-        token_data, payload = verify_token(token)
-        if not token_data:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
+        payload = token_data.payload
         return {
             "success": True, 
             "decoded": payload,
@@ -0,0 +1,117 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import observe_batch, observe_inference
+
+# Flush a batch once it holds this many texts or its first text has waited this long
+CLASSIFY_MAX_BATCH = int(os.getenv("CLASSIFY_MAX_BATCH", "64"))
+CLASSIFY_MAX_WAIT_MS = float(os.getenv("CLASSIFY_MAX_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    """Groups concurrent single-item requests into one model call.
+
+    ``submit()`` queues an item and awaits its result. A single collector
+    task takes the first queued item, keeps collecting for up to
+    ``max_wait_ms`` (or until ``max_batch_size`` items), then runs
+    ``predict(items)`` in a thread so the event loop stays free, or awaits
+    it when ``predict`` is a coroutine function. Requests arriving while the
+    model runs simply form the next batch.
+
+    ``predict`` receives a list and must return one result per item, in order.
+    """
+
+    def __init__(self, predict, max_batch_size=CLASSIFY_MAX_BATCH, max_wait_ms=CLASSIFY_MAX_WAIT_MS, name="batcher"):
+        self.predict = predict
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self):
+        """Items queued for the next batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=self.name)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Fail whatever was still waiting for a batch
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} stopped"))
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, item):
+        if not self.running:
+            raise RuntimeError(f"{self.name} is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Drop requests whose callers already went away (client disconnects)
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            observe_batch(self.name, len(batch))
+            try:
+                with observe_inference(self.name, "predict"):
+                    items = [item for item, _ in batch]
+                    if asyncio.iscoroutinefunction(self.predict):
+                        results = await self.predict(items)
+                    else:
+                        results = await loop.run_in_executor(self._executor, self.predict, items)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -2,108 +2,105 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
 
-from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, status, Request, Query
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select, update, func, case
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field, validator, field_validator, model_validator
 from typing import Optional, List
 import traceback
-import threading
-
-# importing ml pipeline 
-from utils.classifier import classify_user_complaints
+import io
+import tempfile
+from datetime import datetime
 
 from .models import Complaint, StatusEnum, User
-from .dependencies import get_db
-from .auth import  verify_token
+from .dependencies import get_async_db
+from .auth import TokenData, get_current_user, get_current_admin
+from .filters import (
+    ComplaintFilters, complaint_filters, apply_complaint_filters,
+    apply_keyset_page, split_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+from .stats import get_complaint_stats, stats_cache
+from .outbox import enqueue_classification
+from .schemas import (
+    ComplaintCreate, COMPLAINT_COLUMNS, USER_COMPLAINT_COLUMNS, ADMIN_COMPLAINT_COLUMNS,
+    UPDATED_COMPLAINT_COLUMNS, serialize_rows, serialize_complaint
+)
+from .responses import ORJSONResponse
+from .export import EXPORT_FORMATS, export_complaints
+from .search import search_query, MAX_SEARCH_OFFSET
+from .batcher import MicroBatcher
+from .events import event_hub
+from utils.inference_service import inference_service
+from utils.ingest import detect_format, read_records, ingest_records
+
+# Coalesces concurrent /classify calls into one model batch; started by the server lifespan
+classify_batcher = MicroBatcher(inference_service.classify_with_probabilities, name="classify-batcher")
 
 # Define router
 complaint_router = APIRouter()
 
 # Pydantic models for request validation
-class ComplaintCreate(BaseModel):
-    trainNumber: str
-    pnrNumber: str
-    coachNumber: str
-    seatNumber: str
-    sourceStation: str
-    destinationStation: str
-    complaint: str
-    
-    @field_validator('trainNumber')
-    def validate_train_number(cls, v):
-        if not v.isdigit():
-            raise ValueError("Train number must be numeric")
-        return v.strip()
-    
-    @field_validator('pnrNumber')
-    def validate_pnr_number(cls, v):
-        v = v.strip()
-        if not v.isdigit() or len(v) != 10:
-            raise ValueError("PNR must be a 10-digit number")
-        return v
-    
-    @field_validator('seatNumber')
-    def validate_seat_number(cls, v):
-        if not v.isdigit():
-            raise ValueError("Seat number must be numeric")
-        return v.strip()
-    
-    @field_validator('complaint')
-    def validate_complaint(cls, v):
-        v = v.strip()
-        if len(v) < 20:
-            raise ValueError("Complaint description must be at least 20 characters")
-        return v
-    
-    @model_validator(mode='after')
-    def validate_stations(cls, model):
-        if model.sourceStation.strip() == model.destinationStation.strip():
-            raise ValueError("Source and destination stations cannot be the same")
-        return model
-
-    class Config:
-        anystr_strip_whitespace = True
+class ClassifyRequest(BaseModel):
+    complaint: str = Field(..., min_length=1, max_length=5000)
 
 class ComplaintUpdate(BaseModel):
     status: Optional[str] = None
     resolution: Optional[str] = None
 
+class BulkComplaintUpdate(ComplaintUpdate):
+    # Either explicit ids or a filter (at least one field set), not both
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[ComplaintFilters] = None
+
 # Define valid statuses (using enum values from model)
 VALID_STATUSES = {"pending", "inProgress", "resolved"}
 
-# Background task for classification
-def classify_in_background(user_id: str):
-    try:
-        print(f"Starting background classification for user {user_id}")
-        # Note: If classify_user_complaints is async, you'll need to handle it differently
-        # For now, assuming it can work synchronously or you have a sync version
-        import asyncio
-        asyncio.run(classify_user_complaints(user_id))
-        print(f"Completed background classification for user {user_id}")
-    except Exception as e:
-        print(f"Error in background classification for user {user_id}: {e}")
-        traceback.print_exc()
+# Ids per UPDATE ... WHERE id IN (...) statement of a bulk update
+BULK_UPDATE_CHUNK_SIZE = 500
+# Most complaints a bulk update by filter may match (the same bound as explicit ids)
+BULK_UPDATE_MAX_MATCHES = 10000
+
+def update_values(update_data: ComplaintUpdate):
+    """Column -> value for the fields set in an update body (400 on a bad status or an empty body)."""
+    values = {}
+    if update_data.status:
+        if update_data.status not in VALID_STATUSES:
+            raise HTTPException(status_code=400, detail="Invalid status")
+        values[Complaint.status] = StatusEnum[update_data.status]
+    if update_data.resolution is not None:
+        values[Complaint.resolution] = update_data.resolution
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    return values
+
+async def matching_ids(db: AsyncSession, filters: ComplaintFilters, limit: int):
+    """Ids of up to ``limit`` complaints matching ``filters``, read in keyset pages of BULK_UPDATE_CHUNK_SIZE."""
+    ids, cursor = [], None
+    while len(ids) < limit:
+        query = apply_complaint_filters(select(Complaint.id, Complaint.created_at), filters)
+        rows = (await db.execute(apply_keyset_page(query, cursor, BULK_UPDATE_CHUNK_SIZE))).all()
+        rows, cursor = split_page(rows, BULK_UPDATE_CHUNK_SIZE)
+        ids.extend(row.id for row in rows)
+        if cursor is None:
+            break
+    return ids[:limit]
+
+def updated_events(rows, values):
+    """complaint.updated payloads for (id, user_id) rows changed with ``values``."""
+    changed = {column.key: value for column, value in values.items()}
+    return [{"id": row.id, "userId": row.user_id, **changed} for row in rows]
 
 @complaint_router.post('/', status_code=201)
 async def create_complaint(
-    request: Request,
     complaint: ComplaintCreate, 
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        token = request.cookies.get("access_token_cookie")
-
-        if not token:
-            raise HTTPException(status_code=401, detail="Missing access token")
-        
-        token_data, payload  = verify_token(token)
-
-        if not token_data:
-            raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-        user_id = token_data.user_id
+        user_id = current_user.user_id
         
         # Create new complaint using SQLAlchemy model
         new_complaint = Complaint(
@@ -118,72 +115,77 @@ async def create_complaint(
             status=StatusEnum.pending  # Use enum from model
         )
         
-        # Save complaint using model method
-        new_complaint.save(db)
-        
-        # Schedule the classification in the background
-        background_tasks.add_task(classify_in_background, user_id)
+        # Queue the classification in the same transaction as the complaint
+        db.add(new_complaint)
+        await db.flush()
+        await db.run_sync(enqueue_classification, [new_complaint.id])
+        await db.commit()
+        stats_cache.invalidate()
 
+        created = serialize_complaint(new_complaint, COMPLAINT_COLUMNS)
+        event_hub.publish_complaints("complaint.created", [{**created, "userId": user_id}])
         return {
             "message": "Complaint created successfully",
-            "complaint": {
-                "id": new_complaint.id,
-                "trainNumber": new_complaint.trainNumber,
-                "pnrNumber": new_complaint.pnrNumber,
-                "coachNumber": new_complaint.coachNumber,
-                "seatNumber": new_complaint.seatNumber,
-                "sourceStation": new_complaint.sourceStation,
-                "destinationStation": new_complaint.destinationStation,
-                "complaint": new_complaint.complaint,
-                "status": new_complaint.status.value,
-                "createdAt": new_complaint.created_at.isoformat()
-            }
+            "complaint": created
         }
 
+    except Exception as e:
+        await db.rollback()
+        traceback.print_exc()
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Request bodies above this size are spooled to disk while they stream in
+BULK_SPOOL_BYTES = 8 * 1024 * 1024
+
+@complaint_router.post("/bulk")
+async def bulk_create_complaints(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    # NDJSON or CSV body; rows are validated and inserted in chunked transactions
+    fmt = format or detect_format(content_type=request.headers.get("content-type"))
+    spool = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_BYTES)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+
+        def run():
+            text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+            return ingest_records(read_records(text, fmt), current_user.user_id)
+
+        report = await run_in_threadpool(run)
+        return {
+            "success": report.failed == 0,
+            "message": f"Imported {report.inserted} of {report.received} complaints",
+            "report": report.as_dict()
+        }
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        spool.close()
 
 @complaint_router.get("/get-complaints")
 async def get_complaints(
-    request: Request,
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        # Query complaints for current user
-        token = request.cookies.get("access_token_cookie")
-        print(f"Token received: {token}")
-        token_data, payload  = verify_token(token)
-        user_id = token_data.user_id
-        print(f"Current user: {user_id}")
-        complaints = db.query(Complaint).filter(
+        # Query complaints for current user, only the response columns
+        user_id = current_user.user_id
+        rows = (await db.execute(select(*USER_COMPLAINT_COLUMNS.values()).filter(
             Complaint.user_id == user_id
-        ).order_by(Complaint.created_at.desc()).all()
-
-        complaints_list = [
-            {
-                "id": c.id,
-                "trainNumber": c.trainNumber,
-                "pnrNumber": c.pnrNumber,
-                "coachNumber": c.coachNumber,
-                "seatNumber": c.seatNumber,
-                "sourceStation": c.sourceStation,
-                "destinationStation": c.destinationStation,
-                "complaint": c.complaint,
-                "status": c.status.value,
-                "classification": c.classification,
-                "sentiment": c.sentiment,
-                "sentimentScore": c.sentimentScore,
-                "createdAt": c.created_at.isoformat()
-            } for c in complaints
-        ]
+        ).order_by(Complaint.created_at.desc()))).all()
 
-        return {
+        # Returned as a response so the rows are encoded once by orjson, not walked by jsonable_encoder
+        return ORJSONResponse({
             "success": True,
             "message": "Complaints fetched successfully",
-            "totalComplaints": len(complaints),
-            "complaints": complaints_list
-        }
+            "totalComplaints": len(rows),
+            "complaints": serialize_rows(rows, USER_COMPLAINT_COLUMNS)
+        })
 
     except Exception as e:
         traceback.print_exc()
@@ -191,41 +193,25 @@ async def get_complaints(
 
 @complaint_router.get("/get-all-complaints")
 async def get_all_complaints(
-    
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: ComplaintFilters = Depends(complaint_filters),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        # Admin can see all complaints
-        complaints = db.query(Complaint).order_by(Complaint.created_at.desc()).all()
-
-        if not complaints:
-            raise HTTPException(status_code=404, detail="No complaints found")
-
-        complaints_list = [
-            {
-                "id": c.id,
-                "trainNumber": c.trainNumber,
-                "pnrNumber": c.pnrNumber,
-                "coachNumber": c.coachNumber,
-                "seatNumber": c.seatNumber,
-                "sourceStation": c.sourceStation,
-                "destinationStation": c.destinationStation,
-                "complaint": c.complaint,
-                "status": c.status.value,
-                "createdAt": c.created_at.isoformat(),
-                "classification": c.classification,
-                "sentiment": c.sentiment,
-                "sentimentScore": c.sentimentScore,
-                "resolution": c.resolution,
-            } for c in complaints
-        ]
+        # Admin can see all complaints, one keyset page at a time
+        query = apply_complaint_filters(select(*ADMIN_COMPLAINT_COLUMNS.values()), filters)
+        rows = (await db.execute(apply_keyset_page(query, cursor, limit))).all()
+        rows, next_cursor = split_page(rows, limit)
 
-        return {
+        return ORJSONResponse({
             "success": True,
             "message": "Complaints fetched successfully",
-            "totalComplaints": len(complaints),
-            "complaints": complaints_list
-        }
+            "totalComplaints": len(rows),
+            "complaints": serialize_rows(rows, ADMIN_COMPLAINT_COLUMNS),
+            "nextCursor": next_cursor,
+            "hasMore": next_cursor is not None
+        })
 
     except HTTPException as e:
         raise e
@@ -233,79 +219,288 @@ async def get_all_complaints(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error fetching complaints {e}")
 
+@complaint_router.get("/search")
+async def search_complaints(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    filters: ComplaintFilters = Depends(complaint_filters),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenData = Depends(get_current_admin)
+):
+    try:
+        # Best BM25 matches first; status/classification/... filters narrow the matches
+        rows = (await db.execute(search_query(q, ADMIN_COMPLAINT_COLUMNS.values(), filters, limit, offset))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return ORJSONResponse({
+            "success": True,
+            "message": "Complaints fetched successfully",
+            "totalComplaints": len(rows),
+            "complaints": serialize_rows(rows, ADMIN_COMPLAINT_COLUMNS),
+            "nextOffset": offset + limit if has_more else None,
+            "hasMore": has_more
+        })
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error searching complaints {e}")
+
+@complaint_router.get("/export")
+async def export_all_complaints(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|columnar)$"),
+    filters: ComplaintFilters = Depends(complaint_filters),
+    current_user: TokenData = Depends(get_current_admin)
+):
+    # Streams the whole filtered table; rows are read from the cursor in batches, never all at once
+    chunks = export_complaints(filters, format)
+    filename = f"complaints-{datetime.utcnow():%Y%m%d-%H%M%S}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@complaint_router.get("/events")
+async def complaint_events(current_user: TokenData = Depends(get_current_user)):
+    # Server-sent events: admins get every complaint change, users the changes to their own complaints
+    admin = current_user.payload.get("role") == "admin"
+    subscriber = event_hub.subscribe(current_user.user_id, admin=admin)
+    return StreamingResponse(
+        event_hub.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@complaint_router.get("/stats")
+async def get_stats(
+    days: int = Query(30, ge=1, le=366),
+    current_user: TokenData = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return {
+            "success": True,
+            "message": "Stats fetched successfully",
+            # The aggregation helpers take a sync Session; run_sync hands them one over the async connection
+            "stats": await db.run_sync(get_complaint_stats, days)
+        }
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error fetching stats {e}")
+
+@complaint_router.post("/classify")
+async def classify_complaint(
+    body: ClassifyRequest,
+    current_user: TokenData = Depends(get_current_user)
+):
+    # Preview of the category while the user types; nothing is stored
+    try:
+        result = await classify_batcher.submit(body.complaint)
+        return {"success": True, **result}
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=503, detail=f"Classification unavailable {e}")
+
 @complaint_router.put("/update/{complaint_id}")
 async def update_complaint_status(
     complaint_id: str, 
     update_data: ComplaintUpdate,
     
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         # Find the complaint
-        complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+        complaint = await db.scalar(select(Complaint).filter(Complaint.id == complaint_id))
         
         if not complaint:
             raise HTTPException(status_code=404, detail="Complaint not found")
 
-        # Validate and update status if provided
-        if update_data.status:
-            if update_data.status not in VALID_STATUSES:
-                raise HTTPException(status_code=400, detail="Invalid status")
-            
-            # Map string status to enum
-            status_mapping = {
-                "pending": StatusEnum.pending,
-                "inProgress": StatusEnum.inProgress,
-                "resolved": StatusEnum.resolved
-            }
-            complaint.status = status_mapping[update_data.status]
-        
-        # Update resolution if provided
-        if update_data.resolution is not None:
-            complaint.resolution = update_data.resolution
-        
+        # Same validation and status mapping as the bulk update
+        values = update_values(update_data)
+        for column, value in values.items():
+            setattr(complaint, column.key, value)
+
         # Save changes
-        db.commit()
-        db.refresh(complaint)
+        await db.commit()
+        stats_cache.invalidate()
+        event_hub.publish_complaints("complaint.updated", updated_events([complaint], values))
 
         return {
             "message": "Complaint updated successfully",
-            "complaint": {
-                "id": complaint.id,
-                "trainNumber": complaint.trainNumber,
-                "pnrNumber": complaint.pnrNumber,
-                "coachNumber": complaint.coachNumber,
-                "seatNumber": complaint.seatNumber,
-                "sourceStation": complaint.sourceStation,
-                "destinationStation": complaint.destinationStation,
-                "complaint": complaint.complaint,
-                "status": complaint.status.value,
-                "resolution": complaint.resolution,
-                "createdAt": complaint.created_at.isoformat()
-            }
+            "complaint": serialize_complaint(complaint, UPDATED_COMPLAINT_COLUMNS)
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        await db.rollback()
+        traceback.print_exc()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@complaint_router.put("/bulk-update")
+async def bulk_update_complaints(
+    update_data: BulkComplaintUpdate,
+    current_user: TokenData = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        # One UPDATE ... RETURNING id per chunk of ids, all in one transaction. A filter is
+        # first resolved to ids in keyset pages, and may match at most BULK_UPDATE_MAX_MATCHES
+        values = update_values(update_data)
+        if (update_data.ids is None) == (update_data.filter is None):
+            raise HTTPException(status_code=400, detail="Provide either ids or filter")
+
+        if update_data.filter is not None:
+            if not any(update_data.filter.model_dump().values()):
+                raise HTTPException(status_code=400, detail="Filter must set at least one field")
+            ids = await matching_ids(db, update_data.filter, BULK_UPDATE_MAX_MATCHES + 1)
+            if len(ids) > BULK_UPDATE_MAX_MATCHES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Filter matches more than {BULK_UPDATE_MAX_MATCHES} complaints; narrow it"
+                )
+        else:
+            ids = list(dict.fromkeys(update_data.ids))
+        rows = []
+        for start in range(0, len(ids), BULK_UPDATE_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_UPDATE_CHUNK_SIZE]
+            statement = update(Complaint).where(Complaint.id.in_(chunk))
+            if update_data.filter is not None:
+                # Rows changed since they were selected must still match
+                statement = apply_complaint_filters(statement, update_data.filter)
+            rows.extend((await db.execute(statement.values(values).returning(Complaint.id, Complaint.user_id))).all())
+        await db.commit()
+        updated = {row.id for row in rows}
+        if updated:
+            stats_cache.invalidate()
+            event_hub.publish_complaints("complaint.updated", updated_events(rows, values))
+
+        response = {
+            "success": len(updated) == len(ids),
+            "message": f"Updated {len(updated)} of {len(ids)} complaints",
+            "updated": len(updated),
+            "notFound": len(ids) - len(updated),
         }
+        if update_data.filter is None:
+            # Per-id outcomes only for explicit ids; a filter's matches are all reported as updated
+            response["results"] = [
+                {"id": complaint_id, "status": "updated" if complaint_id in updated else "notFound"}
+                for complaint_id in ids
+            ]
+        return response
 
     except HTTPException as e:
         raise e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        traceback.print_exc()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@complaint_router.get("/clusters")
+async def get_complaint_clusters(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    minSize: int = Query(2, ge=1),
+    filters: ComplaintFilters = Depends(complaint_filters),
+    current_user: TokenData = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        # Near-duplicate clusters (see utils.dedup), most recently active first.
+        # Filters select the member complaints that are counted, e.g. status=pending
+        members = apply_complaint_filters(
+            select(
+                Complaint.cluster_id.label("cluster_id"),
+                func.count().label("size"),
+                func.sum(case((Complaint.status != StatusEnum.resolved, 1), else_=0)).label("open"),
+                func.min(Complaint.created_at).label("first_at"),
+                func.max(Complaint.created_at).label("last_at"),
+            ).filter(Complaint.cluster_id.isnot(None)),
+            filters
+        ).group_by(Complaint.cluster_id).having(func.count() >= minSize).subquery()
+        first = aliased(Complaint)
+        rows = (await db.execute(
+            select(members, first.trainNumber, first.complaint, first.classification)
+            .join(first, first.id == members.c.cluster_id)
+            .order_by(members.c.last_at.desc())
+            .limit(limit)
+        )).all()
+
+        return {
+            "success": True,
+            "message": "Clusters fetched successfully",
+            "totalClusters": len(rows),
+            "clusters": [
+                {
+                    "clusterId": row.cluster_id,
+                    "size": row.size,
+                    "open": row.open,
+                    "trainNumber": row.trainNumber,
+                    "complaint": row.complaint,
+                    "classification": row.classification,
+                    "firstAt": row.first_at,
+                    "lastAt": row.last_at,
+                } for row in rows
+            ]
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error fetching clusters {e}")
+
+@complaint_router.put("/clusters/{cluster_id}")
+async def update_complaint_cluster(
+    cluster_id: str,
+    update_data: ComplaintUpdate,
+    current_user: TokenData = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        # Resolve every complaint of a near-duplicate cluster with one UPDATE
+        values = update_values(update_data)
+        rows = (await db.execute(
+            update(Complaint).where(Complaint.cluster_id == cluster_id).values(values)
+            .returning(Complaint.id, Complaint.user_id)
+        )).all()
+        if not rows:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="Cluster not found")
+        await db.commit()
+        stats_cache.invalidate()
+        event_hub.publish_complaints("complaint.updated", updated_events(rows, values))
+
+        return {"message": "Cluster updated successfully", "clusterId": cluster_id, "updated": len(rows)}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        await db.rollback()
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=str(e))
 
 # Add a manual endpoint to trigger classification for debugging
 @complaint_router.post("/trigger-classification")
 async def trigger_classification(
-    request: Request,
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        token = request.cookies.get("access_token_cookie")
-        token_data, payload = verify_token(token)
-        user_id = token_data.user_id
-        # Run classification in a separate thread to avoid blocking
-        thread = threading.Thread(target=classify_in_background, args=(user_id,))
-        thread.start()
-        
-        return {"message": "Classification triggered successfully"}
+        user_id = current_user.user_id
+        # Queue the user's unclassified complaints; the worker pool picks them up
+        unclassified = (await db.scalars(select(Complaint.id).filter(
+            Complaint.user_id == user_id,
+            Complaint.classification.is_(None)
+        ))).all()
+        queued = await db.run_sync(enqueue_classification, unclassified)
+        await db.commit()
+
+        return {"message": "Classification triggered successfully", "queued": queued}
     except Exception as e:
+        await db.rollback()
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -8,10 +8,11 @@ load_dotenv()
 
 class Settings(BaseSettings):
     VERSION: str = "v1"
-    DATABASE_URL: str
     FLASK_JWT_SECRET_KEY: str
 
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+    # The database is the SQLite file at DATABASE_PATH (see database.py); an
+    # old .env that still sets DATABASE_URL keeps loading
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
 settings = Settings()
\ No newline at end of file
@@ -1,9 +1,10 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine
-from .config import settings
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from .metrics import instrument_engine
 
 # Get the absolute path of this file
 THIS_FILE = os.path.abspath(__file__)
@@ -21,14 +22,111 @@ INSTANCE_DIR = os.path.join(ROOT_DIR, "instance")
 # Make sure instance directory exists
 os.makedirs(INSTANCE_DIR, exist_ok=True)
 
-# SQLite DB path inside instance folder at root
-DATABASE_PATH = os.path.join(INSTANCE_DIR, "user.db")
+# SQLite DB path inside instance folder at root (DATABASE_PATH overrides it,
+# e.g. to point benchmarks at a throwaway file)
+DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(INSTANCE_DIR, "user.db"))
 
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-# engine =create_async_engine(url=settings.DATABASE_URL, echo=True)
+# SQLite tuning profile, applied to every new connection of both engines.
+# WAL lets API readers run while the classification worker writes, and with
+# WAL synchronous=NORMAL only fsyncs at checkpoints instead of every commit.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "10"))
+SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", "20"))
+
+
+def sqlite_pragmas(**overrides):
+    """The PRAGMA name -> value profile from the environment, with overrides."""
+    pragmas = {
+        "journal_mode": SQLITE_JOURNAL_MODE,
+        "synchronous": SQLITE_SYNCHRONOUS,
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -SQLITE_CACHE_SIZE_KB,
+        "mmap_size": SQLITE_MMAP_SIZE,
+    }
+    pragmas.update(overrides)
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine, pragmas=None):
+    """Run the pragmas on every connection the engine opens."""
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+def create_sqlite_engine(url=DATABASE_URL, pragmas=None, **kwargs):
+    """Sync SQLite engine with the tuning profile and a bounded connection pool.
+
+    Connections are shared across threads (worker pool, thread-pool routes),
+    hence check_same_thread=False; QueuePool keeps them open so the pragmas
+    and SQLite's page cache survive between requests.
+    """
+    kwargs.setdefault("poolclass", QueuePool)
+    kwargs.setdefault("pool_size", SQLITE_POOL_SIZE)
+    kwargs.setdefault("max_overflow", SQLITE_MAX_OVERFLOW)
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+    return apply_sqlite_pragmas(engine, pragmas)
+
+
+engine = instrument_engine(create_sqlite_engine(DATABASE_URL), "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+# Request handlers use the async engine, the classification workers, CLIs,
+# ingest, export and search the sync engine above. Both open the same SQLite
+# file: the FTS5 index, the pragmas and the outbox are SQLite-specific.
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_size=SQLITE_POOL_SIZE, max_overflow=SQLITE_MAX_OVERFLOW)
+apply_sqlite_pragmas(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine, "async")
+
+# expire_on_commit=False: handlers read attributes after commit without a lazy reload
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
+
+
+def _add_missing_columns(engine):
+    existing = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            present = {column["name"] for column in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+
+
+def init_db():
+    """Create missing tables and indexes.
+
+    ``create_all`` only emits indexes together with a new table, so columns
+    and indexes added to an existing model are created here one by one
+    (new columns must be nullable). The full-text search index is not a
+    model table and is set up by its own module.
+    """
+    from . import models  # noqa: F401  (registers the tables on Base)
+    from .search import init_search_index
+
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    init_search_index(engine)
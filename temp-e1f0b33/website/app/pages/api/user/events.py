@@ -0,0 +1,159 @@
+"""In-process fan-out of complaint changes to server-sent-event streams.
+
+Each open ``GET /complaints/events`` connection is one Subscriber with a
+bounded queue. ``publish_complaints`` puts an event on the queue of every
+admin stream and of the owners' own streams, without awaiting anything. A
+subscriber whose queue is full is evicted and its stream ends, and the
+browser's EventSource reconnects. So a stalled client costs at most
+EVENTS_QUEUE_SIZE events of memory and never slows down the publisher.
+
+Request handlers publish from the event loop. The classification worker
+threads use ``publish_complaints_threadsafe``. Under the prefork launcher
+each worker process has its own hub, and ``relay`` forwards what it
+publishes to the other workers through the master. A separate
+``python -m utils.classifier`` process does not reach any hub.
+"""
+import asyncio
+import itertools
+import os
+
+import orjson
+
+# Events buffered per connection before it counts as a slow consumer
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+# Seconds between keep-alive comments on an idle stream
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# Queued in place of an event to end a stream
+_CLOSE = None
+
+
+class Subscriber:
+    __slots__ = ("user_id", "admin", "queue", "evicted")
+
+    def __init__(self, user_id, admin, queue_size):
+        self.user_id = user_id
+        self.admin = admin
+        self.queue = asyncio.Queue(queue_size)
+        self.evicted = False
+
+
+class EventHub:
+    def __init__(self, queue_size=EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._admins = set()
+        self._by_user = {}
+        self._ids = itertools.count(1)
+        self._loop = None
+        # Called with (event_type, complaints) for events published in this process
+        self.relay = None
+        self.published = 0
+        self.evictions = 0
+
+    def start(self):
+        """Bind to the running event loop (server lifespan) so threads can publish."""
+        self._loop = asyncio.get_running_loop()
+
+    def stop(self):
+        for subscriber in list(self._admins) + [s for subs in self._by_user.values() for s in subs]:
+            self._close(subscriber)
+        self._loop = None
+
+    @property
+    def connections(self):
+        return len(self._admins) + sum(len(subs) for subs in self._by_user.values())
+
+    def subscribe(self, user_id, admin=False):
+        subscriber = Subscriber(user_id, admin, self.queue_size)
+        if admin:
+            self._admins.add(subscriber)
+        else:
+            self._by_user.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        if subscriber.admin:
+            self._admins.discard(subscriber)
+            return
+        subs = self._by_user.get(subscriber.user_id)
+        if subs is not None:
+            subs.discard(subscriber)
+            if not subs:
+                del self._by_user[subscriber.user_id]
+
+    def _close(self, subscriber):
+        # Make room so the close marker always fits
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(_CLOSE)
+
+    def _evict(self, subscriber):
+        subscriber.evicted = True
+        self.evictions += 1
+        self.unsubscribe(subscriber)
+        self._close(subscriber)
+
+    def _message(self, event_type, data):
+        self.published += 1
+        return (next(self._ids), event_type, orjson.dumps(data, default=str))
+
+    def _send(self, subscribers, message):
+        for subscriber in list(subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def publish_complaints(self, event_type, complaints, relay=True):
+        """Send ``{"complaints": [...]}`` events for changed complaints (dicts with ``userId``).
+
+        Admin streams get one event with every complaint and each owner one
+        event with their own, so a batch of any size costs each stream one
+        queue slot. ``relay=False`` is for events relayed in from other processes.
+        """
+        if not complaints:
+            return
+        if relay and self.relay is not None:
+            self.relay(event_type, complaints)
+        if self._admins:
+            self._send(self._admins, self._message(event_type, {"complaints": complaints}))
+        by_owner = {}
+        for complaint in complaints:
+            if complaint["userId"] in self._by_user:
+                by_owner.setdefault(complaint["userId"], []).append(complaint)
+        for user_id, owned in by_owner.items():
+            self._send(self._by_user.get(user_id, ()), self._message(event_type, {"complaints": owned}))
+
+    def publish_complaints_threadsafe(self, event_type, complaints):
+        """``publish_complaints`` from a worker thread; dropped when the hub is not running."""
+        loop = self._loop
+        if loop is None or not complaints:
+            return
+        try:
+            loop.call_soon_threadsafe(self.publish_complaints, event_type, complaints)
+        except RuntimeError:
+            # The loop closed during shutdown
+            pass
+
+    async def stream(self, subscriber, heartbeat=EVENTS_HEARTBEAT_SECONDS):
+        """SSE wire format for one subscriber until it is closed, evicted or the client leaves."""
+        try:
+            yield "retry: 3000\n: connected\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if message is _CLOSE:
+                    if subscriber.evicted:
+                        yield "event: evicted\ndata: {}\n\n"
+                    return
+                event_id, event_type, data = message
+                yield f"id: {event_id}\nevent: {event_type}\ndata: {data.decode()}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+
+event_hub = EventHub()
+
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import select
+
+from .database import SessionLocal
+from .filters import ComplaintFilters, apply_complaint_filters
+from .models import Complaint
+
+# Rows fetched from the cursor and written out per chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    # NDJSON where each line holds one batch column by column, like a Parquet row group
+    "columnar": "application/x-ndjson",
+}
+
+# Output name -> column; only these columns are selected, no ORM entities are built
+EXPORT_COLUMNS = {
+    "id": Complaint.id,
+    "userId": Complaint.user_id,
+    "trainNumber": Complaint.trainNumber,
+    "pnrNumber": Complaint.pnrNumber,
+    "coachNumber": Complaint.coachNumber,
+    "seatNumber": Complaint.seatNumber,
+    "sourceStation": Complaint.sourceStation,
+    "destinationStation": Complaint.destinationStation,
+    "complaint": Complaint.complaint,
+    "status": Complaint.status,
+    "classification": Complaint.classification,
+    "sentiment": Complaint.sentiment,
+    "sentimentScore": Complaint.sentimentScore,
+    "resolution": Complaint.resolution,
+    "clusterId": Complaint.cluster_id,
+    "createdAt": Complaint.created_at,
+}
+EXPORT_FIELDS = list(EXPORT_COLUMNS)
+_STATUS_INDEX = EXPORT_FIELDS.index("status")
+_CREATED_AT_INDEX = EXPORT_FIELDS.index("createdAt")
+
+
+def export_query(filters: ComplaintFilters):
+    """Column-only SELECT of the filtered complaints, newest first (raises 400 on bad filters)."""
+    query = apply_complaint_filters(select(*EXPORT_COLUMNS.values()), filters)
+    return query.order_by(Complaint.created_at.desc(), Complaint.id.desc())
+
+
+def iter_complaint_batches(query, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield lists of plain row values, reading the cursor ``batch_size`` rows at a time.
+
+    Opens its own session: the response body is produced after the request
+    handler has returned, so the request-scoped session cannot be used.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=batch_size, stream_results=True))
+        for partition in result.partitions():
+            rows = []
+            for row in partition:
+                row = list(row)
+                row[_STATUS_INDEX] = row[_STATUS_INDEX].value
+                row[_CREATED_AT_INDEX] = row[_CREATED_AT_INDEX].isoformat() if row[_CREATED_AT_INDEX] else None
+                rows.append(row)
+            yield rows
+    finally:
+        db.close()
+
+
+def ndjson_chunks(batches):
+    for rows in batches:
+        yield "".join(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n" for row in rows)
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def columnar_chunks(batches):
+    for rows in batches:
+        columns = dict(zip(EXPORT_FIELDS, map(list, zip(*rows))))
+        yield json.dumps({"rows": len(rows), "columns": columns}) + "\n"
+
+
+EXPORT_WRITERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+    "columnar": columnar_chunks,
+}
+
+
+def export_complaints(filters: ComplaintFilters, fmt: str, batch_size: int = EXPORT_BATCH_SIZE):
+    """Text chunks of the filtered complaint table in ``fmt``; memory is bounded by ``batch_size``."""
+    return EXPORT_WRITERS[fmt](iter_complaint_batches(export_query(filters), batch_size))
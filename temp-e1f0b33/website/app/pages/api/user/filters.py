@@ -0,0 +1,119 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import and_, or_
+
+from .models import Complaint, StatusEnum
+
+# Page size limits for admin listings
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Accept both the API keys ("inProgress") and the stored values ("In Progress")
+STATUS_LOOKUP = {
+    **{s.name: s for s in StatusEnum},
+    **{s.value: s for s in StatusEnum},
+}
+
+
+class ComplaintFilters(BaseModel):
+    status: Optional[str] = None
+    classification: Optional[str] = None
+    sentiment: Optional[str] = None
+    trainNumber: Optional[str] = None
+    clusterId: Optional[str] = None
+    createdFrom: Optional[datetime] = None
+    createdTo: Optional[datetime] = None
+
+
+def complaint_filters(
+    status: Optional[str] = Query(None),
+    classification: Optional[str] = Query(None),
+    sentiment: Optional[str] = Query(None),
+    trainNumber: Optional[str] = Query(None),
+    clusterId: Optional[str] = Query(None),
+    createdFrom: Optional[datetime] = Query(None),
+    createdTo: Optional[datetime] = Query(None),
+) -> ComplaintFilters:
+    """FastAPI dependency collecting the admin list filters from the query string."""
+    return ComplaintFilters(
+        status=status,
+        classification=classification,
+        sentiment=sentiment,
+        trainNumber=trainNumber,
+        clusterId=clusterId,
+        createdFrom=createdFrom,
+        createdTo=createdTo,
+    )
+
+
+def parse_status(value: str) -> StatusEnum:
+    status = STATUS_LOOKUP.get(value)
+    if status is None:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    return status
+
+
+def apply_complaint_filters(query, filters: ComplaintFilters):
+    """Add WHERE clauses for every filter that is set.
+
+    Each filter is an equality or range on a column that leads one of the
+    composite indexes on Complaint, so SQLite can seek instead of scanning.
+    """
+    if filters.status:
+        query = query.filter(Complaint.status == parse_status(filters.status))
+    if filters.classification:
+        query = query.filter(Complaint.classification == filters.classification)
+    if filters.sentiment:
+        query = query.filter(Complaint.sentiment == filters.sentiment)
+    if filters.trainNumber:
+        query = query.filter(Complaint.trainNumber == filters.trainNumber.strip())
+    if filters.clusterId:
+        query = query.filter(Complaint.cluster_id == filters.clusterId)
+    if filters.createdFrom:
+        query = query.filter(Complaint.created_at >= filters.createdFrom)
+    if filters.createdTo:
+        query = query.filter(Complaint.created_at < filters.createdTo)
+    return query
+
+
+def encode_cursor(created_at: datetime, complaint_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), complaint_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, complaint_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(complaint_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset_page(query, cursor: Optional[str], limit: int):
+    """Order newest first on (created_at, id) and seek past the cursor.
+
+    The cursor is the (created_at, id) of the last row of the previous page,
+    so every page is an index range scan of ``limit`` rows no matter how deep
+    the client has paged.
+    """
+    if cursor:
+        created_at, complaint_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Complaint.created_at < created_at,
+            and_(Complaint.created_at == created_at, Complaint.id < complaint_id),
+        ))
+    return query.order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(limit + 1)
+
+
+def split_page(rows, limit: int):
+    """Trim the look-ahead row and build the cursor for the next page."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    return rows, next_cursor
@@ -0,0 +1,235 @@
+"""Prometheus metrics for requests, SQL queries and the classifier, served at ``GET /metrics``.
+
+Each request is timed per route template (``/complaints/update/{complaint_id}``,
+not the raw path). The time is split into what it spent in SQL (cursor
+execute, from engine events) and in rendering the JSON body. The rest is ORM
+hydration and handler code. Queue depths are read when Prometheus scrapes.
+
+Recording is a few ``perf_counter`` calls and histogram increments per
+request and per query. ``METRICS_ENABLED=false`` removes the request
+middleware and the query events; batch metrics and ``/metrics`` remain.
+
+With PROMETHEUS_MULTIPROC_DIR set before this module is imported (the
+prefork launcher does it), histograms are kept in files shared by all
+worker processes and any worker's ``/metrics`` reports their sum. Gauges
+from ``register_gauge`` are still read in the worker that answers.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency until the last body byte is sent.",
+    ["method", "route", "status"])
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time a request spent executing SQL.", ["method", "route"])
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed by a request.", ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS)
+REQUEST_RENDER_SECONDS = Histogram(
+    "http_request_render_seconds", "Time a request spent encoding its JSON body.", ["method", "route"])
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", ["engine", "statement"])
+CLASSIFICATION_BATCH_SIZE = Histogram(
+    "classification_batch_size", "Complaints per classification batch.", ["source"],
+    buckets=BATCH_SIZE_BUCKETS)
+CLASSIFICATION_SECONDS = Histogram(
+    "classification_inference_seconds", "Model time per classification batch.", ["source", "stage"])
+
+_STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "render_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request. The object is
+# mutated in place, so thread-pool handlers and SQLAlchemy's async greenlets,
+# which run in copies of the context, add to the same totals.
+_request_stats = ContextVar("request_stats", default=None)
+
+
+def route_template(scope):
+    """The matched route's path template including router prefixes, or "unmatched".
+
+    ``scope["route"]`` of a route in an included router only carries the
+    path relative to that router, so the prefix is recovered from the
+    request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    path = scope["path"]
+    try:
+        suffix = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    if path.endswith(suffix):
+        return path[:len(path) - len(suffix)] + template
+    return template
+
+
+# (method, route, status) -> observe methods of the request histograms.
+# labels() takes a lock and builds a key per call; the label sets are few and fixed
+_request_observer_cache = {}
+
+
+def _request_observers(key):
+    observers = _request_observer_cache.get(key)
+    if observers is None:
+        method, path, status = key
+        observers = _request_observer_cache[key] = (
+            REQUEST_SECONDS.labels(method, path, status).observe,
+            REQUEST_DB_SECONDS.labels(method, path).observe,
+            REQUEST_DB_QUERIES.labels(method, path).observe,
+            REQUEST_RENDER_SECONDS.labels(method, path).observe,
+        )
+    return observers
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by method, route template and status.
+
+    Event streams (text/event-stream) are left out: their duration is how
+    long the client stayed connected.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        streaming = False
+
+        async def send_with_status(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-type" and value.startswith(b"text/event-stream"):
+                        streaming = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            if not streaming:
+                seconds, db_seconds, queries, render_seconds = _request_observers(
+                    (scope["method"], route_template(scope), str(status)))
+                seconds(time.perf_counter() - started)
+                db_seconds(stats.db_seconds)
+                queries(stats.queries)
+                render_seconds(stats.render_seconds)
+
+
+def instrument_engine(engine, name):
+    """Time every statement the (sync) engine executes; for an AsyncEngine pass ``.sync_engine``."""
+    from sqlalchemy import event
+
+    if not METRICS_ENABLED:
+        return engine
+    observers = {statement: DB_QUERY_SECONDS.labels(name, statement.lower())
+                 for statement in _STATEMENT_TYPES | {"OTHER"}}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        keyword = statement.lstrip()[:6].upper()
+        observers[keyword if keyword in _STATEMENT_TYPES else "OTHER"].observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    return engine
+
+
+def record_render(seconds):
+    """Add JSON encoding time to the current request."""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.render_seconds += seconds
+
+
+@contextmanager
+def observe_inference(source, stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        CLASSIFICATION_SECONDS.labels(source, stage).observe(time.perf_counter() - started)
+
+
+def observe_batch(source, size):
+    CLASSIFICATION_BATCH_SIZE.labels(source).observe(size)
+
+
+class _GaugeCallback:
+    def __init__(self, name, documentation, read, label):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.label = label
+
+    def describe(self):
+        return [GaugeMetricFamily(self.name, self.documentation, labels=[self.label] if self.label else None)]
+
+    def collect(self):
+        value = self.read()
+        if self.label is None:
+            yield GaugeMetricFamily(self.name, self.documentation, value=value)
+            return
+        family = GaugeMetricFamily(self.name, self.documentation, labels=[self.label])
+        for key, count in value.items():
+            family.add_metric([str(key)], count)
+        yield family
+
+
+_gauges = []
+
+
+def register_gauge(name, documentation, read, label=None):
+    """A gauge computed by ``read()`` at scrape time: a number, or ``{label value: number}`` with ``label``."""
+    gauge = _GaugeCallback(name, documentation, read, label)
+    _gauges.append(gauge)
+    REGISTRY.register(gauge)
+
+
+def render_metrics():
+    """Body and content type of the Prometheus text exposition."""
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for gauge in _gauges:
+        registry.register(gauge)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,14 +1,15 @@
-from sqlalchemy import Column, String, Float, Enum, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, Integer, Enum, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, Session
 from uuid import uuid4
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from jose import jwt
 import enum
 from datetime import datetime, timedelta
 import os
 from .database import Base
 from .config import load_dotenv
+from .passwords import hash_password
 load_dotenv()
 
 # Base = declarative_base()
@@ -44,7 +45,7 @@ class User(Base):
         return f"User(id={self.id}, name={self.name}, email={self.email})"
     
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
 
     def check_password(self, password):
         return check_password_hash(self.password, password)
@@ -109,9 +110,23 @@ class Complaint(Base):
     status = Column(Enum(StatusEnum), nullable=False, default=StatusEnum.pending)
     resolution = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Id of the first complaint of its near-duplicate cluster (utils.dedup); set by the classifier
+    cluster_id = Column(String, nullable=True)
 
     user = relationship("User", back_populates="complaints")
 
+    # Composite indexes backing the keyset-paginated, filtered listings.
+    # Every index ends in (created_at, id) so a filtered page is a single range scan.
+    __table_args__ = (
+        Index("ix_complaint_created_at_id", "created_at", "id"),
+        Index("ix_complaint_user_created_at", "user_id", "created_at", "id"),
+        Index("ix_complaint_status_created_at", "status", "created_at", "id"),
+        Index("ix_complaint_classification_created_at", "classification", "created_at", "id"),
+        Index("ix_complaint_sentiment_created_at", "sentiment", "created_at", "id"),
+        Index("ix_complaint_train_created_at", "trainNumber", "created_at", "id"),
+        Index("ix_complaint_cluster_created_at", "cluster_id", "created_at", "id"),
+    )
+
     def __repr__(self) -> str:
         return f"Complaint(id={self.id}, PNR={self.pnrNumber}, complaint={self.complaint})"
 
@@ -130,4 +145,34 @@ class Complaint(Base):
             db.commit()
         except Exception as e:
             db.rollback()
-            raise e
\ No newline at end of file
+            raise e
+
+class JobStatusEnum(enum.Enum):
+    queued = "queued"
+    running = "running"
+    failed = "failed"
+
+class ClassificationJob(Base):
+    """Outbox row asking for a complaint to be classified.
+
+    The complaint id is the primary key, so enqueueing the same complaint
+    twice is a no-op. Finished jobs are deleted; jobs that keep failing stay
+    behind with status ``failed`` for inspection.
+    """
+    __tablename__ = "classification_job"
+
+    complaint_id = Column(String, ForeignKey('complaint.id'), primary_key=True)
+    status = Column(Enum(JobStatusEnum), nullable=False, default=JobStatusEnum.queued)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_classification_job_claim", "status", "available_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"ClassificationJob(complaint_id={self.complaint_id}, status={self.status}, attempts={self.attempts})"
@@ -0,0 +1,143 @@
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import and_, or_, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import ClassificationJob, JobStatusEnum
+
+# Retry policy for classification jobs
+JOB_MAX_ATTEMPTS = int(os.getenv("CLASSIFY_JOB_MAX_ATTEMPTS", "5"))
+JOB_LEASE_SECONDS = int(os.getenv("CLASSIFY_JOB_LEASE_SECONDS", "120"))
+JOB_BACKOFF_BASE_SECONDS = float(os.getenv("CLASSIFY_JOB_BACKOFF_SECONDS", "5"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("CLASSIFY_JOB_BACKOFF_MAX_SECONDS", "600"))
+
+def enqueue_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT into the job table, executed with one parameter set per id.
+
+    Complaints that already have a queued or running job are skipped, which
+    is what deduplicates bursts of submissions. A job parked as ``failed``
+    is queued again with a fresh set of attempts. The statement carries no
+    values, so it is compiled once and reused as an executemany.
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(ClassificationJob.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=["complaint_id"],
+        set_={
+            "status": statement.excluded.status,
+            "attempts": 0,
+            "available_at": statement.excluded.available_at,
+            "locked_by": None,
+            "lease_expires_at": None,
+        },
+        where=ClassificationJob.__table__.c.status == JobStatusEnum.failed,
+    )
+
+
+def enqueue_classification(db: Session, complaint_ids):
+    """Queue complaints for classification (caller commits); returns how many jobs were queued.
+
+    Complaints already queued or running are not counted.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "complaint_id": complaint_id,
+            "status": JobStatusEnum.queued,
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now,
+        }
+        for complaint_id in complaint_ids
+    ]
+    if not rows:
+        return 0
+    result = db.connection().execute(enqueue_statement(db.get_bind().dialect.name), rows)
+    return result.rowcount
+
+
+def _claimable(now):
+    return or_(
+        and_(ClassificationJob.status == JobStatusEnum.queued, ClassificationJob.available_at <= now),
+        and_(ClassificationJob.status == JobStatusEnum.running, ClassificationJob.lease_expires_at < now),
+    )
+
+
+def claim_jobs(db: Session, worker_id: str, limit: int):
+    """Lease up to ``limit`` due jobs to this worker.
+
+    Jobs whose lease expired (the worker died mid-batch) are claimable again.
+    The UPDATE repeats the claimable condition, so when two workers race for
+    the same rows only one of them gets each job. Returns (lease token,
+    complaint ids).
+    """
+    now = datetime.utcnow()
+    candidates = [
+        row.complaint_id for row in db.query(ClassificationJob.complaint_id)
+        .filter(_claimable(now))
+        .order_by(ClassificationJob.available_at)
+        .limit(limit)
+    ]
+    if not candidates:
+        return None, []
+
+    token = f"{worker_id}:{uuid4().hex}"
+    db.query(ClassificationJob).filter(
+        ClassificationJob.complaint_id.in_(candidates),
+        _claimable(now),
+    ).update({
+        ClassificationJob.status: JobStatusEnum.running,
+        ClassificationJob.locked_by: token,
+        ClassificationJob.lease_expires_at: now + timedelta(seconds=JOB_LEASE_SECONDS),
+        ClassificationJob.attempts: ClassificationJob.attempts + 1,
+    }, synchronize_session=False)
+    db.commit()
+
+    claimed = [
+        row.complaint_id for row in db.query(ClassificationJob.complaint_id)
+        .filter(ClassificationJob.locked_by == token)
+    ]
+    return token, claimed
+
+
+def complete_jobs(db: Session, token: str, complaint_ids):
+    """Remove finished jobs (caller commits, together with the results)."""
+    db.query(ClassificationJob).filter(
+        ClassificationJob.complaint_id.in_(list(complaint_ids)),
+        ClassificationJob.locked_by == token,
+    ).delete(synchronize_session=False)
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+def fail_jobs(db: Session, token: str, complaint_ids, error: str):
+    """Release leased jobs after an error: retry later with exponential backoff,
+    or park them as ``failed`` once they have used up their attempts."""
+    now = datetime.utcnow()
+    jobs = db.query(ClassificationJob).filter(
+        ClassificationJob.complaint_id.in_(list(complaint_ids)),
+        ClassificationJob.locked_by == token,
+    ).all()
+    for job in jobs:
+        job.locked_by = None
+        job.lease_expires_at = None
+        job.last_error = error[:1000]
+        if job.attempts >= JOB_MAX_ATTEMPTS:
+            job.status = JobStatusEnum.failed
+        else:
+            job.status = JobStatusEnum.queued
+            job.available_at = now + timedelta(seconds=backoff_seconds(job.attempts))
+    db.commit()
+
+
+def queue_depth(db: Session):
+    """Number of jobs per status."""
+    rows = db.query(ClassificationJob.status, func.count()).group_by(ClassificationJob.status).all()
+    depth = {status.value: 0 for status in JobStatusEnum}
+    depth.update({status.value: count for status, count in rows})
+    return depth
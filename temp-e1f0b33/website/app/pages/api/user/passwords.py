@@ -0,0 +1,54 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Method and cost of new hashes, in werkzeug's syntax: "scrypt:N:r:p" or "pbkdf2:sha256:iterations".
+# Stored hashes with a different method/cost are replaced on the user's next login.
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+# Threads running the KDF; 0 hashes inline on the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_executor = (
+    ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    if PASSWORD_HASH_WORKERS > 0 else None
+)
+
+
+def hash_password(password: str) -> str:
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+
+@lru_cache(maxsize=1)
+def current_hash_prefix() -> str:
+    # werkzeug expands defaults ("scrypt" -> "scrypt:32768:8:1"), so ask it for the canonical prefix
+    return hash_password("").split("$", 1)[0]
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    return stored_hash.split("$", 1)[0] != current_hash_prefix()
+
+
+def verify_and_update(stored_hash: str, password: str):
+    """Check a password; returns (ok, new_hash) where new_hash is set when the stored cost is outdated."""
+    if not check_password_hash(stored_hash, password):
+        return False, None
+    if needs_rehash(stored_hash):
+        return True, hash_password(password)
+    return True, None
+
+
+async def _run(fn, *args):
+    if _executor is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password)
+
+
+async def verify_and_update_async(stored_hash: str, password: str):
+    return await _run(verify_and_update, stored_hash, password)
@@ -0,0 +1,368 @@
+"""Production launcher: preload the app in a master process, then fork uvicorn workers.
+
+    python -m website.app.pages.api.user.prefork --workers 4 --port 8080
+
+The master imports the app, which creates the tables. It loads the
+inference engine, NLTK data and sentiment scorer, closes its database
+connections and freezes the garbage collector. Only then does it fork, so
+the model arrays and imported modules sit in copy-on-write pages shared by
+every worker. Each worker opens its own database connections, runs its
+own lifespan (event hub, micro-batcher) and serves the shared listening
+socket. Classification threads (CLASSIFY_WORKERS) run only in worker 0.
+
+Health is per worker:
+- Each worker's event loop stamps a heartbeat slot in shared memory every
+  second. The master kills and replaces a worker whose stamp is older than
+  --timeout (a blocked loop) and any worker that exits.
+- With --worker-port-base, worker i also listens on 127.0.0.1:(base + i),
+  so ``GET /health`` can be asked of one specific worker.
+
+Complaint events published in one worker reach the event streams held by
+the others through the master. Metrics use prometheus_client's
+multiprocess mode (PROMETHEUS_MULTIPROC_DIR).
+"""
+import argparse
+import gc
+import os
+import selectors
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from multiprocessing.sharedctypes import RawArray
+
+# Events relayed per worker before the master drops that worker's backlog
+RELAY_BUFFER_BYTES = 8 * 1024 * 1024
+
+
+def process_memory_mb(pid="self"):
+    """RSS, PSS and private (USS) memory of a process in MiB, from /proc/<pid>/smaps_rollup (Linux)."""
+    fields = {"Rss": "rssMb", "Pss": "pssMb", "Private_Clean": "ussMb", "Private_Dirty": "ussMb"}
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in fields:
+                    memory[fields[name]] = memory.get(fields[name], 0) + int(rest.split()[0]) / 1024
+    except OSError:
+        return {}
+    return {key: round(value, 1) for key, value in memory.items()}
+
+
+def preload():
+    """Import the app and load everything the workers share; returns the app."""
+    from .server import app
+    from .database import engine, async_engine
+    from utils.ml_pipeline import registry, predict_texts, get_sentiment_engine
+
+    started = time.perf_counter()
+    registry.warmup(background=False)
+    get_sentiment_engine()
+    # Run once so lazily built caches (lemmatizer, vocabulary lookups) exist before the fork
+    predict_texts(["The coach was dirty and the train was late"])
+    # SQLite connections must not cross a fork
+    engine.dispose()
+    async_engine.sync_engine.dispose()
+    gc.collect()
+    # Keep the collector from writing to (and so un-sharing) the preloaded objects
+    gc.freeze()
+    print(f"[master {os.getpid()}] preloaded app and models in {time.perf_counter() - started:.1f}s", flush=True)
+    return app
+
+
+class _Relay:
+    """Worker side of the event relay: newline-delimited JSON over a socket to the master."""
+
+    def __init__(self, sock, hub):
+        self.sock = sock
+        self.hub = hub
+        self.queue = None
+
+    def start(self, loop):
+        import asyncio
+
+        self.queue = asyncio.Queue(1024)
+        self.sock.setblocking(False)
+        self.hub.relay = self.send
+        loop.create_task(self._write(loop))
+        loop.create_task(self._read(loop))
+
+    def send(self, event_type, complaints):
+        import orjson
+
+        try:
+            self.queue.put_nowait(orjson.dumps([event_type, complaints], default=str) + b"\n")
+        except Exception:
+            # Master not keeping up: the other workers miss this event
+            pass
+
+    async def _write(self, loop):
+        while True:
+            await loop.sock_sendall(self.sock, await self.queue.get())
+
+    async def _read(self, loop):
+        import orjson
+
+        pending = b""
+        while True:
+            data = await loop.sock_recv(self.sock, 65536)
+            if not data:
+                return
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                event_type, complaints = orjson.loads(line)
+                self.hub.publish_complaints(event_type, complaints, relay=False)
+
+
+def _run_worker(app, index, listener, relay_sock, heartbeats, port_base, log_level):
+    import asyncio
+    import uvicorn
+    from .database import engine, async_engine
+    from .events import event_hub
+    from .server import classification_pool
+
+    os.environ["WORKER_ID"] = str(index)
+    # Connections opened by the master (none after preload()) belong to it
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    if index != 0:
+        classification_pool.size = 0
+
+    sockets = [listener]
+    if port_base:
+        private = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        private.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        private.bind(("127.0.0.1", port_base + index))
+        sockets.append(private)
+
+    config = uvicorn.Config(app, log_level=log_level, access_log=False, lifespan="on")
+    server = uvicorn.Server(config)
+
+    async def heartbeat():
+        while True:
+            heartbeats[index] = time.monotonic()
+            await asyncio.sleep(1)
+
+    async def serve():
+        loop = asyncio.get_running_loop()
+        loop.create_task(heartbeat())
+        _Relay(relay_sock, event_hub).start(loop)
+        await server.serve(sockets=sockets)
+
+    asyncio.run(serve())
+
+
+class Master:
+    def __init__(self, app, listener, workers, timeout, port_base, log_level):
+        self.app = app
+        self.listener = listener
+        self.workers = workers
+        self.timeout = timeout
+        self.port_base = port_base
+        self.log_level = log_level
+        self.heartbeats = RawArray("d", workers)
+        self.pids = {}        # index -> pid
+        self.relays = {}      # index -> master end of the relay socket
+        self.outgoing = {}    # index -> bytes waiting to be written to that worker
+        self.partial = {}     # index -> an incomplete line read from that worker
+        self.started = {}     # index -> monotonic time of the last spawn
+        self.killed = set()   # pids sent SIGKILL for a missed heartbeat
+        self.selector = selectors.DefaultSelector()
+        self.stopping = False
+
+    def log(self, message):
+        print(f"[master {os.getpid()}] {message}", flush=True)
+
+    def spawn(self, index):
+        # Do not fork-loop when a worker fails at startup
+        wait = self.started.get(index, 0) + 1 - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        parent_end, child_end = socket.socketpair()
+        self.heartbeats[index] = time.monotonic()
+        self.started[index] = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                    signal.signal(sig, signal.SIG_DFL)
+                self.selector.close()
+                parent_end.close()
+                for sock in self.relays.values():
+                    sock.close()
+                _run_worker(self.app, index, self.listener, child_end, self.heartbeats,
+                            self.port_base, self.log_level)
+            except BaseException as e:
+                print(f"[worker {index} {os.getpid()}] exited: {e!r}", flush=True)
+                code = 1
+            finally:
+                os._exit(code)
+        child_end.close()
+        parent_end.setblocking(False)
+        self.pids[index] = pid
+        self.relays[index] = parent_end
+        self.outgoing[index] = bytearray()
+        self.selector.register(parent_end, selectors.EVENT_READ, index)
+        self.log(f"started worker {index} (pid {pid})")
+
+    def _drop_relay(self, index):
+        sock = self.relays.pop(index, None)
+        if sock is not None:
+            self.selector.unregister(sock)
+            sock.close()
+        self.outgoing.pop(index, None)
+
+    def _forward(self, source, lines):
+        for index, sock in self.relays.items():
+            if index == source:
+                continue
+            buffer = self.outgoing[index]
+            if len(buffer) > RELAY_BUFFER_BYTES:
+                # The worker stopped reading; its streams miss events until it catches up
+                buffer.clear()
+            was_empty = not buffer
+            buffer += lines
+            if was_empty:
+                self.selector.modify(sock, selectors.EVENT_READ | selectors.EVENT_WRITE, index)
+
+    def _pump(self, timeout):
+        for key, mask in self.selector.select(timeout):
+            index, sock = key.data, key.fileobj
+            if mask & selectors.EVENT_READ:
+                try:
+                    data = sock.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    data = None
+                except OSError:
+                    data = b""
+                if data == b"":
+                    self._drop_relay(index)
+                    continue
+                if data:
+                    pending = self.partial.get(index, b"") + data
+                    end = pending.rfind(b"\n") + 1
+                    self.partial[index] = pending[end:]
+                    if end:
+                        self._forward(index, pending[:end])
+            if mask & selectors.EVENT_WRITE and index in self.outgoing:
+                buffer = self.outgoing[index]
+                try:
+                    sent = sock.send(buffer)
+                    del buffer[:sent]
+                except (BlockingIOError, InterruptedError):
+                    pass
+                except OSError:
+                    self._drop_relay(index)
+                    continue
+                if not buffer:
+                    self.selector.modify(sock, selectors.EVENT_READ, index)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            for index, worker_pid in list(self.pids.items()):
+                if worker_pid == pid:
+                    del self.pids[index]
+                    self.killed.discard(pid)
+                    self._drop_relay(index)
+                    self.partial.pop(index, None)
+                    if not self.stopping:
+                        self.log(f"worker {index} (pid {pid}) exited with code {os.waitstatus_to_exitcode(status)}; restarting")
+
+    def _check_heartbeats(self):
+        now = time.monotonic()
+        for index, pid in self.pids.items():
+            if now - self.heartbeats[index] > self.timeout and pid not in self.killed:
+                self.killed.add(pid)
+                self.log(f"worker {index} (pid {pid}) missed its heartbeat for {self.timeout:.0f}s; killing it")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def run(self, graceful_timeout):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.workers):
+            self.spawn(index)
+        while not self.stopping:
+            self._pump(0.5)
+            self._reap()
+            self._check_heartbeats()
+            for index in range(self.workers):
+                if index not in self.pids and not self.stopping:
+                    self.spawn(index)
+
+        self.log("shutting down workers")
+        for pid in self.pids.values():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + graceful_timeout
+        while self.pids and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in self.pids.values():
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the API from preloaded, forked uvicorn workers.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")))
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--timeout", type=float, default=30, help="seconds without a heartbeat before a worker is killed")
+    parser.add_argument("--graceful-timeout", type=float, default=30)
+    parser.add_argument("--worker-port-base", type=int, default=0,
+                        help="also serve worker i on 127.0.0.1:(base + i), for per-worker health checks")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args(argv)
+
+    # Must be set before prometheus_client is imported (by preload())
+    metrics_dir = None
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        metrics_dir = tempfile.mkdtemp(prefix="rail-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+    else:
+        # Files from a previous run would be added to this run's counts
+        for name in os.listdir(os.environ["PROMETHEUS_MULTIPROC_DIR"]):
+            if name.endswith(".db"):
+                os.remove(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], name))
+
+    listener = socket.socket(socket.AF_INET6 if ":" in args.host else socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((args.host, args.port))
+    listener.listen(args.backlog)
+    listener.set_inheritable(True)
+
+    app = preload()
+    master = Master(app, listener, max(1, args.workers), args.timeout, args.worker_port_base, args.log_level)
+    master.log(f"listening on {args.host}:{args.port} with {master.workers} workers")
+    try:
+        master.run(args.graceful_timeout)
+    finally:
+        listener.close()
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
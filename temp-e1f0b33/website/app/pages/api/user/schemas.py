@@ -0,0 +1,98 @@
+from pydantic import BaseModel, field_validator, model_validator
+
+from .models import Complaint
+
+
+# Shared by POST /complaints/ and bulk ingestion
+class ComplaintCreate(BaseModel):
+    trainNumber: str
+    pnrNumber: str
+    coachNumber: str
+    seatNumber: str
+    sourceStation: str
+    destinationStation: str
+    complaint: str
+    
+    @field_validator('trainNumber')
+    def validate_train_number(cls, v):
+        if not v.isdigit():
+            raise ValueError("Train number must be numeric")
+        return v.strip()
+    
+    @field_validator('pnrNumber')
+    def validate_pnr_number(cls, v):
+        v = v.strip()
+        if not v.isdigit() or len(v) != 10:
+            raise ValueError("PNR must be a 10-digit number")
+        return v
+    
+    @field_validator('seatNumber')
+    def validate_seat_number(cls, v):
+        if not v.isdigit():
+            raise ValueError("Seat number must be numeric")
+        return v.strip()
+    
+    @field_validator('complaint')
+    def validate_complaint(cls, v):
+        v = v.strip()
+        if len(v) < 20:
+            raise ValueError("Complaint description must be at least 20 characters")
+        return v
+    
+    @model_validator(mode='after')
+    def validate_stations(cls, model):
+        if model.sourceStation.strip() == model.destinationStation.strip():
+            raise ValueError("Source and destination stations cannot be the same")
+        return model
+
+    class Config:
+        anystr_strip_whitespace = True
+
+
+# Response shapes: output key -> Complaint column. List endpoints select only
+# these columns, so rows come back as tuples without building ORM objects.
+COMPLAINT_COLUMNS = {
+    "id": Complaint.id,
+    "trainNumber": Complaint.trainNumber,
+    "pnrNumber": Complaint.pnrNumber,
+    "coachNumber": Complaint.coachNumber,
+    "seatNumber": Complaint.seatNumber,
+    "sourceStation": Complaint.sourceStation,
+    "destinationStation": Complaint.destinationStation,
+    "complaint": Complaint.complaint,
+    "status": Complaint.status,
+    "createdAt": Complaint.created_at,
+}
+# GET /complaints/get-complaints
+USER_COMPLAINT_COLUMNS = {
+    **COMPLAINT_COLUMNS,
+    "classification": Complaint.classification,
+    "sentiment": Complaint.sentiment,
+    "sentimentScore": Complaint.sentimentScore,
+}
+# GET /complaints/get-all-complaints
+ADMIN_COMPLAINT_COLUMNS = {
+    **USER_COMPLAINT_COLUMNS,
+    "resolution": Complaint.resolution,
+    "clusterId": Complaint.cluster_id,
+}
+# PUT /complaints/update/{id}
+UPDATED_COMPLAINT_COLUMNS = {
+    **COMPLAINT_COLUMNS,
+    "resolution": Complaint.resolution,
+}
+
+
+def serialize_rows(rows, columns):
+    """Dicts keyed by the response names for rows selected with ``select(*columns.values())``.
+
+    Values are left as they come from the database (enums, datetimes) for
+    ORJSONResponse to encode.
+    """
+    keys = tuple(columns)
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def serialize_complaint(complaint: Complaint, columns):
+    """Response dict for one loaded Complaint."""
+    return {key: getattr(complaint, column.key) for key, column in columns.items()}
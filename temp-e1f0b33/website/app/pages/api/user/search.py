@@ -0,0 +1,149 @@
+"""Full-text search over complaints with an SQLite FTS5 index.
+
+``complaint_fts`` is an external-content FTS5 table: it indexes the
+complaint text, train number and stations of the ``complaint`` table
+without storing a second copy, keyed by the complaint's rowid. Triggers
+keep it in sync on insert, delete and on updates of the indexed columns
+(status and classification updates do not touch it).
+
+The index can always be regenerated from the complaint table, e.g. after
+a bulk load with the triggers dropped or a VACUUM that renumbered rowids:
+
+    python -m website.app.pages.api.user.search rebuild
+"""
+import argparse
+import os
+import re
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import column, func, literal_column, select, table, text
+
+from .models import Complaint
+from .filters import ComplaintFilters, apply_complaint_filters
+
+FTS_TABLE = "complaint_fts"
+FTS_COLUMNS = ("complaint", "trainNumber", "sourceStation", "destinationStation")
+
+# bm25() column weights, in FTS_COLUMNS order: a match on the train number or
+# a station is worth more than one word of free text
+SEARCH_WEIGHTS = (1.0, 4.0, 2.0, 2.0)
+
+# Longest accepted query, in terms
+MAX_SEARCH_TERMS = int(os.getenv("MAX_SEARCH_TERMS", "16"))
+# Deepest page offset; every page re-ranks all matches, so refine the query instead
+MAX_SEARCH_OFFSET = 10000
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+# porter stems English ("delayed" matches "delay"); prefix indexes serve the
+# last, still-being-typed term of a query
+SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_columns}, content='complaint', content_rowid='rowid',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON complaint BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns} ON complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+    END""",
+)
+
+# The FTS table as SQLAlchemy sees it: its rowid and the hidden column named
+# after the table, which MATCH and bm25() take
+_fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE))
+_complaint_rowid = literal_column("complaint.rowid")
+_rank = func.bm25(_fts.c[FTS_TABLE], *SEARCH_WEIGHTS)
+
+
+def init_search_index(engine):
+    """Create the FTS table and triggers if missing; a newly created index is filled from the complaint table."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        for statement in SEARCH_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def rebuild_search_index(engine):
+    """Recreate the index contents from the complaint table and merge its segments."""
+    with engine.begin() as conn:
+        for statement in SEARCH_DDL:
+            conn.execute(text(statement))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+
+
+def build_match_query(q: str) -> str:
+    """FTS5 MATCH expression for free text typed by a user.
+
+    Every word must match (implicit AND); each is quoted so FTS5 operators
+    and punctuation in the input are taken literally, and the last one is a
+    prefix so results show up while the word is being typed.
+    """
+    terms = _TERM.findall(q)[:MAX_SEARCH_TERMS]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain a word or number")
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_query(q: str, columns, filters: ComplaintFilters, limit: int, offset: int = 0):
+    """BM25-ranked SELECT of ``columns`` plus a ``search_rank`` column (lower is better).
+
+    Ties go to the most recently inserted complaint. Fetches ``limit + 1``
+    rows so the caller can tell whether there is a next page.
+    """
+    match = _fts.c[FTS_TABLE].op("MATCH")(build_match_query(q))
+    rank = _rank.label("search_rank")
+    if not any(filters.model_dump().values()):
+        # No column filters: rank and cut the page inside the FTS table, then
+        # read only that page's rows from complaint
+        hits = (
+            select(_fts.c.rowid, rank).where(match)
+            .order_by(rank, _fts.c.rowid.desc()).limit(limit + 1).offset(offset)
+            .subquery()
+        )
+        return (
+            select(*columns, hits.c.search_rank)
+            .select_from(Complaint)
+            .join(hits, hits.c.rowid == _complaint_rowid)
+            .order_by(hits.c.search_rank, hits.c.rowid.desc())
+        )
+    query = (
+        select(*columns, rank)
+        .select_from(Complaint)
+        .join(_fts, _fts.c.rowid == _complaint_rowid)
+        .where(match)
+    )
+    query = apply_complaint_filters(query, filters)
+    return query.order_by(rank, _complaint_rowid.desc()).limit(limit + 1).offset(offset)
+
+if __name__ == "__main__":
+    from .database import engine, init_db
+
+    parser = argparse.ArgumentParser(description="Maintain the complaint full-text search index.")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    rebuild_search_index(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT count(*) FROM complaint")).scalar()
+    print(f"Rebuilt {FTS_TABLE} over {rows} complaints in {time.perf_counter() - started:.1f}s")
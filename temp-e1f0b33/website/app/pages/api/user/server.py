@@ -76,16 +76,49 @@ load_dotenv()
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from contextlib import asynccontextmanager
 import os
+import time
 from datetime import timedelta
+from sqlalchemy import text
 
 from .auth import auth_router
-from .complaint import complaint_router
-from .database import Base, engine
+from .complaint import complaint_router, classify_batcher
+from .events import event_hub
+from .database import init_db, SessionLocal, async_engine
+from .metrics import METRICS_ENABLED, MetricsMiddleware, register_gauge, render_metrics
+from .outbox import queue_depth
+from .prefork import process_memory_mb
+from .responses import ORJSONResponse
 from .models import User, Complaint
-
-app = FastAPI()
+from utils.classifier import ClassificationWorkerPool
+from utils.ml_pipeline import registry as model_registry
+from utils.inference_service import inference_service
+
+# Threads draining the classification job queue (CLASSIFY_WORKERS=0 to run them elsewhere)
+classification_pool = ClassificationWorkerPool()
+
+# Load the ML models in the background at boot instead of on the first request
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "True").lower() == "true"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.started_at = time.time()
+    inference_service.start()
+    # With inference processes the models are loaded there, not here
+    if MODEL_WARMUP and not inference_service.running:
+        model_registry.warmup(background=True)
+    event_hub.start()
+    classification_pool.start()
+    classify_batcher.start()
+    yield
+    await classify_batcher.stop()
+    classification_pool.stop()
+    inference_service.shutdown()
+    event_hub.stop()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS Configuration - Fix the issues
 frontend_url = os.environ.get("FRONTEND_URL", "http://localhost:3000")
@@ -130,8 +163,23 @@ app.add_middleware(
     max_age=3600,
 )
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+def classification_job_depth():
+    db = SessionLocal()
+    try:
+        return queue_depth(db)
+    finally:
+        db.close()
+
+register_gauge("classification_jobs", "Classification jobs in the outbox by status.", classification_job_depth, "status")
+register_gauge("classify_batcher_pending", "Preview texts waiting for the next batch.", lambda: classify_batcher.pending)
+register_gauge("event_stream_connections", "Open /complaints/events streams.", lambda: event_hub.connections)
+register_gauge("inference_pending", "Chunks waiting in or running on the inference processes.", lambda: inference_service.pending)
+
+# Create tables and indexes
+init_db()
 
 # Add a root endpoint for health check
 @app.get("/")
@@ -144,6 +192,44 @@ async def root():
 async def status(): 
     return JSONResponse(content={"message": "Success"}, status_code=200)  # Changed from 201 to 200
 
+def models_ready():
+    """Whether classification can run: in the inference processes when they are on, else here."""
+    return inference_service.ready if inference_service.running else model_registry.ready
+
+# Readiness endpoint: 503 until the ML models are loaded
+@app.get("/ready")
+async def ready():
+    models = model_registry.status()
+    ready = models_ready()
+    return JSONResponse(content={"ready": ready, "models": models, "inference": inference_service.status()},
+                        status_code=200 if ready else 503)
+
+# Liveness of the process that answers (one worker under the prefork launcher)
+@app.get("/health")
+async def health():
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        database = "ok"
+    except Exception as e:
+        database = f"error: {e}"
+    return JSONResponse(content={
+        "status": "ok" if database == "ok" else "error",
+        "worker": os.getenv("WORKER_ID"),
+        "pid": os.getpid(),
+        "uptimeSeconds": round(time.time() - getattr(app.state, "started_at", time.time()), 1),
+        "database": database,
+        "modelsReady": models_ready(),
+        "eventStreams": event_hub.connections,
+        "memory": process_memory_mb(),
+    }, status_code=200 if database == "ok" else 503)
+
+# Prometheus scrape endpoint (sync, so the queue-depth query runs in the thread pool)
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # Add OPTIONS handler for preflight requests
 # @app.options("/{full_path:path}")
 # async def options_handler(full_path: str, request: Request):
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, case, or_
+from sqlalchemy.orm import Session
+
+from .models import Complaint, StatusEnum
+
+# How long a computed stats payload may be served before it is recomputed
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "30"))
+
+# Same rule the admin dashboard uses to raise an emergency alert
+EMERGENCY_CLASSIFICATION = "Medical"
+EMERGENCY_SENTIMENT_SCORE = 0.95
+
+
+class StatsCache:
+    """Short-TTL cache for the aggregate stats payload.
+
+    Writes that change the counts call ``invalidate()`` so the next read in
+    this process recomputes; other processes converge within the TTL.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+stats_cache = StatsCache(STATS_CACHE_TTL_SECONDS)
+
+
+def _label(key):
+    if key is None:
+        return "Unclassified"
+    return key.value if hasattr(key, "value") else key
+
+
+def _grouped_counts(db: Session, column):
+    rows = db.query(column, func.count(Complaint.id)).group_by(column).all()
+    return {_label(key): count for key, count in rows}
+
+
+def compute_complaint_stats(db: Session, days: int = 30):
+    """Aggregate the complaint table with GROUP BY queries.
+
+    The payload size depends only on the number of categories and days,
+    never on the number of complaints.
+    """
+    is_emergency = or_(
+        Complaint.classification.like(f"%{EMERGENCY_CLASSIFICATION}%"),
+        Complaint.sentimentScore > EMERGENCY_SENTIMENT_SCORE,
+    )
+    total, avg_sentiment, emergencies = db.query(
+        func.count(Complaint.id),
+        func.avg(Complaint.sentimentScore),
+        func.sum(case((is_emergency, 1), else_=0)),
+    ).one()
+
+    by_status = {s.value: 0 for s in StatusEnum}
+    by_status.update(_grouped_counts(db, Complaint.status))
+
+    day = func.date(Complaint.created_at)
+    since = datetime.utcnow() - timedelta(days=days)
+    by_day = db.query(
+        day,
+        func.count(Complaint.id),
+        func.sum(case((Complaint.status == StatusEnum.resolved, 1), else_=0)),
+    ).filter(Complaint.created_at >= since).group_by(day).order_by(day).all()
+
+    resolved = by_status[StatusEnum.resolved.value]
+    return {
+        "total": total,
+        "pending": total - resolved,
+        "resolved": resolved,
+        "avgSentimentScore": round(avg_sentiment, 4) if avg_sentiment is not None else None,
+        "emergencies": emergencies or 0,
+        "byStatus": by_status,
+        "byClassification": _grouped_counts(db, Complaint.classification),
+        "bySentiment": _grouped_counts(db, Complaint.sentiment),
+        "byDay": [
+            {"date": str(d), "complaints": count, "resolved": resolved_count or 0}
+            for d, count, resolved_count in by_day
+        ],
+    }
+
+
+def get_complaint_stats(db: Session, days: int = 30):
+    stats = stats_cache.get(days)
+    if stats is None:
+        stats = compute_complaint_stats(db, days)
+        stats_cache.set(days, stats)
+    return stats